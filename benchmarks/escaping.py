@@ -0,0 +1,49 @@
+"""Compare escaping the text of modules in a batch with escaping each string.
+
+For every module of the given Doxygen index, this collects the strings that
+are escaped and normalized when it is rendered and times escaping them one
+at a time (as each string is rendered) against escaping them all in a single
+pass (see helpers.normalize_strings), checking both give the same text, e.g.
+
+    python benchmarks/escaping.py path/to/xml/index.xml
+"""
+
+import argparse
+import os
+
+from doxygentoasciidoc.helpers import normalize_text, normalize_texts, text_strings
+from doxygentoasciidoc.parsers import parse, parse_compound
+
+from timing import best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="The path of the Doxygen index.xml")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as file:
+        soup = parse(file)
+    xmldir = os.path.dirname(args.file)
+    modules = [
+        text_strings(parse_compound(xmldir, compound["refid"]).doxygen)
+        for compound in soup("compound", kind="group")
+    ]
+
+    for texts in modules:
+        assert normalize_texts(texts) == [normalize_text(text) for text in texts]
+
+    each = best(
+        lambda: [normalize_text(text) for texts in modules for text in texts],
+        args.repeat,
+    )
+    batched = best(lambda: [normalize_texts(texts) for texts in modules], args.repeat)
+    count = sum(len(texts) for texts in modules)
+    print(f"{count} strings in {len(modules)} modules")
+    print(f"each    {each * 1000:8.1f} ms")
+    print(f"batched {batched * 1000:8.1f} ms ({each / batched:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
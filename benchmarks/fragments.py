@@ -0,0 +1,138 @@
+"""Compare rendering each member's shared fragments once with rendering them
+for the summary and the details each.
+
+This generates a group with the given number of functions, half as many
+macros and a few enums, and times rendering it with the fragments of each
+member (its type, brief description and initializer) shared between the
+summary lists and the detailed documentation (see MemberdefNode.fragment)
+against rendering them every time they are needed, checking both give the
+same AsciiDoc, e.g.
+
+    python benchmarks/fragments.py -n 2000
+"""
+
+import argparse
+
+from doxygentoasciidoc.context import RenderContext
+from doxygentoasciidoc.helpers import normalize_strings
+from doxygentoasciidoc.nodes import GroupNode, MemberdefNode
+from doxygentoasciidoc.parsers import parse
+
+from timing import best
+
+
+def function(number):
+    """Return the XML of a function member."""
+    return f"""\
+<memberdef kind="function" id="group__bench_1gfunc{number}" prot="public" static="no" inline="yes">
+  <type><ref refid="group__bench_1gtype" kindref="member">uint32_t</ref></type>
+  <definition>uint32_t bench_func_{number}</definition>
+  <argsstring>(uint32_t value, bool enable)</argsstring>
+  <name>bench_func_{number}</name>
+  <param><type>uint32_t</type><declname>value</declname></param>
+  <param><type>bool</type><declname>enable</declname></param>
+  <briefdescription><para>Set the <bold>value</bold> of register {number} and
+  its <computeroutput>__enable</computeroutput> bit. </para></briefdescription>
+  <detaileddescription><para>Writes the value atomically.</para></detaileddescription>
+</memberdef>"""
+
+
+def macro(number):
+    """Return the XML of a macro member."""
+    return f"""\
+<memberdef kind="define" id="group__bench_1gdef{number}" prot="public" static="no">
+  <name>BENCH_BIT_{number}</name>
+  <initializer>(1u &lt;&lt; {number % 32})</initializer>
+  <briefdescription><para>Register bit {number}. </para></briefdescription>
+  <detaileddescription></detaileddescription>
+</memberdef>"""
+
+
+def enum(number, values=50):
+    """Return the XML of an enum member with the given number of values."""
+    enumvalues = "".join(
+        f'<enumvalue id="group__bench_1genum{number}v{value}" prot="public">'
+        f"<name>BENCH_{number}_{value}</name><initializer>= {value}</initializer>"
+        f"<briefdescription><para>Value {value}. </para></briefdescription>"
+        "<detaileddescription></detaileddescription></enumvalue>"
+        for value in range(values)
+    )
+    return f"""\
+<memberdef kind="enum" id="group__bench_1genum{number}" prot="public" static="no">
+  <type></type>
+  <name>bench_enum_{number}</name>
+  {enumvalues}
+  <briefdescription><para>Enum {number}. </para></briefdescription>
+  <detaileddescription></detaileddescription>
+</memberdef>"""
+
+
+def group(functions):
+    """Return the XML of a group with the given number of functions."""
+    sections = (
+        ("func", [function(number) for number in range(functions)]),
+        ("define", [macro(number) for number in range(functions // 2)]),
+        ("enum", [enum(number) for number in range(max(1, functions // 100))]),
+    )
+    sectiondefs = "".join(
+        f'<sectiondef kind="{kind}">{"".join(members)}</sectiondef>'
+        for kind, members in sections
+    )
+    return f"""\
+<doxygen version="1.9.7">
+  <compounddef id="group__bench" kind="group">
+    <compoundname>bench</compoundname>
+    <title>Bench</title>
+    {sectiondefs}
+    <briefdescription><para>A group of many members. </para></briefdescription>
+    <detaileddescription></detaileddescription>
+  </compounddef>
+</doxygen>"""
+
+
+def unshared_fragment(self, selector, ctx=None, **options):
+    """Render the given child of a member every time, as before fragments
+    were shared."""
+    ctx = RenderContext.of(ctx, options).at_depth(0)
+    child = self.child(selector)
+    if selector in self.VERBATIM_FRAGMENTS:
+        return child.to_verbatim_asciidoc(ctx)
+    return child.to_asciidoc(ctx)
+
+
+def render(markup):
+    """Parse the given group and return a function rendering it."""
+    doxygen = parse(markup).doxygen
+    normalize_strings(doxygen)
+    node = GroupNode(doxygen.compounddef)
+    return lambda: node.to_asciidoc(depth=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--functions", type=int, default=2000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    markup = group(args.functions)
+    shared_fragment = MemberdefNode.fragment
+    expected = render(markup)()
+    MemberdefNode.fragment = unshared_fragment
+    try:
+        assert render(markup)() == expected
+        # Each render needs a tree of its own, as fragments are kept on it
+        renders = [render(markup) for _ in range(args.repeat)]
+        unshared = best(lambda: renders.pop()(), args.repeat)
+    finally:
+        MemberdefNode.fragment = shared_fragment
+    renders = [render(markup) for _ in range(args.repeat)]
+    shared = best(lambda: renders.pop()(), args.repeat)
+
+    members = args.functions + args.functions // 2 + max(1, args.functions // 100)
+    print(f"{members} members, {len(expected) / 1024:.0f} KiB of AsciiDoc")
+    print(f"unshared {unshared * 1000:8.1f} ms")
+    print(f"shared   {shared * 1000:8.1f} ms ({unshared / shared:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare normalizing text with one compiled pattern with the old chain.
+
+For every module of the given Doxygen index, this collects the text strings
+of its descriptions (see helpers.text_strings), the prose making up most of
+the text nodes rendered, and times normalizing each one with
+helpers.normalize_text against the chain of substitutions it replaced,
+checking both give the same text, e.g.
+
+    python benchmarks/normalizing.py path/to/xml/index.xml
+"""
+
+import argparse
+import os
+import re
+
+from doxygentoasciidoc.helpers import escape_text, normalize_text, text_strings
+from doxygentoasciidoc.parsers import parse, parse_compound
+
+from timing import best
+
+
+def chained_normalize_text(text):
+    """Normalize text as text nodes were before normalize_text: escape it,
+    remove whitespace around line breaks, convert line breaks to spaces and
+    collapse runs of spaces, with uncompiled patterns."""
+    return re.sub(
+        r"\s{2,}",
+        " ",
+        re.sub(r"\s+\n\s+", "\n", escape_text(text)).replace("\n", " "),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="The path of the Doxygen index.xml")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as file:
+        soup = parse(file)
+    xmldir = os.path.dirname(args.file)
+    texts = [
+        str(string)
+        for compound in soup("compound", kind="group")
+        for string in text_strings(parse_compound(xmldir, compound["refid"]).doxygen)
+    ]
+
+    for text in texts:
+        assert normalize_text(text) == chained_normalize_text(text), text
+
+    chained = best(
+        lambda: [chained_normalize_text(text) for text in texts], args.repeat
+    )
+    compiled = best(lambda: [normalize_text(text) for text in texts], args.repeat)
+    size = sum(len(text) for text in texts)
+    print(f"{len(texts)} strings, {size / 1024 / 1024:.1f} MiB of text")
+    print(f"chained  {chained * 1000:8.1f} ms")
+    print(f"compiled {compiled * 1000:8.1f} ms ({chained / compiled:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare the parse throughput of each XML parser engine.
+
+For every compound of the given Doxygen index, this times parsing its XML
+file into a Beautiful Soup tree with each engine (see parsers.PARSERS),
+checking every engine builds the same tree, e.g.
+
+    python benchmarks/parsers.py path/to/xml/index.xml
+"""
+
+import argparse
+import os
+
+from doxygentoasciidoc.parsers import PARSERS, parse
+
+from timing import best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="The path of the Doxygen index.xml")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as file:
+        soup = parse(file)
+    xmldir = os.path.dirname(args.file)
+    compounds = []
+    for compound in soup("compound"):
+        path = os.path.join(xmldir, f"{compound['refid']}.xml")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                compounds.append(file.read())
+
+    for markup in compounds:
+        expected = str(parse(markup, PARSERS[0]))
+        for engine in PARSERS[1:]:
+            assert str(parse(markup, engine)) == expected, engine
+
+    size = sum(len(markup.encode("utf-8")) for markup in compounds)
+    print(f"{len(compounds)} compounds, {size / 1024 / 1024:.1f} MiB")
+    for engine in PARSERS:
+        seconds = best(
+            lambda engine=engine: [parse(markup, engine) for markup in compounds],
+            args.repeat,
+        )
+        print(
+            f"{engine:10} {seconds * 1000:8.1f} ms "
+            f"({size / 1024 / 1024 / seconds:5.1f} MiB/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
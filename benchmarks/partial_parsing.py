@@ -0,0 +1,94 @@
+"""Compare parsing whole compounds with parsing only what summaries need.
+
+For every module of the given Doxygen index, this times parsing its XML
+file in full against parsing it with the filters used to build the module
+hierarchy and the summaries of its links (see nodes.HIERARCHY_FILTER and
+nodes.SUMMARY_FILTER), checking each builds the same title and brief
+description, and counts the elements built and the memory allocated, e.g.
+
+    python benchmarks/partial_parsing.py path/to/xml/index.xml
+"""
+
+import argparse
+import os
+import tracemalloc
+
+from doxygentoasciidoc.nodes import HIERARCHY_FILTER, SUMMARY_FILTER
+from doxygentoasciidoc.parsers import parse
+
+from timing import best
+
+
+def kept(soup, parse_only):
+    """Return the children of a compound with the names kept by the given
+    filter."""
+    compounddef = soup.doxygen.compounddef
+    return [str(child) for child in compounddef(parse_only.names, recursive=False)]
+
+
+def allocated(function):
+    """Return the peak bytes allocated by the given call."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="The path of the Doxygen index.xml")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as file:
+        soup = parse(file)
+    xmldir = os.path.dirname(args.file)
+    modules = []
+    for compound in soup("compound", kind="group"):
+        path = os.path.join(xmldir, f"{compound['refid']}.xml")
+        with open(path, encoding="utf-8") as file:
+            modules.append(file.read())
+
+    for markup in modules:
+        whole = parse(markup)
+        for parse_only in (HIERARCHY_FILTER, SUMMARY_FILTER):
+            assert kept(parse(markup, parse_only=parse_only), parse_only) == kept(
+                whole, parse_only
+            )
+
+    size = sum(len(markup.encode("utf-8")) for markup in modules)
+    print(f"{len(modules)} modules, {size / 1024 / 1024:.1f} MiB")
+    full = None
+    for name, parse_only in (
+        ("full", None),
+        ("hierarchy", HIERARCHY_FILTER),
+        ("summary", SUMMARY_FILTER),
+    ):
+        seconds = best(
+            lambda parse_only=parse_only: [
+                parse(markup, parse_only=parse_only) for markup in modules
+            ],
+            args.repeat,
+        )
+        elements = sum(
+            len(parse(markup, parse_only=parse_only).find_all()) for markup in modules
+        )
+        peak = max(
+            allocated(
+                lambda markup=markup, parse_only=parse_only: parse(
+                    markup, parse_only=parse_only
+                )
+            )
+            for markup in modules
+        )
+        full = full or seconds
+        print(
+            f"{name:10} {seconds * 1000:8.1f} ms ({full / seconds:4.1f}x faster), "
+            f"{elements:7} elements, {peak / 1024 / 1024:6.1f} MiB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""The helpers shared by every benchmark."""
+
+import time
+
+
+def best(function, repeat):
+    """Return the fewest seconds taken by any of the given calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,55 @@
+"""Compare the cost of starting the workers that render root modules.
+
+Forked workers share the index and module hierarchy parsed by their parent
+while spawned workers parse them again, so this times starting a pool of
+workers with each start method (until every worker has run a trivial task)
+for the given Doxygen index, e.g.
+
+    python benchmarks/worker_startup.py -j 4 doxygen/xml/index.xml
+"""
+
+import argparse
+import os
+
+from doxygentoasciidoc import parallel
+from doxygentoasciidoc.context import Conversion, RenderContext
+from doxygentoasciidoc.nodes import DoxygenindexNode
+from doxygentoasciidoc.parsers import parse
+
+from timing import best
+
+
+def startup(index, modules, jobs):
+    """Start a pool, run a task per worker and return the number of workers."""
+    ctx = RenderContext(depth=2)
+    with parallel.module_pool(index, modules, ctx, Conversion(jobs=jobs)) as executor:
+        futures = [executor.submit(os.getpid) for _ in range(jobs * 4)]
+        pids = {future.result() for future in futures}
+    parallel.WORK = None
+    return len(pids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="The path of the Doxygen index.xml")
+    parser.add_argument("-j", "--jobs", type=int, default=4)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as file:
+        soup = parse(file)
+    index = DoxygenindexNode(soup.doxygenindex, xmldir=os.path.dirname(args.file))
+    modules = list(index.rootmodules())
+    jobs = min(args.jobs, len(modules))
+
+    for method in parallel.START_METHODS:
+        parallel.configure(start_method=method)
+        workers = []
+        seconds = best(
+            lambda: workers.append(startup(index, modules, jobs)), args.repeat
+        )
+        print(f"{method:<6} {seconds * 1000:8.1f} ms to start {max(workers)} workers")
+
+
+if __name__ == "__main__":
+    main()
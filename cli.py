@@ -1,19 +1,50 @@
 import os
+import sys
 import argparse
 
-from bs4 import BeautifulSoup
-from .nodes import Node, DoxygenindexNode
+from .context import Conversion, RenderContext
+from .helpers import normalize_strings
+from .manifest import Manifest
+from .nodes import Node, DoxygenindexNode, SummaryTable
+from .parsers import (
+    DEFAULT_PARSER,
+    INPUTS,
+    PARSERS,
+    parse,
+    reset_inputs,
+    set_parser,
+)
+from .shards import Partial, merge, parse_shard
+from . import (
+    collector,
+    combined,
+    fragmentcache,
+    memory,
+    parallel,
+    schedule,
+    sources,
+    tracing,
+    variants,
+)
 
 
 def main():
     """Convert the given Doxygen index.xml to AsciiDoc and output the result."""
+    if sys.argv[1:2] == ["merge"]:
+        main_merge(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["variants"]:
+        main_variants(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         prog="doxygentoasciidoc", description="Convert Doxygen XML to AsciiDoc"
     )
     parser.add_argument(
         "file",
         type=argparse.FileType("r", encoding="utf-8"),
-        help="The path of the Doxygen XML file to convert",
+        help="The path of the Doxygen XML file (or a .zip, .tar.gz or .tar.zst "
+        "archive of the XML directory) to convert",
     )
     parser.add_argument(
         "-o",
@@ -26,23 +57,367 @@ def main():
         help="Is NOT the root index file",
         action="store_true",
     )
+    parser.add_argument(
+        "--combined",
+        help="Is Doxygen's single combined XML file of every compound, streamed "
+        "rather than reading an index and a file per compound",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-p",
+        "--parser",
+        help=f"The XML parser engine to use (default: {DEFAULT_PARSER})",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+    )
+    parser.add_argument(
+        "-s",
+        "--summaries",
+        help="Reuse compound summaries saved to this file by a previous run",
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        help="Record the output file, its hash and its inputs in this manifest",
+    )
+    parser.add_argument(
+        "-t",
+        "--trace",
+        help="Write a Chrome trace-event timeline of the conversion to this file",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Render root modules with this many worker processes or threads (see "
+        "--start-method), or else the members of large sections with this many "
+        "forked worker processes",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--parallel-threshold",
+        help="The number of members a section needs to be rendered in parallel "
+        f"(default: {parallel.THRESHOLD})",
+        type=int,
+        default=parallel.THRESHOLD,
+    )
+    parser.add_argument(
+        "--start-method",
+        help="How the workers rendering root modules are started, as forked or "
+        f"spawned processes or as threads (default: {parallel.START_METHOD})",
+        choices=parallel.START_METHODS,
+        default=parallel.START_METHOD,
+    )
+    parser.add_argument(
+        "--costs",
+        help="Schedule the workers rendering root modules by how long each "
+        "module took to render, as recorded in this file by previous runs",
+    )
+    parser.add_argument(
+        "--fragment-cache",
+        help="Reuse the documentation of unchanged members saved to this SQLite "
+        "database by previous runs",
+    )
+    parser.add_argument(
+        "--fragment-cache-size",
+        help="The maximum size of the fragment cache in MiB "
+        f"(default: {fragmentcache.DEFAULT_MAX_SIZE // 1024 // 1024})",
+        type=int,
+        default=fragmentcache.DEFAULT_MAX_SIZE // 1024 // 1024,
+    )
+    parser.add_argument(
+        "--shard",
+        help="Only render the Ith of N shards of the root modules as a partial "
+        "output to be merged with the others with `doxygentoasciidoc merge`",
+        metavar="I/N",
+        type=shard,
+    )
+    parser.add_argument(
+        "--memory-report",
+        help="Report the memory allocated by each phase of the conversion (in "
+        "this process, not its workers) to stderr",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--gc-report",
+        help="Report the garbage collector's pauses to stderr",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--schedule-report",
+        help="Report how root modules were scheduled on the workers and the "
+        "predicted and actual time taken to stderr",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-gc-tuning",
+        help="Leave the garbage collector's thresholds alone and never freeze "
+        "or collect explicitly",
+        action="store_true",
+    )
 
     args = parser.parse_args()
+    configure(parser, args)
+    conversion = start(args)
+    ctx = RenderContext(depth=2)
 
     with args.file as file:
-        xmldir = os.path.dirname(file.name)
+        try:
+            xmldir, soup = read(file, args.combined)
+        except ValueError as error:
+            parser.error(str(error))
+        summaries = SummaryTable.for_xmldir(xmldir)
+        if args.summaries and os.path.exists(args.summaries):
+            summaries.load(args.summaries)
 
         if args.child:
-            result = Node(
-                BeautifulSoup(file, "xml").doxygen, xmldir=xmldir
-            ).to_asciidoc(depth=1)
+            with memory.phase("render"):
+                normalize_strings(soup.doxygen)
+                result = (
+                    Node(soup.doxygen, xmldir=xmldir)
+                    .child("compounddef")
+                    .to_asciidoc(ctx.at_depth(1), jobs=conversion.jobs)
+                )
+        elif args.shard:
+            result = (
+                DoxygenindexNode(soup.doxygenindex, xmldir=xmldir)
+                .to_partial(*args.shard, ctx, conversion=conversion)
+                .to_json()
+            )
         else:
-            result = DoxygenindexNode(
-                BeautifulSoup(file, "xml").doxygenindex, xmldir=xmldir
-            ).to_asciidoc(depth=2)
+            result = DoxygenindexNode(soup.doxygenindex, xmldir=xmldir).to_asciidoc(
+                ctx, conversion=conversion
+            )
 
-        if args.output:
-            with open(args.output, "w", encoding="utf-8") as output:
-                output.write(result)
-        else:
-            print(result)
+        if args.summaries:
+            summaries.save(args.summaries)
+
+        with tracing.span(args.output or "stdout", "write"), memory.phase("write"):
+            write(result, args.output, args.manifest, inputs=INPUTS | {file.name})
+
+    stop(args, conversion)
+
+
+def configure(parser, args):
+    """Configure the parser engine and any workers, exiting with an error if
+    the given options are invalid."""
+    set_parser(args.parser)
+    try:
+        parallel.check_jobs(args.jobs)
+        parallel.configure(
+            threshold=args.parallel_threshold,
+            start_method=args.start_method,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    check(parser, args)
+
+
+def check(parser, args):
+    """Exit with an error if the given options can't be used together."""
+    if args.shard and args.child:
+        parser.error("--shard only applies to the root index file")
+    if args.combined and args.child:
+        parser.error("--combined only applies to the root index file")
+    if sources.is_archive(args.file.name) and (args.combined or args.child):
+        parser.error("an archive can only be read as the root index file")
+    if args.manifest and not args.output:
+        parser.error("--manifest only records an --output file")
+
+
+def read(file, combined_xml=False):
+    """Parse the given index (or combined XML file or archive) and return its
+    soup along with the directory of compound XML files (or the name of the
+    source standing in for one, see sources.register)."""
+    if combined_xml or sources.is_archive(file.name):
+        with memory.phase(f"parse {file.name}"):
+            if combined_xml:
+                source = combined.load(file.name)
+            else:
+                source = sources.load(file.name)
+            with tracing.span(file.name, "parse"):
+                return source.name, parse(source.index())
+
+    with tracing.span(file.name, "parse"), memory.phase(f"parse {file.name}"):
+        return os.path.dirname(file.name), parse(file)
+
+
+def start(args):
+    """Start any tracing, memory reporting or caching requested and return
+    how to convert the root index (with a cost model loaded from --costs, if
+    given), see context.Conversion."""
+    if args.gc_report or not args.no_gc_tuning:
+        collector.start(tune=not args.no_gc_tuning)
+    if args.trace:
+        tracing.start()
+    if args.memory_report:
+        memory.start()
+    if args.fragment_cache:
+        fragmentcache.start(
+            args.fragment_cache, max_size=args.fragment_cache_size * 1024 * 1024
+        )
+    if args.schedule_report:
+        schedule.start()
+    model = None
+    if args.costs:
+        model = schedule.CostModel()
+        model.load(args.costs)
+    return Conversion(jobs=args.jobs, model=model)
+
+
+def stop(args, conversion):
+    """Stop and report any tracing, memory reporting or caching requested."""
+    if args.fragment_cache:
+        print(fragmentcache.stop(), file=sys.stderr)
+    if args.trace:
+        tracing.save(args.trace, tracing.stop())
+    if args.memory_report:
+        print(memory.stop().to_text(), file=sys.stderr)
+    statistics = collector.stop()
+    if args.gc_report:
+        print(statistics.to_text(), file=sys.stderr)
+    for plan in schedule.stop():
+        print(plan.to_text(), file=sys.stderr)
+    if args.costs:
+        conversion.model.save(args.costs)
+
+
+def main_merge(argv):
+    """Merge the partial outputs of every shard into the full AsciiDoc output."""
+    parser = argparse.ArgumentParser(
+        prog="doxygentoasciidoc merge",
+        description="Merge the partial outputs of a sharded conversion",
+    )
+    parser.add_argument(
+        "partials",
+        nargs="+",
+        help="The partial output of every shard, in any order",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Write to file instead of stdout",
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        help="Record the output file, its hash and its inputs in this manifest",
+    )
+
+    args = parser.parse_args(argv)
+    if args.manifest and not args.output:
+        parser.error("--manifest only records an --output file")
+    try:
+        result = merge([Partial.load(path) for path in args.partials])
+    except ValueError as error:
+        parser.error(str(error))
+
+    write(result, args.output, args.manifest, inputs=args.partials)
+
+
+def main_variants(argv):
+    """Convert several variants of the same documentation (e.g. of an SDK for
+    several chips), rendering what they have in common only once."""
+    parser = argparse.ArgumentParser(
+        prog="doxygentoasciidoc variants",
+        description="Convert several variants of the same Doxygen XML, rendering "
+        "identical compounds only once",
+    )
+    parser.add_argument(
+        "files",
+        nargs="+",
+        type=argparse.FileType("r", encoding="utf-8"),
+        help="The path of each variant's Doxygen index.xml (or a .zip, .tar.gz "
+        "or .tar.zst archive of its XML directory)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Write a variant to this file, given once for each variant in the "
+        "same order",
+        action="append",
+        required=True,
+    )
+    parser.add_argument(
+        "-p",
+        "--parser",
+        help=f"The XML parser engine to use (default: {DEFAULT_PARSER})",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        help="Record each output file, its hash and its inputs in this manifest",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Render the members of large sections in this many forked processes",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--fragment-cache",
+        help="Reuse the documentation of unchanged members saved to this SQLite "
+        "database by previous runs (otherwise members are only shared by the "
+        "variants of this run)",
+    )
+    parser.add_argument(
+        "--dedup-report",
+        help="Report how many compounds and members were rendered only once "
+        "for several variants to stderr",
+        action="store_true",
+    )
+
+    args = parser.parse_args(argv)
+    if len(args.output) != len(args.files):
+        parser.error("expected one --output for each variant")
+    set_parser(args.parser)
+    try:
+        parallel.check_jobs(args.jobs)
+    except ValueError as error:
+        parser.error(str(error))
+    collector.start()
+    fragmentcache.start(args.fragment_cache or ":memory:")
+    ctx = RenderContext(depth=2)
+    conversion = Conversion(jobs=args.jobs, store=variants.CompoundStore())
+
+    for file, output in zip(args.files, args.output):
+        reset_inputs()
+        with file:
+            try:
+                xmldir, soup = read(file)
+            except ValueError as error:
+                parser.error(str(error))
+            result = DoxygenindexNode(soup.doxygenindex, xmldir=xmldir).to_asciidoc(
+                ctx, conversion=conversion
+            )
+        write(result, output, args.manifest, inputs=INPUTS | {file.name})
+
+    statistics = fragmentcache.stop()
+    collector.stop()
+    if args.dedup_report:
+        print(conversion.store.to_text(), file=sys.stderr)
+        print(statistics, file=sys.stderr)
+
+
+def shard(value):
+    """Parse the value of --shard, see parse_shard."""
+    try:
+        return parse_shard(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
+def write(result, output=None, manifest=None, inputs=()):
+    """Write the result to the given output file (or stdout).
+
+    The output is recorded in the given manifest, if any."""
+    if output:
+        outputs = Manifest(manifest)
+        outputs.write(output, result, inputs=inputs)
+        if manifest:
+            outputs.save()
+    else:
+        print(result)
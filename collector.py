@@ -0,0 +1,124 @@
+import gc
+import threading
+import time
+
+# The garbage collector being managed, or None if it is left alone.
+COLLECTOR = None
+
+# The number of allocations (less deallocations) that trigger a collection of
+# the youngest generation while converting, rather than Python's default 700.
+THRESHOLD = 50000
+
+
+class Collector:  # pylint: disable=too-many-instance-attributes
+    """Manages Python's cyclic garbage collector while converting.
+
+    Parsed XML is dense with reference cycles (every element refers to its
+    parent and siblings) so the collector's default thresholds trigger
+    frequent collections that scan the same long-lived trees over and over.
+    While managed, the youngest generation is collected far less often,
+    anything still alive once the module hierarchy is built is frozen (and so
+    never scanned again) and each module's tree is collected as soon as the
+    module is rendered.
+
+    Every collection, automatic or not, is timed so the total pause can be
+    reported. Without tuning, the collector is only timed (e.g. to compare
+    the pauses with and without tuning).
+    """
+
+    def __init__(self, tune=True, threshold=THRESHOLD):
+        self.tune = tune
+        self.threshold = threshold
+        self.thresholds = None
+        self.collections = [0, 0, 0]
+        self.collected = 0
+        self.pause = 0
+        self.longest = 0
+        self.frozen = 0
+        self.started = None
+
+    def start(self):
+        self.thresholds = gc.get_threshold()
+        if self.tune:
+            gc.set_threshold(self.threshold, *self.thresholds[1:])
+        gc.callbacks.append(self.callback)
+
+    def stop(self):
+        gc.callbacks.remove(self.callback)
+        if self.tune:
+            gc.set_threshold(*self.thresholds)
+            gc.unfreeze()
+
+    def callback(self, phase, info):
+        """Time a collection, see gc.callbacks."""
+        if phase == "start":
+            self.started = time.perf_counter()
+            return
+        if self.started is None:
+            return
+        pause = time.perf_counter() - self.started
+        self.started = None
+        self.collections[info["generation"]] += 1
+        self.collected += info["collected"]
+        self.pause += pause
+        self.longest = max(self.longest, pause)
+
+    def freeze(self):
+        """Collect everything and then freeze all remaining objects.
+
+        Frozen objects are never scanned by later collections (and stay
+        shared with any forked worker process rather than being copied when
+        the collector touches them)."""
+        if not self.tune:
+            return
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+
+    def collect(self):
+        """Collect the garbage left by whatever was just rendered."""
+        if self.tune:
+            gc.collect()
+
+    def to_text(self):
+        """Return the collection statistics of this run as plain text."""
+        young, middle, old = self.collections
+        return (
+            f"Garbage collector: {sum(self.collections)} collections "
+            f"({young}/{middle}/{old} by generation), "
+            f"{self.collected} objects collected, "
+            f"{self.pause * 1000:.1f} ms paused "
+            f"(longest {self.longest * 1000:.1f} ms), "
+            f"{self.frozen} objects frozen"
+        )
+
+
+def start(tune=True, threshold=THRESHOLD):
+    """Start managing (or, without tuning, only timing) the garbage collector."""
+    global COLLECTOR  # pylint: disable=global-statement
+    COLLECTOR = Collector(tune=tune, threshold=threshold)
+    COLLECTOR.start()
+
+
+def stop():
+    """Stop managing the garbage collector and return its statistics."""
+    global COLLECTOR  # pylint: disable=global-statement
+    collector, COLLECTOR = COLLECTOR, None
+    if collector:
+        collector.stop()
+    return collector
+
+
+def freeze():
+    """Freeze all long-lived objects, if managing the garbage collector."""
+    if COLLECTOR is not None:
+        COLLECTOR.freeze()
+
+
+def collect():
+    """Collect garbage at a module boundary, if managing the garbage collector.
+
+    Worker threads rendering modules never collect: a collection stops every
+    thread and they would only collect each other's modules."""
+    if COLLECTOR is not None and threading.current_thread() is threading.main_thread():
+        COLLECTOR.collect()
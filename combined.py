@@ -0,0 +1,104 @@
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from .sources import Source, checksum, register
+from .tracing import span
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
+
+class CombinedXml(Source):
+    """The compounds of Doxygen's single combined XML file, indexed by ID.
+
+    Rather than one XML file per compound (and an index.xml listing them),
+    Doxygen can write every compound to a single combined.xml. The file is
+    streamed once with an incremental parser and each compound the output
+    may need (modules, pages and the classes they list) is kept, as XML, to
+    be parsed when it is rendered. Every other compound (e.g. files and
+    directories) is discarded as soon as it has been read.
+    """
+
+    # The kinds of compound that are kept, any others are discarded
+    KINDS = ("group", "page", "struct", "union", "class")
+
+    def __init__(self, path, kinds=KINDS):
+        super().__init__(path)
+        self.kinds = frozenset(kinds)
+        self.compounds = {}
+        self.compoundkinds = {}
+        self.discarded = 0
+
+    def load(self):
+        """Stream the combined XML file, keeping only the compounds needed."""
+        with span(self.name, "parse"):
+            if etree is not None:
+                events = etree.iterparse(
+                    self.name,
+                    tag="compounddef",
+                    recover=True,
+                    resolve_entities=False,
+                    huge_tree=True,
+                )
+            else:
+                events = ElementTree.iterparse(self.name)
+            tostring = (etree or ElementTree).tostring
+            for _event, element in events:
+                if element.tag != "compounddef":
+                    continue
+                kind = element.get("kind")
+                if kind in self.kinds:
+                    refid = element.get("id")
+                    self.compounds[refid] = tostring(
+                        element, encoding="unicode"
+                    ).strip()
+                    self.compoundkinds[refid] = kind
+                else:
+                    self.discarded += 1
+                # Discard the compound's elements now that it has been read
+                element.clear()
+                if etree is not None:
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+        return self
+
+    def __contains__(self, refid):
+        return refid in self.compounds
+
+    def __len__(self):
+        return len(self.compounds)
+
+    def compound(self, refid):
+        """Return the XML of the given compound's compounddef."""
+        try:
+            return self.compounds[refid]
+        except KeyError:
+            raise FileNotFoundError(f"No compound {refid!r} in {self.name}") from None
+
+    def markup(self, refid):
+        """Return the XML of the given compound, as if it had its own file."""
+        return f"<doxygen>{self.compound(refid)}</doxygen>"
+
+    def stamp(self, refid):
+        """Return the stamp of the given compound's own XML, which only
+        changes when it does rather than when any compound does."""
+        return checksum(self.compound(refid).encode("utf-8"))
+
+    def index(self):
+        """Return the XML of an index of the compounds kept, in order."""
+        compounds = "".join(
+            f"<compound refid={quoteattr(refid)} kind={quoteattr(kind)}>"
+            f"<name>{escape(refid)}</name></compound>"
+            for refid, kind in self.compoundkinds.items()
+        )
+        return f"<doxygenindex>{compounds}</doxygenindex>"
+
+
+def load(path, kinds=CombinedXml.KINDS):
+    """Stream a combined XML file and use it in place of an XML directory.
+
+    The path of the combined XML file then stands in for the directory of
+    compound XML files wherever one is expected, see sources.register."""
+    return register(CombinedXml(path, kinds=kinds).load())
@@ -0,0 +1,110 @@
+from collections import namedtuple
+
+
+class RenderContext(
+    namedtuple(
+        "RenderContext",
+        (
+            "depth",
+            "documentation",
+            "programlisting",
+            "ordered",
+            "ordereddepth",
+            "unordereddepth",
+        ),
+        defaults=(0, False, False, False, 0, 0),
+    )
+):
+    """The options a Node is rendered with.
+
+    depth is the level of any titles, documentation is whether a detailed
+    description is rendered as part of a member's documentation (without
+    its own title), programlisting is whether text is rendered verbatim and
+    ordered, ordereddepth and unordereddepth describe the lists being
+    rendered.
+
+    How the conversion is run (e.g. by how many workers) is kept apart, see
+    Conversion, so the same options always make the same context (e.g. as a
+    cache key) however they are rendered.
+
+    A context is immutable (and hashable) so the same one is shared by
+    every Node rendered with the same options and any change makes a new,
+    derived context rather than copying a dictionary of keyword arguments.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, ctx=None, options=None):
+        """Return the context to render with given a context and/or options.
+
+        Rendering methods still accept the keyword options they used to
+        (e.g. to_asciidoc(depth=2)) and pass them here, where they replace
+        the options of the given context (or the default context)."""
+        if ctx is None:
+            return cls(**options) if options else DEFAULT
+        if options:
+            return ctx._replace(**options)
+        return ctx
+
+    def deeper(self, levels=1):
+        """Return this context with titles the given number of levels deeper."""
+        return self._replace(depth=self.depth + levels)
+
+    def at_depth(self, depth):
+        """Return this context with titles at the given depth."""
+        if depth == self.depth:
+            return self
+        return self.deeper(depth - self.depth)
+
+    def in_documentation(self):
+        """Return this context for a member's detailed documentation."""
+        if self.documentation:
+            return self
+        return self._replace(documentation=True)
+
+    def in_listing(self):
+        """Return this context for the verbatim text of a program listing."""
+        if self.programlisting:
+            return self
+        return self._replace(programlisting=True)
+
+    def in_list(self, ordered):
+        """Return this context for the items of a nested (un)ordered list."""
+        if ordered:
+            return self._replace(ordered=True, ordereddepth=self.ordereddepth + 1)
+        return self._replace(ordered=False, unordereddepth=self.unordereddepth + 1)
+
+    def listdepth(self):
+        """Return the number of lists, ordered or not, being rendered."""
+        return self.ordereddepth + self.unordereddepth
+
+    def options(self):
+        """Return the options of this context as a dictionary, e.g. for JSON."""
+        return self._asdict()
+
+
+class Conversion(
+    namedtuple("Conversion", ("jobs", "model", "store"), defaults=(0, None, None))
+):
+    """How a conversion is run, rather than what is rendered.
+
+    jobs is the number of worker processes rendering the members of large
+    sections (or root modules, see parallel.map_modules), model records how
+    long each module takes to render (see schedule.CostModel) and store
+    shares the compounds rendered by several variants (see
+    variants.CompoundStore).
+
+    Only the root index takes a conversion (see DoxygenindexNode.to_asciidoc):
+    the compounds it renders are only given the number of jobs rendering the
+    members of their sections.
+    """
+
+    __slots__ = ()
+
+
+# The context Nodes are rendered with when given no options
+DEFAULT = RenderContext()
+
+# The conversion run when given none: serially, with no cost model or store
+SERIAL = Conversion()
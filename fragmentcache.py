@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .memory import format_bytes
+
+# The fragment cache in use, or None if fragments aren't cached across runs.
+CACHE = None
+
+# The default maximum size of the rendered fragments kept in a cache.
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# The source files whose code renders fragments: changing any of them must
+# invalidate every cached fragment.
+SOURCES = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    for filename in ("nodes.py", "helpers.py", "context.py")
+)
+
+
+def renderer_digest():
+    """Return a hash of the source code rendering fragments."""
+    sha256 = hashlib.sha256()
+    for source in SOURCES:
+        with open(source, "rb") as file:
+            sha256.update(file.read())
+    return sha256.hexdigest()
+
+
+class FragmentCache:
+    """A SQLite store of rendered fragments that persists across runs.
+
+    Each fragment (e.g. a member's documentation) is keyed by a hash of the
+    XML it was rendered from, its render options and the code rendering it
+    so any change to any of them is a miss. Fragments record when they were
+    last used and, when the cache is closed, the least recently used ones
+    are pruned until the total size of all fragments is below max_size.
+    """
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.renderer = renderer_digest()
+        self.hits = 0
+        self.misses = 0
+        self.used = set()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS fragments ("
+            "key TEXT PRIMARY KEY, asciidoc TEXT NOT NULL, "
+            "size INTEGER NOT NULL, used INTEGER NOT NULL)"
+        )
+
+    def key(self, digest, name, options):
+        """Return the key of a named fragment of the given XML and options."""
+        return hashlib.sha256(
+            "\0".join(
+                (self.renderer, digest, name, json.dumps(options, sort_keys=True))
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key):
+        """Return the fragment with the given key, or None if not cached."""
+        row = self.connection.execute(
+            "SELECT asciidoc FROM fragments WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used.add(key)
+        return row[0]
+
+    def put(self, key, asciidoc):
+        """Store a fragment with the given key."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO fragments VALUES (?, ?, ?, ?)",
+            (key, asciidoc, len(asciidoc.encode("utf-8")), time.time_ns()),
+        )
+
+    def prune(self):
+        """Delete the least recently used fragments until under max_size."""
+        size = self.size()
+        rows = self.connection.execute(
+            "SELECT key, size FROM fragments ORDER BY used, key"
+        ).fetchall()
+        stale = []
+        for key, fragment_size in rows:
+            if size <= self.max_size:
+                break
+            stale.append((key,))
+            size -= fragment_size
+        self.connection.executemany("DELETE FROM fragments WHERE key = ?", stale)
+        return len(stale)
+
+    def size(self):
+        """Return the total size of all fragments in bytes."""
+        return self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM fragments"
+        ).fetchone()[0]
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM fragments").fetchone()[0]
+
+    def flush(self):
+        """Record which fragments were used, prune the cache and commit."""
+        now = time.time_ns()
+        self.connection.executemany(
+            "UPDATE fragments SET used = ? WHERE key = ?",
+            ((now, key) for key in self.used),
+        )
+        self.used.clear()
+        self.prune()
+        self.connection.commit()
+
+    def close(self):
+        """Flush and close the cache."""
+        self.flush()
+        self.connection.close()
+
+    def to_text(self):
+        """Return the hit rate statistics of this run as plain text."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return (
+            f"Fragment cache: {self.hits} hits, {self.misses} misses "
+            f"({rate:.1%} hit rate), {len(self)} fragments, "
+            f"{format_bytes(self.size())}"
+        )
+
+
+def start(path, max_size=DEFAULT_MAX_SIZE):
+    """Start caching fragments in the given SQLite database."""
+    global CACHE  # pylint: disable=global-statement
+    CACHE = FragmentCache(path, max_size=max_size)
+
+
+def stop():
+    """Stop caching fragments and return the statistics of this run."""
+    global CACHE  # pylint: disable=global-statement
+    cache, CACHE = CACHE, None
+    if cache is None:
+        return ""
+    cache.flush()
+    statistics = cache.to_text()
+    cache.close()
+    return statistics
+
+
+def detach():
+    """Stop caching fragments without closing the cache.
+
+    Used by forked worker processes that must leave their parent's connection
+    alone (its fragments are looked up and stored by the parent instead)."""
+    global CACHE  # pylint: disable=global-statement
+    CACHE = None
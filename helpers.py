@@ -1,21 +1,198 @@
+import hashlib
 import re
 
+from bs4.element import NavigableString, PreformattedString
+
+DOUBLE_PARENTHESES = re.compile(r"\(\((.+)\)\)")
+DOUBLE_UNDERSCORE_WORD = re.compile(r"\b(__\w+)")
+WHITESPACE = re.compile(r"\s{2,}|\n")
+UNDERSCORES = re.compile(r"__+")
+
+# The attribute holding an element's cached text, see stripped_text
+TEXT_ATTRIBUTE = "_doxygentoasciidoc_texts"
+
+# The attribute holding a string's escaped and normalized text, see
+# normalize_strings
+NORMALIZED_ATTRIBUTE = "_doxygentoasciidoc_normalized"
+
+# The separator between texts escaped in a single pass, see escape_texts. XML
+# can't contain NUL characters and no escape matches a NUL character or runs
+# across a line break, so no escape can change a separator or run from one
+# text into the next.
+SEPARATOR = "\0\n\0"
+NORMALIZED_SEPARATOR = "\0 \0"
+
+# The elements whose strings are rendered as escaped text (rather than, say,
+# read as a name), see text_strings
+TEXT_ELEMENTS = frozenset(
+    ("briefdescription", "detaileddescription", "inbodydescription", "type")
+)
+
+# The elements whose strings are rendered verbatim, and so never normalized
+VERBATIM_ELEMENTS = frozenset(("programlisting", "verbatim"))
+
 
 def escape_text(text):
     """Escape text so it is safe for use in AsciiDoc."""
-    return re.sub(
-        r"\(\((.+)\)\)",
+    return DOUBLE_PARENTHESES.sub(
         r"\((\1))",
-        re.sub(r"\b(__\w+)", r"++\1++", str(text))
+        DOUBLE_UNDERSCORE_WORD.sub(r"++\1++", str(text))
         .replace("*", "++*++")
         .replace(" \\\n", " ")
         .replace("->", "\\->"),
     )
 
 
+def normalize_text(text):
+    """Escape text and collapse its whitespace as in an HTML document.
+
+    Any run of two or more whitespace characters (including line breaks) or
+    any single line break becomes a single space. This is equivalent to
+    removing whitespace around line breaks, converting line breaks to spaces
+    and then ignoring spaces immediately following another space but in a
+    single pass."""
+    return WHITESPACE.sub(" ", escape_text(text))
+
+
+def escape_texts(texts):
+    """Escape many texts in a single pass, exactly as escape_text would.
+
+    The texts are joined with a separator that no escape can touch, escaped
+    together and split apart again, which is much cheaper than escaping
+    each (typically tiny) text in turn."""
+    texts = [str(text) for text in texts]
+    joined = SEPARATOR.join(texts)
+    if joined.count("\0") != 2 * (len(texts) - 1):
+        return [escape_text(text) for text in texts]
+    return escape_text(joined).split(SEPARATOR)
+
+
+def normalize_texts(texts):
+    """Escape and normalize many texts in a single pass, exactly as
+    normalize_text would, see escape_texts."""
+    texts = [str(text) for text in texts]
+    joined = SEPARATOR.join(texts)
+    if joined.count("\0") != 2 * (len(texts) - 1):
+        return [normalize_text(text) for text in texts]
+    return normalize_text(joined).split(NORMALIZED_SEPARATOR)
+
+
+def text_strings(element):
+    """Return the strings of every description (and type) below an element,
+    i.e. those rendered as escaped text. Strings in a program listing are
+    rendered verbatim so are skipped."""
+    strings = []
+    stack = [(element, False)]
+    while stack:
+        node, rendered = stack.pop()
+        if node.name is None:
+            if rendered:
+                strings.append(node)
+        elif node.name not in VERBATIM_ELEMENTS:
+            rendered = rendered or node.name in TEXT_ELEMENTS
+            stack.extend((child, rendered) for child in reversed(node.contents))
+    return strings
+
+
+def normalize_strings(element):
+    """Escape and normalize the text strings below an element in a single
+    pass, see text_strings.
+
+    The normalized text of each string is cached on the string itself, see
+    normalized_text."""
+    strings = text_strings(element)
+    for string, text in zip(strings, normalize_texts(strings)):
+        string.__dict__[NORMALIZED_ATTRIBUTE] = text
+
+
+def normalized_text(string):
+    """Return the escaped and normalized text of a Beautiful Soup string.
+
+    This is cached by normalize_strings unless the string has been created
+    since (e.g. by merging adjacent strings)."""
+    text = string.__dict__.get(NORMALIZED_ATTRIBUTE)
+    if text is None:
+        return normalize_text(string)
+    return text
+
+
+def stripped_text(element, selector=None):
+    """Return the stripped text of a Beautiful Soup element or its child.
+
+    Both finding the first child with the given name and extracting its text
+    are only done once: the result is cached on the element itself (Beautiful
+    Soup elements hash by their entire markup so can't be used as dictionary
+    keys) and must be discarded with invalidate_text whenever the element is
+    modified. The only place a tree is modified while converting is
+    Node.make_blocks (e.g. when an enum value's brief description is rendered
+    by EnumMemberdefNode.enumerators), which does so."""
+    texts = element.__dict__.setdefault(TEXT_ATTRIBUTE, {})
+    if selector not in texts:
+        if selector:
+            child = next(
+                (child for child in element.contents if child.name == selector), None
+            )
+            texts[selector] = child.get_text(strip=True) if child else None
+        else:
+            texts[selector] = element.get_text(strip=True)
+    return texts[selector]
+
+
+def smooth(element):
+    """Merge every run of adjacent strings among an element's children.
+
+    Unlike Beautiful Soup's Tag.smooth, this doesn't recurse into the
+    element's descendants (so nesting of any depth is fine) and leaves
+    preformatted strings (e.g. comments) alone."""
+    run = []
+    for child in element.contents[:] + [None]:
+        if isinstance(child, NavigableString) and not isinstance(
+            child, PreformattedString
+        ):
+            run.append(child)
+            continue
+        if len(run) > 1:
+            for string in run[1:]:
+                string.extract()
+            run[0].replace_with(NavigableString("".join(run)))
+        run = []
+
+
+def invalidate_text(element):
+    """Discard the cached text of a modified element and its ancestors.
+
+    Moving an element's children around changes which child a selector finds
+    and merging its strings changes its text and that of all its ancestors.
+    Its descendants are only smoothed once they have been modified (and
+    smoothed) themselves so they have no strings left to merge."""
+    while element is not None:
+        element.__dict__.pop(TEXT_ATTRIBUTE, None)
+        element = element.parent
+
+
+def digest(element):
+    """Return a hash of a Beautiful Soup element's entire subtree.
+
+    Only the names, attributes and strings of the subtree are hashed (which
+    is much faster than hashing its serialized markup)."""
+    parts = []
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            parts.append("/")
+        elif node.name is None:
+            parts.append(f"{type(node).__name__}:{node}")
+        else:
+            parts.append(f"<{node.name} {sorted(node.attrs.items())!r}")
+            stack.append(None)
+            stack.extend(reversed(node.contents))
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
 def sanitize(identifier):
     """Escape a Doxygen ID so it is safe to use in AsciiDoc."""
-    return re.sub(r"__+", r"_", identifier)
+    return UNDERSCORES.sub("_", identifier)
 
 
 def title(text, level, attributes=None):
@@ -0,0 +1,43 @@
+import hashlib
+import json
+import os
+
+
+class Manifest:
+    """A record of every output file written, for incremental downstream builds.
+
+    Each output is recorded with the SHA-256 hash of its contents and the
+    input XML files it was generated from so that downstream tools can tell
+    exactly which outputs changed and why. Outputs whose contents haven't
+    changed are not rewritten at all so their modification times are left
+    untouched.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.outputs = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.outputs = json.load(file).get("outputs", {})
+
+    def write(self, output, content, inputs=()):
+        """Write the content to the given output file, if it has changed.
+
+        Return whether the file was written."""
+        sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        self.outputs[output] = {"sha256": sha256, "inputs": sorted(inputs)}
+
+        if os.path.exists(output):
+            with open(output, encoding="utf-8") as file:
+                if file.read() == content:
+                    return False
+
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(content)
+        return True
+
+    def save(self):
+        """Save the manifest as JSON."""
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump({"outputs": self.outputs}, file, indent=2, sort_keys=True)
+            file.write("\n")
@@ -1,8 +1,44 @@
-import re
+import json
+import threading
+import time
+from collections import namedtuple
 
 from bs4 import BeautifulSoup, NavigableString
 
-from .helpers import escape_text, sanitize, title
+from . import collector, fragmentcache, memory, parallel, shards
+from .context import SERIAL, RenderContext
+from .helpers import (
+    digest,
+    escape_text,
+    invalidate_text,
+    normalize_strings,
+    normalized_text,
+    sanitize,
+    smooth,
+    stripped_text,
+    text_strings,
+    title,
+)
+from .parsers import TagFilter, compound_path, compound_stamp, parse_compound
+from .schedule import Rendered
+from .tracing import span, traced
+
+# The attribute marking an element whose children have been made blocks
+BLOCKS_ATTRIBUTE = "_doxygentoasciidoc_blocks"
+
+# The attribute holding the lock of a tree, guarding the changes made to an
+# element's children when it is first rendered in a block context (see
+# Node.contents) so that threads rendering the same tree never see (or make)
+# them halfway through, while threads rendering other trees never wait.
+BLOCKS_LOCK_ATTRIBUTE = "_doxygentoasciidoc_blocks_lock"
+
+# The elements needed to link to a compound from a list of modules or structs
+SUMMARY_FILTER = TagFilter(("title", "compoundname", "briefdescription"))
+
+# The elements needed to build the hierarchy of modules and their summaries
+HIERARCHY_FILTER = TagFilter(
+    ("title", "compoundname", "briefdescription", "innergroup")
+)
 
 
 class Node:
@@ -32,6 +68,19 @@ class Node:
         "verbatim",
     )
 
+    # The AsciiDoc of the inline elements rendered without a Node of their own,
+    # see to_inline_asciidoc: either the AsciiDoc before and after their
+    # contents or the AsciiDoc of an empty element (links are handled apart)
+    INLINE_MARKUP = {
+        "bold": ("*", "*"),
+        "computeroutput": ("`", "`"),
+        "emphasis": ("_", "_"),
+        "mdash": "—",
+        "ndash": "–",
+        "nonbreakablespace": "{nbsp}",
+        "sp": " ",
+    }
+
     def __init__(self, node, position=0, xmldir=None):
         self.node = node
         self.position = position
@@ -44,7 +93,7 @@ class Node:
     def __getitem__(self, item):
         return self.node[item]
 
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **options):
         """Return an AsciiDoc representation of this node.
 
         By default, text nodes will be escaped with whitespace processed as in
@@ -53,29 +102,27 @@ class Node:
         looked up in a mapping of element names to Node subclasses and
         conversion delegated to instances of the appropriate subclass.
 
-        In order to properly handle whitespace, we process child elements as
-        either within an "inline" context (the default) or a "block" context
-        (if at least one of the child elements is considered to be a "block",
-         e.g. a admonition). If we're in a block context, all consecutive
-        inline elements will be combined into a new block element.
+        Subclasses only need to override this if they render something other
+        than their contents (see contents) or their wrapped contents (see
+        wrap), otherwise they are rendered without any recursion, no matter
+        how deeply they are nested.
+
+        Nodes are rendered with a RenderContext but, like every rendering
+        method, this also accepts its options as keyword arguments (e.g.
+        to_asciidoc(depth=2)), see RenderContext.of.
 
         See https://developer.mozilla.org/en-US/docs/Web/API/Document_Object_Model/Whitespace
         """
+        ctx = RenderContext.of(ctx, options)
         if isinstance(self.node, NavigableString):
             if self.node:
-                if kwargs.get("programlisting", False):
+                if ctx.programlisting:
                     return str(self.node)
 
                 # 1. Remove whitespace around a line break
                 # 2. Convert line breaks to spaces
                 # 3. Ignore spaces immediately following another space
-                stripped = re.sub(
-                    r"\s{2,}",
-                    " ",
-                    re.sub(r"\s+\n\s+", "\n", escape_text(self.node)).replace(
-                        "\n", " "
-                    ),
-                )
+                stripped = normalized_text(self.node)
                 # 4. Sequences of spaces at the beginning and end of an element are removed
                 if self.position == 0:
                     stripped = stripped.lstrip()
@@ -88,38 +135,111 @@ class Node:
 
             return ""
 
-        if self.isblockcontext():
-            # Because we're inside a block formatting context, everything must be a block
-            # including any text nodes.
-            para = None
-            children = self.node.contents[:]
-            for child in children:
-                if child.name not in self.BLOCK_LEVEL_NODES:
-                    # Wrap contiguous inline elements into a block
-                    if para:
-                        # If there is already a wrapper, add this inline
-                        # element to it
-                        para.append(child)
-                    else:
-                        # If there isn't already a wrapper, start one by
-                        # wrapping this element in a <para>
-                        para = child.wrap(self.soup().new_tag("para"))
-                elif para and para.get_text(strip=True):
-                    # If there is a wrapper and it isn't empty, prepend it before this block
-                    child.insert_before(para)
-                    para = None
-            if para:
-                # Append any remaining wrapped inline elements at the end
-                self.node.append(para)
-
-            # Combine any adjacent text nodes since we modified the tree
-            self.node.smooth()
-
-            return self.block_separator(**kwargs).join(
-                asciidoc for asciidoc in self.asciidoc_contents(**kwargs) if asciidoc
-            )
+        # Rather than recursing through every element, render the whole tree
+        # with an explicit stack of elements whose children are still being
+        # rendered, along with the AsciiDoc of the children rendered so far.
+        # Only Nodes that override to_asciidoc are rendered by calling it.
+        stack = [(self, ctx, *self.contents(ctx), [])]
+        while True:
+            node, ctx, children, separator, childctx, output = stack[-1]
+            child = next(children, None)
+            if child is not None:
+                if type(child).to_asciidoc is not Node.to_asciidoc or isinstance(
+                    child.node, NavigableString
+                ):
+                    output.append(child.to_asciidoc(childctx))
+                    continue
+                asciidoc = child.to_inline_asciidoc(childctx)
+                if asciidoc is None:
+                    stack.append((child, childctx, *child.contents(childctx), []))
+                else:
+                    output.append(asciidoc)
+                continue
 
-        return "".join(self.asciidoc_contents(**kwargs))
+            stack.pop()
+            if separator is not None:
+                output = [asciidoc for asciidoc in output if asciidoc]
+            asciidoc = node.wrap((separator or "").join(output), ctx)
+            if not stack:
+                return asciidoc
+            stack[-1][-1].append(asciidoc)
+
+    def contents(self, ctx):
+        """Prepare to render the contents of this node in the given context.
+
+        Return an iterator of the child Nodes to render, the separator to put
+        between them (or None to concatenate them, inline) and the context to
+        render them in.
+
+        In order to properly handle whitespace, we process child elements as
+        either within an "inline" context (the default) or a "block" context
+        (if at least one of the child elements is considered to be a "block",
+         e.g. a admonition). If we're in a block context, all consecutive
+        inline elements will be combined into a new block element and empty
+        blocks are skipped."""
+        if self.isblockcontext():
+            # The children only need to be made blocks once, however many
+            # times (or threads) this node is rendered, and the marker is only
+            # set once they have been so there is no need to lock afterwards
+            if BLOCKS_ATTRIBUTE not in self.node.__dict__:
+                with self.tree_lock():
+                    if BLOCKS_ATTRIBUTE not in self.node.__dict__:
+                        self.make_blocks()
+                        self.node.__dict__[BLOCKS_ATTRIBUTE] = True
+
+            return iter(self.children()), self.block_separator(ctx), ctx
+
+        return iter(self.children()), None, ctx
+
+    def tree_lock(self):
+        """Return the lock of the tree this node belongs to, creating it on
+        first use."""
+        root = self.node
+        while root.parent is not None:
+            root = root.parent
+        # setdefault is atomic so threads racing to create it share one lock
+        return root.__dict__.setdefault(BLOCKS_LOCK_ATTRIBUTE, threading.Lock())
+
+    def make_blocks(self):
+        """Wrap every run of inline children of this node in a block.
+
+        This is the only place a tree is modified while converting so any
+        text cached from it is discarded here, see stripped_text."""
+        # Because we're inside a block formatting context, everything must be a block
+        # including any text nodes.
+        para = None
+        paras = []
+        children = self.node.contents[:]
+        for child in children:
+            if child.name not in self.BLOCK_LEVEL_NODES:
+                # Wrap contiguous inline elements into a block
+                if para:
+                    # If there is already a wrapper, add this inline
+                    # element to it
+                    para.append(child)
+                else:
+                    # If there isn't already a wrapper, start one by
+                    # wrapping this element in a <para>
+                    para = child.wrap(self.soup().new_tag("para"))
+                    paras.append(para)
+            elif para and para.get_text(strip=True):
+                # If there is a wrapper and it isn't empty, prepend it before this block
+                child.insert_before(para)
+                para = None
+        if para:
+            # Append any remaining wrapped inline elements at the end
+            self.node.append(para)
+
+        # Combine any adjacent text nodes since we modified the tree (only
+        # those we moved, as the descendants are smoothed when made blocks)
+        smooth(self.node)
+        for para in paras:
+            smooth(para)
+        invalidate_text(self.node)
+
+    def wrap(self, contents, _ctx):
+        """Return the AsciiDoc of this node given that of its contents."""
+        return contents
 
     def soup(self):
         """Return the Beautiful Soup object for this node."""
@@ -128,7 +248,7 @@ class Node:
             node = node.parent
         return node
 
-    def block_separator(self, **_kwargs):
+    def block_separator(self, _ctx=None, **_options):
         """Return the separator to be used between blocks in a block context."""
         return "\n\n"
 
@@ -136,10 +256,6 @@ class Node:
         """Return whether this node is a block context or not based on its children."""
         return any(child.name in self.BLOCK_LEVEL_NODES for child in self.node.children)
 
-    def asciidoc_contents(self, **kwargs):
-        """Return a list of the AsciiDoc contents of this node."""
-        return [child.to_asciidoc(**kwargs) for child in self.children()]
-
     def child(self, selector):
         child = self.node.find(selector, recursive=False)
         if not child:
@@ -178,15 +294,101 @@ class Node:
         ]
 
     def text(self, selector=None):
-        """Return the stripped text of the given child."""
-        if not selector:
-            return self.node.get_text(strip=True)
+        """Return the stripped text of the given child.
 
-        child = self.node.find(selector, recursive=False)
-        if not child:
+        The text of each child is only looked up once, see stripped_text."""
+        return stripped_text(self.node, selector)
+
+    def to_verbatim_asciidoc(self, ctx=None, **options):
+        """Return the text of this node verbatim, as within a program listing.
+
+        This is equivalent to to_asciidoc(programlisting=True) but flattens
+        the text, highlight, ref and sp nodes that make up program listings in
+        a single pass over the tree, without a Node for each element. Any
+        other elements are still delegated to their Node subclass."""
+        ctx = RenderContext.of(ctx, options).in_listing()
+        if self.isblockcontext():
+            return Node.to_asciidoc(self, ctx)
+
+        output = []
+        stack = [iter(self.node.contents)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+            elif child.name is None:
+                output.append(str(child))
+            elif child.name == "sp":
+                output.append(" ")
+            elif child.name in ("highlight", "ref"):
+                stack.append(iter(child.contents))
+            else:
+                output.append(
+                    self.nodefor(child)(child, xmldir=self.xmldir).to_asciidoc(ctx)
+                )
+        return "".join(output)
+
+    def to_inline_asciidoc(self, ctx=None, **options):
+        """Return the AsciiDoc of this node if it only contains inline markup.
+
+        Most paragraphs are text with only a little simple markup (see
+        INLINE_MARKUP) so, like to_verbatim_asciidoc, these are rendered in a
+        single pass over the tree without a Node for each element. If there
+        are any other elements (e.g. a list), or this node renders more than
+        its contents, return None so that it is rendered as usual instead."""
+        ctx = RenderContext.of(ctx, options)
+        cls = type(self)
+        if (
+            cls.to_asciidoc is not Node.to_asciidoc
+            or cls.contents is not Node.contents
+            or cls.wrap is not Node.wrap
+            or ctx.programlisting
+        ):
             return None
 
-        return child.get_text(strip=True)
+        output = []
+        stack = [(iter(enumerate(self.node.contents)), len(self.node.contents), "")]
+        while stack:
+            children, count, suffix = stack[-1]
+            position, child = next(children, (None, None))
+            if child is None:
+                stack.pop()
+                output.append(suffix)
+            elif child.name is None:
+                text = normalized_text(child) if child else ""
+                if position == 0:
+                    text = text.lstrip()
+                if position == count - 1:
+                    text = text.rstrip()
+                output.append(text)
+            else:
+                markup = self.inline_markup(child)
+                if markup is None:
+                    return None
+                if isinstance(markup, str):
+                    output.append(markup)
+                else:
+                    output.append(markup[0])
+                    stack.append(
+                        (
+                            iter(enumerate(child.contents)),
+                            len(child.contents),
+                            markup[1],
+                        )
+                    )
+        return "".join(output)
+
+    def inline_markup(self, element):
+        """Return the AsciiDoc of an empty inline element or that before and
+        after its contents, see INLINE_MARKUP, or None if it isn't inline."""
+        if element.name == "ref":
+            return (
+                f"<<{sanitize(element['refid'])},"
+                f"{escape_text(stripped_text(element))}>>"
+            )
+        if element.name == "ulink":
+            return (f"{element['url']}[", "]")
+        return self.INLINE_MARKUP.get(element.name)
 
     def previous_node(self):
         """Return the previous sibling element to this Node, skipping text nodes."""
@@ -269,381 +471,671 @@ class Node:
 class DoxygenindexNode(Node):
     """Return the AsciiDoc representation from a root Doxygen doxygenindex node."""
 
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = []
-        for module in self.rootmodules():
-            title_ = module.node.text("title")
-            output.append(
-                title(
-                    title_,
-                    depth,
-                    attributes={
-                        **self.attributes(),
-                        "id": module.refid,
-                        "reftext": title_,
-                    },
-                ),
+    def to_asciidoc(self, ctx=None, *, conversion=None, **options):
+        """Return the AsciiDoc of every root module, converted as given (by
+        default, serially), see context.Conversion."""
+        ctx = RenderContext.of(ctx, options)
+        return "\n\n".join(
+            self.modules_to_asciidoc(
+                list(self.rootmodules()), ctx, conversion=conversion
             )
-            briefdescription = module.node.child("briefdescription").to_asciidoc(
-                **kwargs, depth=depth
+        )
+
+    def to_partial(self, shard, count, ctx=None, *, conversion=None, **options):
+        """Return a Partial rendering only the given shard's root modules.
+
+        Root modules are assigned to shards by the size of their (and their
+        descendants') XML, see shards.assign."""
+        ctx = RenderContext.of(ctx, options)
+        modules = list(self.rootmodules())
+        assignment = shards.assign([module.cost() for module in modules], count)
+        positions = [
+            position
+            for position in range(len(modules))
+            if assignment[position] == shard
+        ]
+        outputs = self.modules_to_asciidoc(
+            [modules[position] for position in positions], ctx, conversion=conversion
+        )
+        return shards.Partial(shard, count, len(modules), dict(zip(positions, outputs)))
+
+    def modules_to_asciidoc(self, modules, ctx=None, *, conversion=None, **options):
+        """Return the AsciiDoc of each of the given root modules, in order.
+
+        Modules are rendered by a pool of the conversion's jobs worker
+        processes (if any), see parallel.map_modules. A single module can be
+        split between them so this depends on the number of pieces (each
+        module and each of its descendants, see module_pieces) rather than
+        modules."""
+        ctx = RenderContext.of(ctx, options)
+        conversion = conversion or SERIAL
+        pieces = sum(1 for module in modules for _ in module.walk())
+        if parallel.modules_enabled(pieces, conversion.jobs):
+            return parallel.map_modules(self, modules, ctx, conversion)
+
+        output = []
+        for module in modules:
+            with memory.phase(f"render {module.refid}"):
+                output.append(
+                    self.module_to_asciidoc(module, ctx, conversion=conversion)
+                )
+            collector.collect()
+        return output
+
+    def module_to_asciidoc(self, module, ctx=None, *, conversion=None, **options):
+        """Return the AsciiDoc representation of a root module and its children.
+
+        How long each of its modules took to render is recorded in the
+        conversion's cost model (if any) to estimate how long they take next
+        time, see schedule.CostModel."""
+        ctx = RenderContext.of(ctx, options)
+        conversion = conversion or SERIAL
+        pieces = self.module_pieces(module, ctx)
+        rendered = self.render_pieces(pieces, ctx, conversion)
+        if conversion.model is not None:
+            conversion.model.record_pieces(pieces, rendered)
+        return "\n\n".join(piece.asciidoc for piece in rendered)
+
+    def module_pieces(self, module, ctx):
+        """Return the pieces of a root module, in order, each rendered on its
+        own: the module itself (at no depth, see module_head_to_asciidoc)
+        followed by each of its descendants and their depth."""
+        pieces = [(module, None)]
+        for child in module.children:
+            pieces.extend(child.walk(ctx.depth + 1))
+        return pieces
+
+    def render_pieces(self, pieces, ctx, conversion=SERIAL):
+        """Render the given pieces of a root module, see module_pieces, and
+        return each one's AsciiDoc along with how long it took to render.
+
+        When converting several variants, any piece already rendered by
+        another variant from the same XML is reused from the conversion's
+        store, see variants.CompoundStore."""
+        store = conversion.store
+        rendered = []
+        for group, depth in pieces:
+            if store is None:
+                rendered.append(self.render_piece(group, depth, ctx, conversion))
+                continue
+            options = {
+                "head": depth is None,
+                **(ctx if depth is None else ctx.at_depth(depth)).options(),
+            }
+            rendered.append(
+                store.cached(
+                    self.xmldir,
+                    group.refid,
+                    options,
+                    # pylint: disable-next=cell-var-from-loop
+                    lambda: self.render_piece(group, depth, ctx, conversion),
+                )
             )
-            if briefdescription:
-                output.append(briefdescription)
-            detaileddescription = module.node.child("detaileddescription").to_asciidoc(
-                **kwargs, documentation=True, depth=depth + 1
+        return rendered
+
+    def render_piece(self, group, depth, ctx, conversion=SERIAL):
+        """Render a single piece of a root module, see render_pieces.
+
+        Its number of members and length of text are only measured if the
+        conversion has a cost model to record them in (and are otherwise
+        None) and the tree is discarded before collecting garbage."""
+        started = time.perf_counter()
+        node = group.load()
+        if depth is None:
+            asciidoc = self.module_head_to_asciidoc(group, node, ctx)
+        else:
+            asciidoc = node.to_asciidoc(ctx.at_depth(depth), jobs=conversion.jobs)
+        seconds = time.perf_counter() - started
+        members = text = None
+        if conversion.model is not None:
+            members = sum(
+                len(sectiondef.find_all("memberdef", recursive=False))
+                for sectiondef in node.node.find_all("sectiondef", recursive=False)
             )
-            if detaileddescription:
-                output.append(detaileddescription)
-            table = ['[cols="1,4"]', "|==="]
-            for child in module.children:
-                table.append(child.to_asciidoc_row())
-            table.append("|===")
-            if len(table) > 3:
-                output.append("\n".join(table))
-            for child in module.children:
-                output.append(child.to_asciidoc(**kwargs, depth=depth + 1))
+            text = sum(len(string) for string in text_strings(node.node))
+        del node
+        collector.collect()
+        return Rendered(asciidoc, seconds, members, text)
+
+    def module_head_to_asciidoc(self, module, node, ctx):
+        """Return the AsciiDoc of a root module itself: its title, its
+        descriptions and a table of its descendants."""
+        title_ = node.text("title")
+        output = [
+            title(
+                title_,
+                ctx.depth,
+                attributes={
+                    **self.attributes(),
+                    "id": module.refid,
+                    "reftext": title_,
+                },
+            ),
+        ]
+        briefdescription = node.child("briefdescription").to_asciidoc(ctx)
+        if briefdescription:
+            output.append(briefdescription)
+        detaileddescription = node.child("detaileddescription").to_asciidoc(
+            ctx.deeper().in_documentation()
+        )
+        if detaileddescription:
+            output.append(detaileddescription)
+        table = ['[cols="1,4"]', "|==="]
+        for child in module.children:
+            table.append(child.to_asciidoc_row())
+        table.append("|===")
+        if len(table) > 3:
+            output.append("\n".join(table))
         return "\n\n".join(output)
 
+    def summaries(self):
+        """Return the summary table of the compounds of this index."""
+        return SummaryTable.for_xmldir(self.xmldir)
+
     def rootmodules(self):
         """Return a list of root modules from the Doxygen index.
 
         Traverse the full list of modules from the Doxygen index, building up a
-        hierarchy in memory before returning only the root nodes."""
+        hierarchy in memory before returning only the root nodes.
+
+        Only the summary of each module needed for the hierarchy is parsed
+        here (recording it in the summary table along the way), the full
+        module is only parsed when it is rendered. Everything built here
+        lives until the end of the conversion so it is then frozen, see
+        collector.freeze."""
         groups = {}
+        summaries = SummaryTable.for_xmldir(self.xmldir)
 
-        for compound in self.children("compound", kind="group"):
-            with open(
-                f'{self.xmldir}/{compound["refid"]}.xml', encoding="utf-8"
-            ) as compoundxml:
+        with span("rootmodules", "hierarchy"), memory.phase("hierarchy"):
+            for compound in self.children("compound", kind="group"):
                 doxygenroot = Node(
-                    BeautifulSoup(compoundxml, "xml").doxygen, xmldir=self.xmldir
+                    parse_compound(
+                        self.xmldir, compound["refid"], parse_only=HIERARCHY_FILTER
+                    ).doxygen,
+                    xmldir=self.xmldir,
                 )
-            for compounddef in doxygenroot.children("compounddef", kind="group"):
-                group = groups.setdefault(
-                    compounddef["id"], self.Group(compounddef["id"])
-                )
-                group.node = compounddef
-
-                for innergroup in compounddef.children("innergroup"):
-                    child = groups.setdefault(
-                        innergroup["refid"], self.Group(innergroup["refid"])
+                for compounddef in doxygenroot.children("compounddef", kind="group"):
+                    group = groups.setdefault(
+                        compounddef["id"], self.Group(compounddef["id"], self.xmldir)
                     )
-                    child.parent = group
-                    group.children.append(child)
+                    summaries.record(compounddef)
+
+                    for innergroup in compounddef.children("innergroup"):
+                        child = groups.setdefault(
+                            innergroup["refid"],
+                            self.Group(innergroup["refid"], self.xmldir),
+                        )
+                        child.parent = group
+                        group.children.append(child)
+
+            collector.freeze()
 
         return (group for (refid, group) in groups.items() if group.isroot())
 
     class Group:
         """An inner class to represent the full hierarchy of modules."""
 
-        def __init__(self, refid):
+        def __init__(self, refid, xmldir=None):
             self.refid = refid
+            self.xmldir = xmldir
             self.parent = None
             self.children = []
-            self.node = None
 
         def isroot(self):
             return self.parent is None
 
-        def to_asciidoc(self, depth=0, **kwargs):
-            output = [self.node.to_asciidoc(**kwargs, depth=depth)]
-            for child in self.children:
-                output.append(child.to_asciidoc(**kwargs, depth=depth + 1))
+        def walk(self, depth=0):
+            """Yield this module and its descendants, in order, with their depth.
+
+            The hierarchy is walked with an explicit stack so that however
+            deeply modules are nested, rendering them doesn't recurse."""
+            stack = [(self, depth)]
+            while stack:
+                group, depth = stack.pop()
+                yield group, depth
+                stack.extend((child, depth + 1) for child in reversed(group.children))
+
+        def stamp(self):
+            """Return the stamp of this module's XML, recorded in its summary."""
+            return SummaryTable.for_xmldir(self.xmldir)[self.refid].stamp
+
+        def cost(self):
+            """Estimate the cost of rendering this module and its children.
+
+            The size of each module's XML is recorded in its summary."""
+            summaries = SummaryTable.for_xmldir(self.xmldir)
+            return sum(summaries[group.refid].stamp[1] for group, _ in self.walk())
+
+        def load(self):
+            """Parse and return the full compounddef Node of this module.
+
+            The text of the whole module is escaped in a single batch, see
+            normalize_strings."""
+            doxygen = parse_compound(self.xmldir, self.refid).doxygen
+            normalize_strings(doxygen)
+            return Node(doxygen, xmldir=self.xmldir).child("compounddef")
+
+        def to_asciidoc(self, ctx=None, **options):
+            ctx = RenderContext.of(ctx, options)
+            output = []
+            for group, depth in self.walk(ctx.depth):
+                output.append(group.load().to_asciidoc(ctx.at_depth(depth)))
+                collector.collect()
             return "\n\n".join(output)
 
         def to_asciidoc_row(self, depth=0):
-            indent = "{nbsp}" * 4 * depth
-            briefdescription = self.node.child("briefdescription").to_asciidoc()
             output = []
-            row = (
-                f"|{indent}<<{sanitize(self.refid)},{escape_text(self.node.text('title'))}>>",
-                f"|{briefdescription}",
-            )
-            output.append("\n".join(row))
-            for child in self.children:
-                output.append(child.to_asciidoc_row(depth=depth + 1))
+            for group, level in self.walk(depth):
+                indent = "{nbsp}" * 4 * level
+                summary = SummaryTable.for_xmldir(group.xmldir)[group.refid]
+                row = (
+                    f"|{indent}<<{summary.id},{escape_text(summary.title)}>>",
+                    f"|{summary.briefdescription}",
+                )
+                output.append("\n".join(row))
             return "\n\n".join(output)
 
 
 class GroupNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+    def __init__(self, node, position=0, xmldir=None):
+        super().__init__(node, position=position, xmldir=xmldir)
+        self.__sectiondefs = {}
+
+    @traced("render")
+    def to_asciidoc(self, ctx=None, *, jobs=0, **options):
+        """Return the AsciiDoc of this module, its summary lists and the
+        documentation of its members, rendered by the given number of worker
+        processes in large sections, see SectiondefNode.memberdefs_to_asciidoc."""
         # pylint: disable=too-many-locals,too-many-branches
-        output = [self.__output_title(depth=depth)]
-        briefdescription = self.__output_briefdescription(**kwargs, depth=depth)
+        ctx = RenderContext.of(ctx, options)
+        deeper = ctx.deeper()
+        output = [self.__output_title(ctx)]
+        briefdescription = self.__output_briefdescription(ctx)
         if briefdescription:
             output.append(briefdescription)
-        detaileddescription = self.__output_detaileddescription(
-            **kwargs, depth=depth + 1
-        )
+        detaileddescription = self.__output_detaileddescription(deeper)
         if detaileddescription:
             output.append(detaileddescription)
-        modules = self.__list_modules(**kwargs, depth=depth + 1)
+        modules = self.__list_modules(deeper)
         if modules:
             output.append(modules)
-        macros = self.__list_macros(**kwargs, depth=depth + 1)
+        macros = self.__list_macros(deeper)
         if macros:
             output.append(macros)
-        typedefs = self.__list_typedefs(**kwargs, depth=depth + 1)
+        typedefs = self.__list_typedefs(deeper)
         if typedefs:
             output.append(typedefs)
-        enums = self.__list_enums(**kwargs, depth=depth + 1)
+        enums = self.__list_enums(deeper)
         if enums:
             output.append(enums)
-        functions = self.__list_functions(**kwargs, depth=depth + 1)
+        functions = self.__list_functions(deeper)
         if functions:
             output.append(functions)
-        variables = self.__list_variables(**kwargs, depth=depth + 1)
+        variables = self.__list_variables(deeper)
         if variables:
             output.append(variables)
-        userdefinedsections = self.__list_userdefined_sections(
-            **kwargs, depth=depth + 1
-        )
+        userdefinedsections = self.__list_userdefined_sections(deeper, jobs)
         if userdefinedsections:
             output.append(userdefinedsections)
-        macrodetails = self.__list_macro_details(**kwargs, depth=depth + 1)
+        macrodetails = self.__list_macro_details(deeper, jobs)
         if macrodetails:
             output.append(macrodetails)
-        typedefdetails = self.__list_typedef_details(**kwargs, depth=depth + 1)
+        typedefdetails = self.__list_typedef_details(deeper, jobs)
         if typedefdetails:
             output.append(typedefdetails)
-        enumdetails = self.__list_enum_details(**kwargs, depth=depth + 1)
+        enumdetails = self.__list_enum_details(deeper, jobs)
         if enumdetails:
             output.append(enumdetails)
-        functiondetails = self.__list_function_details(**kwargs, depth=depth + 1)
+        functiondetails = self.__list_function_details(deeper, jobs)
         if functiondetails:
             output.append(functiondetails)
-        variabledetails = self.__list_variable_details(**kwargs, depth=depth + 1)
+        variabledetails = self.__list_variable_details(deeper, jobs)
         if variabledetails:
             output.append(variabledetails)
         return "\n\n".join(output)
 
-    def __output_title(self, depth=0):
+    def __output_title(self, ctx):
         title_ = self.text("title")
-        return title(title_, depth, attributes={**self.attributes(), "reftext": title_})
+        return title(
+            title_, ctx.depth, attributes={**self.attributes(), "reftext": title_}
+        )
 
-    def __output_briefdescription(self, **kwargs):
-        return self.child("briefdescription").to_asciidoc(**kwargs)
+    def __output_briefdescription(self, ctx):
+        return self.child("briefdescription").to_asciidoc(ctx)
 
-    def __output_detaileddescription(self, **kwargs):
-        return self.child("detaileddescription").to_asciidoc(**kwargs)
+    def __output_detaileddescription(self, ctx):
+        return self.child("detaileddescription").to_asciidoc(ctx)
 
-    def __list_modules(self, depth=0, **kwargs):
+    def sectiondefs(self, kind):
+        """Return the sectiondef Nodes of the given kind.
+
+        The same Nodes are returned every time so that anything they compute
+        for the summary lists can be reused by the detailed documentation."""
+        if kind not in self.__sectiondefs:
+            self.__sectiondefs[kind] = self.children("sectiondef", kind=kind)
+        return self.__sectiondefs[kind]
+
+    def __list_modules(self, ctx):
         innergroups = self.children("innergroup")
         if not innergroups:
             return ""
 
-        output = [title("Modules", depth)]
+        output = [title("Modules", ctx.depth)]
         modules = []
         for innergroup in innergroups:
-            modules.append(innergroup.to_asciidoc(**kwargs, depth=depth))
+            modules.append(innergroup.to_asciidoc(ctx))
         output.append("\n".join(modules))
         return "\n\n".join(output)
 
-    def __list_macros(self, **kwargs):
+    def __list_macros(self, ctx):
         output = []
-        for sectiondef in self.children("sectiondef", kind="define"):
-            output.append(sectiondef.to_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("define"):
+            output.append(sectiondef.to_asciidoc(ctx))
         return "\n\n".join(output)
 
-    def __list_enums(self, **kwargs):
+    def __list_enums(self, ctx):
         output = []
-        for sectiondef in self.children("sectiondef", kind="enum"):
-            output.append(sectiondef.to_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("enum"):
+            output.append(sectiondef.to_asciidoc(ctx))
         return "\n\n".join(output)
 
-    def __list_typedefs(self, **kwargs):
+    def __list_typedefs(self, ctx):
         output = []
-        for sectiondef in self.children("sectiondef", kind="typedef"):
-            output.append(sectiondef.to_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("typedef"):
+            output.append(sectiondef.to_asciidoc(ctx))
         return "\n\n".join(output)
 
-    def __list_variables(self, **kwargs):
+    def __list_variables(self, ctx):
         output = []
-        for sectiondef in self.children("sectiondef", kind="var"):
-            output.append(sectiondef.to_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("var"):
+            output.append(sectiondef.to_asciidoc(ctx))
         return "\n\n".join(output)
 
-    def __list_functions(self, **kwargs):
+    def __list_functions(self, ctx):
         output = []
-        for sectiondef in self.children("sectiondef", kind="func"):
-            output.append(sectiondef.to_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("func"):
+            output.append(sectiondef.to_asciidoc(ctx))
         return "\n\n".join(output)
 
-    def __list_userdefined_sections(self, **kwargs):
+    def __list_userdefined_sections(self, ctx, jobs):
         output = []
-        for sectiondef in self.children("sectiondef", kind="user-defined"):
-            output.append(sectiondef.to_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("user-defined"):
+            output.append(sectiondef.to_asciidoc(ctx, jobs=jobs))
         return "\n\n".join(output)
 
-    def __list_typedef_details(self, **kwargs):
+    def __list_typedef_details(self, ctx, jobs):
         output = []
-        for sectiondef in self.children("sectiondef", kind="typedef"):
-            output.append(sectiondef.to_details_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("typedef"):
+            output.append(sectiondef.to_details_asciidoc(ctx, jobs=jobs))
         return "\n\n".join(output)
 
-    def __list_function_details(self, **kwargs):
+    def __list_function_details(self, ctx, jobs):
         output = []
-        for sectiondef in self.children("sectiondef", kind="func"):
-            output.append(sectiondef.to_details_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("func"):
+            output.append(sectiondef.to_details_asciidoc(ctx, jobs=jobs))
         return "\n\n".join(output)
 
-    def __list_enum_details(self, **kwargs):
+    def __list_enum_details(self, ctx, jobs):
         output = []
-        for sectiondef in self.children("sectiondef", kind="enum"):
-            output.append(sectiondef.to_details_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("enum"):
+            output.append(sectiondef.to_details_asciidoc(ctx, jobs=jobs))
         return "\n\n".join(output)
 
-    def __list_variable_details(self, **kwargs):
+    def __list_variable_details(self, ctx, jobs):
         output = []
-        for sectiondef in self.children("sectiondef", kind="var"):
-            output.append(sectiondef.to_details_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("var"):
+            output.append(sectiondef.to_details_asciidoc(ctx, jobs=jobs))
         return "\n\n".join(output)
 
-    def __list_macro_details(self, **kwargs):
+    def __list_macro_details(self, ctx, jobs):
         output = []
-        for sectiondef in self.children("sectiondef", kind="define"):
-            output.append(sectiondef.to_details_asciidoc(**kwargs))
+        for sectiondef in self.sectiondefs("define"):
+            output.append(sectiondef.to_details_asciidoc(ctx, jobs=jobs))
         return "\n\n".join(output)
 
 
 class PageNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+    @traced("render")
+    def to_asciidoc(self, ctx=None, *, jobs=0, **options):
+        """Return the AsciiDoc of this page, which has no members for any jobs
+        to render (unlike a module, see GroupNode.to_asciidoc)."""
+        # pylint: disable=unused-argument
+        ctx = RenderContext.of(ctx, options)
         output = []
 
-        title_ = self.__output_title(depth=depth)
+        title_ = self.__output_title(ctx)
         if title_:
             output.append(title_)
 
-        detaileddescription = self.__output_detaileddescription(**kwargs, depth=depth)
+        detaileddescription = self.__output_detaileddescription(ctx)
         if detaileddescription:
             output.append(detaileddescription)
 
         return "\n\n".join(output)
 
-    def __output_title(self, depth=0):
+    def __output_title(self, ctx):
         title_ = self.text("title")
         if title_:
-            return title(title_, depth, attributes=self.attributes())
+            return title(title_, ctx.depth, attributes=self.attributes())
         return None
 
-    def __output_detaileddescription(self, **kwargs):
-        return self.child("detaileddescription").to_asciidoc(
-            **kwargs, documentation=True
-        )
+    def __output_detaileddescription(self, ctx):
+        return self.child("detaileddescription").to_asciidoc(ctx.in_documentation())
 
 
 class InnergroupNode(Node):
-    def to_asciidoc(self, **kwargs):
-        with open(
-            f"{self.xmldir}/{self.node['refid']}.xml", encoding="utf-8"
-        ) as compoundxml:
-            compounddef = Node(
-                BeautifulSoup(compoundxml, "xml").compounddef, xmldir=self.xmldir
-            )
-            output = [
-                f"<<{compounddef.id},{escape_text(compounddef.text('title'))}>>::"
-            ]
-            briefdescription = compounddef.child("briefdescription").to_asciidoc(
-                **kwargs
-            )
-            if briefdescription:
-                output.append(briefdescription)
-            else:
-                output.append("{empty}")
-            return " ".join(output)
+    def to_asciidoc(self, ctx=None, **_options):
+        summary = SummaryTable.for_xmldir(self.xmldir)[self.node["refid"]]
+        output = [f"<<{summary.id},{escape_text(summary.title)}>>::"]
+        if summary.briefdescription:
+            output.append(summary.briefdescription)
+        else:
+            output.append("{empty}")
+        return " ".join(output)
 
 
 class InnerclassNode(Node):
-    def to_asciidoc(self, **kwargs):
-        with open(
-            f"{self.xmldir}/{self.node['refid']}.xml", encoding="utf-8"
-        ) as compoundxml:
-            compounddef = Node(
-                BeautifulSoup(compoundxml, "xml").compounddef, xmldir=self.xmldir
-            )
-            output = [
-                f"struct <<{compounddef.id},{escape_text(compounddef.text('compoundname'))}>>::"
-            ]
-            briefdescription = compounddef.child("briefdescription").to_asciidoc(
-                **kwargs
-            )
-            if briefdescription:
-                output.append(briefdescription)
-            else:
-                output.append("{empty}")
-            return " ".join(output)
+    def to_asciidoc(self, ctx=None, **_options):
+        summary = SummaryTable.for_xmldir(self.xmldir)[self.node["refid"]]
+        output = [f"struct <<{summary.id},{escape_text(summary.compoundname)}>>::"]
+        if summary.briefdescription:
+            output.append(summary.briefdescription)
+        else:
+            output.append("{empty}")
+        return " ".join(output)
+
+
+class SummaryTable:
+    """A table of everything needed to link to each compound in a directory.
+
+    Listing an inner group or class only needs the sanitized ID, title,
+    compound name and rendered brief description of a compound so these are
+    recorded once per compound (either while building the module hierarchy or
+    on first use) rather than parsing its XML file every time it is listed.
+
+    The table can be saved to a JSON file and loaded again in a later run,
+    discarding any summaries whose XML has changed since (but keeping those
+    whose XML file was only written again, e.g. by another run of Doxygen).
+    """
+
+    Summary = namedtuple(
+        "Summary", ("id", "title", "compoundname", "briefdescription", "stamp")
+    )
+
+    tables = {}
+
+    # Guards the creation of the shared tables, see for_xmldir
+    lock = threading.Lock()
+
+    def __init__(self, xmldir):
+        self.xmldir = xmldir
+        self.summaries = {}
+
+    @classmethod
+    def for_xmldir(cls, xmldir):
+        """Return the shared summary table for the given directory."""
+        key = str(xmldir)
+        table = cls.tables.get(key)
+        if table is None:
+            with cls.lock:
+                table = cls.tables.setdefault(key, cls(xmldir))
+        return table
+
+    @classmethod
+    def reset(cls):
+        """Discard the summary table of every directory, e.g. between tests."""
+        with cls.lock:
+            cls.tables.clear()
+
+    def __getitem__(self, refid):
+        # Whether it is read now or was in a previous run, the output still
+        # depends on this compound
+        compound_path(self.xmldir, refid)
+        summary = self.summaries.get(refid)
+        if summary is None:
+            compounddef = parse_compound(
+                self.xmldir, refid, parse_only=SUMMARY_FILTER
+            ).compounddef
+            summary = self.record(Node(compounddef, xmldir=self.xmldir))
+        return summary
+
+    def __contains__(self, refid):
+        return refid in self.summaries
+
+    def __iter__(self):
+        return iter(self.summaries)
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def record(self, compounddef):
+        """Record the summary of the given compounddef Node."""
+        briefdescription = compounddef.child("briefdescription")
+        summary = self.Summary(
+            compounddef.id,
+            compounddef.text("title"),
+            compounddef.text("compoundname"),
+            briefdescription.to_asciidoc() if briefdescription else "",
+            self.stamp(compounddef["id"]),
+        )
+        self.summaries[compounddef["id"]] = summary
+        return summary
+
+    def stamp(self, refid):
+        """Return the checksum and size of a compound's XML, see Source.stamp."""
+        return compound_stamp(self.xmldir, refid)
+
+    def recorded(self, excluding=()):
+        """Return the fields of every summary recorded (other than those of the
+        given compounds) by compound ID, e.g. to send them from a worker
+        process to its parent, see merge."""
+        return {
+            refid: tuple(summary)
+            for refid, summary in self.summaries.items()
+            if refid not in excluding
+        }
+
+    def merge(self, recorded):
+        """Record the summaries recorded elsewhere (e.g. by a worker process),
+        keeping any already recorded here, see recorded."""
+        for refid, fields in recorded.items():
+            self.summaries.setdefault(refid, self.Summary(*fields))
+
+    def load(self, path):
+        """Load any summaries saved to the given file that are still current."""
+        with open(path, encoding="utf-8") as file:
+            saved = json.load(file)
+        for refid, fields in saved.items():
+            summary = self.Summary(*fields)
+            try:
+                if summary.stamp == self.stamp(refid):
+                    self.summaries[refid] = summary
+            except FileNotFoundError:
+                pass
+
+    def save(self, path):
+        """Save all summaries to the given file."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summaries, file, separators=(",", ":"))
 
 
 class ProgramlistingNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
         output = []
         if "filename" in self.node.attrs:
             output.append(f"// {self.node['filename']}")
         output.append("[source,c,linenums]\n----")
         for codeline in self.children("codeline"):
-            output.append(codeline.to_asciidoc(**kwargs))
+            output.append(codeline.to_verbatim_asciidoc(ctx))
         output.append("----")
         return "\n".join(output)
 
 
 class VerbatimNode(Node):
-    def to_asciidoc(self, **kwargs):
-        kwargs["programlisting"] = True
-        return f"[source,c]\n----\n{super().to_asciidoc(**kwargs)}----"
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        return f"[source,c]\n----\n{self.to_verbatim_asciidoc(ctx)}----"
 
 
 class CodelineNode(Node):
-    def to_asciidoc(self, **kwargs):
-        kwargs["programlisting"] = True
-        return super().to_asciidoc(**kwargs)
+    def to_asciidoc(self, ctx=None, **options):
+        return self.to_verbatim_asciidoc(ctx, **options)
 
 
 class AnchorNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return f"[[{self.id}]]"
 
 
 class SpNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return " "
 
 
 class NdashNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return "–"
 
 
 class MdashNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return "—"
 
 
 class UlinkNode(Node):
-    def to_asciidoc(self, **kwargs):
-        return f"{self.node['url']}[{super().to_asciidoc(**kwargs)}]"
+    def wrap(self, contents, _ctx):
+        return f"{self.node['url']}[{contents}]"
 
 
 class NonbreakablespaceNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return "{nbsp}"
 
 
 class SectNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options).deeper()
         output = []
 
         title_ = self.text("title")
         if title_:
-            output.append(title(title_, depth + 1, attributes=self.attributes()))
+            output.append(title(title_, ctx.depth, attributes=self.attributes()))
 
         for child in self.children(["para", "sect2", "sect3"]):
-            output.append(child.to_asciidoc(**kwargs, depth=depth + 1))
+            output.append(child.to_asciidoc(ctx))
 
         return "\n\n".join(output)
 
 
 class SimplesectNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def contents(self, ctx):
+        if self.node.get("kind") == "par":
+            return iter(self.children("para")), "\n\n", ctx
+
+        return super().contents(ctx)
+
+    def wrap(self, contents, _ctx):
         previous_node = self.previous_node()
         next_node = self.next_node()
         kind = self.node.get("kind")
@@ -656,7 +1148,7 @@ class SimplesectNode(Node):
                 and previous_node.get("kind") == "see"
             ):
                 output.append("--\n*See also*\n\n")
-            output.append(super().to_asciidoc(**kwargs))
+            output.append(contents)
             if not (
                 next_node
                 and next_node.name == "simplesect"
@@ -666,7 +1158,7 @@ class SimplesectNode(Node):
             return "".join(output)
 
         if kind == "return":
-            return f"--\n*Returns*\n\n{super().to_asciidoc(**kwargs)}\n--"
+            return f"--\n*Returns*\n\n{contents}\n--"
 
         if kind == "note":
             output = []
@@ -676,7 +1168,7 @@ class SimplesectNode(Node):
                 and previous_node.get("kind") == "note"
             ):
                 output.append("[NOTE]\n====\n")
-            output.append(super().to_asciidoc(**kwargs))
+            output.append(contents)
             if not (
                 next_node
                 and next_node.name == "simplesect"
@@ -692,52 +1184,49 @@ class SimplesectNode(Node):
             title_ = self.text("title")
             if title_:
                 output.append(f"*{escape_text(title_)}*")
-
-            for para in self.children("para"):
-                asciidoc = para.to_asciidoc(**kwargs)
-                if asciidoc:
-                    output.append(asciidoc)
+            if contents:
+                output.append(contents)
 
             return "\n\n".join(output)
 
-        return super().to_asciidoc(**kwargs)
+        return contents
 
 
 class ParameterlistNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def wrap(self, contents, _ctx):
         if self.node["kind"] == "param":
             return "".join(
                 (
                     "*Parameters*\n\n",
                     "[horizontal]\n",
-                    super().to_asciidoc(**kwargs),
+                    contents,
                 )
             )
 
-        return super().to_asciidoc(**kwargs)
+        return contents
 
-    def block_separator(self, **_kwargs):
+    def block_separator(self, _ctx=None, **_options):
         return "\n"
 
 
 class ParameternamelistNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return f"`{escape_text(self.text('parametername'))}`::"
 
 
 class ParameterdescriptionNode(Node):
-    def to_asciidoc(self, **kwargs):
-        output = super().to_asciidoc(**kwargs)
-        if not output:
+    def wrap(self, contents, _ctx):
+        if not contents:
             return "{empty}"
 
-        return output
+        return contents
 
 
 class RefNode(Node):
-    def to_asciidoc(self, **kwargs):
-        if kwargs.get("programlisting", False):
-            return super().to_asciidoc(**kwargs)
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        if ctx.programlisting:
+            return super().to_asciidoc(ctx)
 
         return f"<<{self.refid},{escape_text(self.text())}>>"
 
@@ -747,87 +1236,82 @@ class RefNode(Node):
 
 
 class EmphasisNode(Node):
-    def to_asciidoc(self, **kwargs):
-        return f"_{super().to_asciidoc(**kwargs)}_"
+    def wrap(self, contents, _ctx):
+        return f"_{contents}_"
 
 
 class BoldNode(Node):
-    def to_asciidoc(self, **kwargs):
-        return f"*{super().to_asciidoc(**kwargs)}*"
+    def wrap(self, contents, _ctx):
+        return f"*{contents}*"
 
 
 class CopyrightNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return "©"
 
 
 class ComputeroutputNode(Node):
-    def to_asciidoc(self, **kwargs):
-        return f"`{super().to_asciidoc(**kwargs)}`"
+    def wrap(self, contents, _ctx):
+        return f"`{contents}`"
 
 
 class ItemizedlistNode(Node):
-    def to_asciidoc(self, **kwargs):
-        kwargs["ordered"] = False
-        kwargs["unordereddepth"] = kwargs.get("unordereddepth", 0) + 1
-        return super().to_asciidoc(**kwargs)
+    def contents(self, ctx):
+        return super().contents(ctx.in_list(ordered=False))
 
 
 class OrderedlistNode(Node):
-    def to_asciidoc(self, **kwargs):
-        kwargs["ordered"] = True
-        kwargs["ordereddepth"] = kwargs.get("ordereddepth", 0) + 1
-        return super().to_asciidoc(**kwargs)
+    def contents(self, ctx):
+        return super().contents(ctx.in_list(ordered=True))
 
 
 class ListitemNode(Node):
-    def to_asciidoc(self, **kwargs):
-        if kwargs.get("ordered", False):
-            marker = "." * kwargs.get("ordereddepth", 1)
+    def wrap(self, contents, ctx):
+        if ctx.ordered:
+            marker = "." * (ctx.ordereddepth or 1)
         else:
-            marker = "*" * kwargs.get("unordereddepth", 1)
-        if kwargs.get("ordereddepth", 0) + kwargs.get("unordereddepth", 0) == 1:
-            return f"{marker} {{empty}}\n+\n--\n{super().to_asciidoc(**kwargs)}\n--"
-        return f"{marker} {{empty}}\n+\n{super().to_asciidoc(**kwargs)}"
+            marker = "*" * (ctx.unordereddepth or 1)
+        if ctx.listdepth() == 1:
+            return f"{marker} {{empty}}\n+\n--\n{contents}\n--"
+        return f"{marker} {{empty}}\n+\n{contents}"
 
-    def block_separator(self, **kwargs):
-        if kwargs.get("ordereddepth", 0) + kwargs.get("unordereddepth", 0) == 1:
+    def block_separator(self, ctx=None, **options):
+        if RenderContext.of(ctx, options).listdepth() == 1:
             return "\n\n"
         return "\n+\n"
 
 
 class LinebreakNode(Node):
-    def to_asciidoc(self, **kwargs):
+    def to_asciidoc(self, ctx=None, **_options):
         return " +\n"
 
 
 class TableNode(Node):
-    def to_asciidoc(self, **kwargs):
-        return f"|===\n{super().to_asciidoc(**kwargs)}\n|==="
+    def wrap(self, contents, _ctx):
+        return f"|===\n{contents}\n|==="
 
 
 class RowNode(Node):
-    def block_separator(self, **_kwargs):
+    def block_separator(self, _ctx=None, **_options):
         if self.position == 0:
             return " "
         return "\n"
 
 
 class EntryNode(Node):
-    def to_asciidoc(self, **kwargs):
-        return f"|{super().to_asciidoc(**kwargs)}"
+    def wrap(self, contents, _ctx):
+        return f"|{contents}"
 
 
 class DetaileddescriptionNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+    def wrap(self, contents, ctx):
         output = []
-        contents = super().to_asciidoc(**kwargs, depth=depth)
         if contents:
-            if not kwargs.get("documentation", False):
+            if not ctx.documentation:
                 output.append(
                     title(
                         "Detailed Description",
-                        depth,
+                        ctx.depth,
                         attributes=self.attributes(),
                     )
                 )
@@ -836,21 +1320,84 @@ class DetaileddescriptionNode(Node):
         return ""
 
 
-class FunctionMemberdefNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title(self.text("name"), depth, attributes=self.attributes())]
+class MemberdefNode(Node):
+    """The base class of all memberdefs, able to render shared fragments once.
+
+    A group lists each of its members in a summary and then again in its
+    detailed documentation, and both need the same rendered children (e.g. a
+    member's type or brief description). Each is rendered once (for a given
+    set of render options) and kept as a fragment to be used by both."""
+
+    # The fragments rendered as within a program listing
+    VERBATIM_FRAGMENTS = ("initializer",)
+
+    def __init__(self, node, position=0, xmldir=None):
+        super().__init__(node, position=position, xmldir=xmldir)
+        self.__fragments = {}
+        self.__digest = None
+
+    def digest(self):
+        """Return a hash of this memberdef's XML, computed only once.
+
+        It must first be called before anything in this memberdef is
+        rendered (and the tree modified while rendering) so that it is the
+        same in every run, see SectiondefNode.memberdefs."""
+        if self.__digest is None:
+            self.__digest = digest(self.node)
+        return self.__digest
+
+    def cached(self, name, options, render):
+        """Return the named fragment from the fragment cache, if enabled.
+
+        On a miss, the fragment is rendered by calling render and stored."""
+        cache = fragmentcache.CACHE
+        if cache is None:
+            return render()
+        key = cache.key(self.digest(), name, options)
+        asciidoc = cache.get(key)
+        if asciidoc is None:
+            asciidoc = render()
+            cache.put(key, asciidoc)
+        return asciidoc
+
+    def fragment(self, selector, ctx=None, **options):
+        """Return the AsciiDoc of the given child, rendering it only once.
+
+        The summary and the detailed documentation render members at
+        different depths but depth only changes the titles of sections, which
+        Doxygen never puts in a type, initializer or brief description, so
+        fragments are shared across depths."""
+        ctx = RenderContext.of(ctx, options).at_depth(0)
+        key = (selector, ctx)
+        if key not in self.__fragments:
+            child = self.child(selector)
+            if selector in self.VERBATIM_FRAGMENTS:
+                render = child.to_verbatim_asciidoc
+            else:
+                render = child.to_asciidoc
+            self.__fragments[key] = self.cached(
+                selector, ctx.options(), lambda: render(ctx)
+            )
+        return self.__fragments[key]
+
+
+class FunctionMemberdefNode(MemberdefNode):
+    @traced("render")
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title(self.text("name"), ctx.depth, attributes=self.attributes())]
         if self.node["static"] == "yes":
             definition = ["[.memname]`static "]
         else:
             definition = ["[.memname]`"]
-        definition.append(self.child("type").to_asciidoc(**kwargs, depth=depth))
+        definition.append(self.fragment("type", ctx))
         definition.append(f" {escape_text(self.text('name'))} ")
         params = self.children("param")
         if params:
             args = []
             for param in params:
                 arg = []
-                arg.append(param.child("type").to_asciidoc(**kwargs, depth=depth))
+                arg.append(param.child("type").to_asciidoc(ctx))
                 declname = param.text("declname")
                 if declname:
                     arg.append(escape_text(declname))
@@ -866,86 +1413,121 @@ class FunctionMemberdefNode(Node):
             definition.append(", ".join(suffix))
         definition.append("`")
         output.append("".join(definition))
-        briefdescription = self.child("briefdescription").to_asciidoc(
-            **kwargs, depth=depth
-        )
+        briefdescription = self.fragment("briefdescription", ctx)
         if briefdescription:
             output.append(briefdescription)
         detaileddescription = self.child("detaileddescription").to_asciidoc(
-            **kwargs, depth=depth + 1, documentation=True
+            ctx.deeper().in_documentation()
         )
         if detaileddescription:
             output.append(detaileddescription)
         return "\n\n".join(output)
 
 
-class TypedefMemberdefNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title(self.text("name"), depth, attributes=self.attributes())]
+class TypedefMemberdefNode(MemberdefNode):
+    @traced("render")
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title(self.text("name"), ctx.depth, attributes=self.attributes())]
         output.append(f"[.memname]`{escape_text(self.text('definition'))}`")
-        briefdescription = self.child("briefdescription").to_asciidoc(
-            **kwargs, depth=depth
-        )
+        briefdescription = self.fragment("briefdescription", ctx)
         if briefdescription:
             output.append(briefdescription)
         detaileddescription = self.child("detaileddescription").to_asciidoc(
-            **kwargs, depth=depth + 1, documentation=True
+            ctx.deeper().in_documentation()
         )
         if detaileddescription:
             output.append(detaileddescription)
         return "\n\n".join(output)
 
 
-class EnumMemberdefNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+class EnumMemberdefNode(MemberdefNode):
+    Enumerator = namedtuple(
+        "Enumerator", ("id", "name", "initializer", "hasbrief", "briefdescription")
+    )
+
+    def __init__(self, node, position=0, xmldir=None):
+        super().__init__(node, position=position, xmldir=xmldir)
+        self.__enumerators = {}
+
+    @traced("render")
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
         name = self.text("name")
-        output = [title(name or "anonymous enum", depth, attributes=self.attributes())]
+        output = [
+            title(name or "anonymous enum", ctx.depth, attributes=self.attributes())
+        ]
         if name:
             output.append(f"[.memname]`enum {escape_text(name)}`")
         else:
             output.append("[.memname]`anonymous enum`")
-        briefdescription = self.child("briefdescription").to_asciidoc(
-            **kwargs, depth=depth
-        )
+        briefdescription = self.fragment("briefdescription", ctx)
         if briefdescription:
             output.append(briefdescription)
         detaileddescription = self.child("detaileddescription").to_asciidoc(
-            **kwargs, depth=depth + 1, documentation=True
+            ctx.deeper().in_documentation()
         )
         if detaileddescription:
             output.append(detaileddescription)
 
-        enumvalues_with_descriptions = self.children(
-            lambda tag: tag.name == "enumvalue"
-            and tag.briefdescription.get_text(strip=True)
-        )
-        if enumvalues_with_descriptions:
+        enumerators = [
+            enumerator for enumerator in self.enumerators(ctx) if enumerator.hasbrief
+        ]
+        if enumerators:
             table = [".Enumerator"]
             table.append('[cols="h,1"]')
             table.append("|===")
             rows = []
-            for enumvalue in enumvalues_with_descriptions:
-                row = [f"|[[{enumvalue.id}]]{enumvalue.text('name')}"]
-                briefdescription = enumvalue.child("briefdescription").to_asciidoc(
-                    **kwargs
-                )
-                row.append(f"|{briefdescription}")
+            for enumerator in enumerators:
+                row = [f"|[[{enumerator.id}]]{enumerator.name}"]
+                row.append(f"|{enumerator.briefdescription}")
                 rows.append("\n".join(row))
             table.append("\n\n".join(rows))
             table.append("|===")
             output.append("\n".join(table))
         return "\n\n".join(output)
 
+    def enumerators(self, ctx=None, **options):
+        """Return a compact list of this enum's values.
+
+        Both the list of enumerations and the enumeration's own documentation
+        need every value so they are compiled once (for a given set of render
+        options) and shared between them. The documentation renders the enum
+        a level deeper than the list but, as with fragment, depth never
+        changes a brief description so enumerators are shared across depths."""
+        ctx = RenderContext.of(ctx, options).at_depth(0)
+        if ctx not in self.__enumerators:
+            enumerators = []
+            for enumvalue in self.children("enumvalue"):
+                hasbrief = bool(enumvalue.text("briefdescription"))
+                enumerators.append(
+                    self.Enumerator(
+                        enumvalue.id,
+                        enumvalue.text("name"),
+                        enumvalue.text("initializer"),
+                        hasbrief,
+                        (
+                            enumvalue.child("briefdescription").to_asciidoc(ctx)
+                            if hasbrief
+                            else ""
+                        ),
+                    )
+                )
+            self.__enumerators[ctx] = enumerators
+        return self.__enumerators[ctx]
 
-class VariableMemberdefNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+
+class VariableMemberdefNode(MemberdefNode):
+    @traced("render")
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
         name = self.text("name") or self.text("qualifiedname")
         output = [
-            title(name, depth, attributes=self.attributes()),
+            title(name, ctx.depth, attributes=self.attributes()),
         ]
         definition = self.text("definition")
         if self.text("initializer"):
-            initializer = self.child("initializer").to_asciidoc(programlisting=True)
+            initializer = self.fragment("initializer")
             output.append(
                 "\n".join(
                     (
@@ -958,22 +1540,22 @@ class VariableMemberdefNode(Node):
             )
         else:
             output.append(f"[.memname]`{escape_text(definition)}`")
-        briefdescription = self.child("briefdescription").to_asciidoc(
-            **kwargs, depth=depth
-        )
+        briefdescription = self.fragment("briefdescription", ctx)
         if briefdescription:
             output.append(briefdescription)
         detaileddescription = self.child("detaileddescription").to_asciidoc(
-            **kwargs, depth=depth + 1, documentation=True
+            ctx.deeper().in_documentation()
         )
         if detaileddescription:
             output.append(detaileddescription)
         return "\n\n".join(output)
 
 
-class DefineMemberdefNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title(self.text("name"), depth, attributes=self.attributes())]
+class DefineMemberdefNode(MemberdefNode):
+    @traced("render")
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title(self.text("name"), ctx.depth, attributes=self.attributes())]
         name = self.text("name")
         params = [param.text() for param in self.children("param")]
         if params:
@@ -981,7 +1563,7 @@ class DefineMemberdefNode(Node):
         else:
             argsstring = ""
         if self.text("initializer"):
-            initializer = self.child("initializer").to_asciidoc(programlisting=True)
+            initializer = self.fragment("initializer")
             if "\n" in initializer:
                 output.append(
                     "\n".join(
@@ -1002,50 +1584,120 @@ class DefineMemberdefNode(Node):
             output.append(
                 f"[.memname]`#define {escape_text(name)}{escape_text(argsstring)}`"
             )
-        briefdescription = self.child("briefdescription").to_asciidoc(
-            **kwargs, depth=depth
-        )
+        briefdescription = self.fragment("briefdescription", ctx)
         if briefdescription:
             output.append(briefdescription)
         detaileddescription = self.child("detaileddescription").to_asciidoc(
-            **kwargs, depth=depth + 1, documentation=True
+            ctx.deeper().in_documentation()
         )
         if detaileddescription:
             output.append(detaileddescription)
         return "\n\n".join(output)
 
 
-class FunctionSectiondefNode(Node):
-    def to_details_asciidoc(self, depth=0, **kwargs):
-        memberdefs = self.children("memberdef", kind="function")
+class SectiondefNode(Node):
+    """The base class of the sectiondefs listing members of a single kind."""
+
+    # The kind of memberdef listed, or None for all memberdefs
+    MEMBERDEF_KIND = None
+
+    def __init__(self, node, position=0, xmldir=None):
+        super().__init__(node, position=position, xmldir=xmldir)
+        self.__memberdefs = None
+
+    def memberdefs(self):
+        """Return the memberdef Nodes, the same Nodes every time.
+
+        Both the summary and the detailed documentation use these Nodes so
+        that they can share any fragments rendered by either. If the fragment
+        cache is enabled, each memberdef's digest is taken here, before
+        either renders (e.g. the summary of an enum renders the briefs of its
+        enumvalues, which modifies them)."""
+        if self.__memberdefs is None:
+            if self.MEMBERDEF_KIND:
+                self.__memberdefs = self.children("memberdef", kind=self.MEMBERDEF_KIND)
+            else:
+                self.__memberdefs = self.children("memberdef")
+            if fragmentcache.CACHE is not None:
+                for memberdef in self.__memberdefs:
+                    memberdef.digest()
+        return self.__memberdefs
+
+    def memberdefs_to_asciidoc(self, memberdefs, ctx=None, *, jobs=0, **options):
+        """Return the AsciiDoc of each of the given memberdefs, in order.
+
+        Members are served from the fragment cache (if enabled) and only the
+        rest are rendered, in chunks by a pool of the given number of worker
+        processes (if any) in sections with at least parallel.THRESHOLD of
+        them."""
+        ctx = RenderContext.of(ctx, options)
+        cache = fragmentcache.CACHE
+        if cache is None:
+            keys = outputs = [None] * len(memberdefs)
+        else:
+            keys = [
+                cache.key(memberdef.digest(), "memberdef", ctx.options())
+                for memberdef in memberdefs
+            ]
+            outputs = [cache.get(key) for key in keys]
+        misses = [position for position, output in enumerate(outputs) if output is None]
+        if parallel.enabled(len(misses), jobs):
+            rendered = parallel.map_chunks(
+                self.render_memberdefs,
+                [memberdefs[position] for position in misses],
+                ctx,
+                jobs=jobs,
+            )
+        else:
+            rendered = self.render_memberdefs(
+                [memberdefs[position] for position in misses], ctx
+            )
+        outputs = list(outputs)
+        for position, asciidoc in zip(misses, rendered):
+            outputs[position] = asciidoc
+            if cache is not None:
+                cache.put(keys[position], asciidoc)
+        return outputs
+
+    @staticmethod
+    def render_memberdefs(memberdefs, ctx):
+        """Return the AsciiDoc of each of the given memberdefs."""
+        return [memberdef.to_asciidoc(ctx) for memberdef in memberdefs]
+
+
+class FunctionSectiondefNode(SectiondefNode):
+    MEMBERDEF_KIND = "function"
+
+    def to_details_asciidoc(self, ctx=None, *, jobs=0, **options):
+        ctx = RenderContext.of(ctx, options)
+        memberdefs = self.memberdefs()
         if not memberdefs:
             return ""
 
-        output = [title("Function Documentation", depth)]
-        functions = []
-        for memberdef in sorted(
-            memberdefs, key=lambda memberdef: memberdef.text("name")
-        ):
-            functions.append(memberdef.to_asciidoc(**kwargs, depth=depth + 1))
+        output = [title("Function Documentation", ctx.depth)]
+        functions = self.memberdefs_to_asciidoc(
+            sorted(memberdefs, key=lambda memberdef: memberdef.text("name")),
+            ctx.deeper(),
+            jobs=jobs,
+        )
         output.append("\n\n".join(functions))
         return "\n\n".join(output)
 
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title("Functions", depth)]
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title("Functions", ctx.depth)]
         functions = []
-        for memberdef in self.children("memberdef", kind="function"):
+        for memberdef in self.memberdefs():
             if memberdef["static"] == "yes":
                 function = ["`static "]
             else:
                 function = ["`"]
-            function.append(memberdef.child("type").to_asciidoc(**kwargs, depth=depth))
+            function.append(memberdef.fragment("type", ctx))
             function.append(
                 f" <<{memberdef.id},{escape_text(memberdef.text('name'))}>> "
             )
             function.append(f"{escape_text(memberdef.text('argsstring'))}`:: ")
-            briefdescription = memberdef.child("briefdescription").to_asciidoc(
-                **kwargs, depth=depth
-            )
+            briefdescription = memberdef.fragment("briefdescription", ctx)
             if briefdescription:
                 function.append(briefdescription)
             else:
@@ -1055,30 +1707,30 @@ class FunctionSectiondefNode(Node):
         return "\n\n".join(output)
 
 
-class TypedefSectiondefNode(Node):
-    def to_details_asciidoc(self, depth=0, **kwargs):
-        memberdefs = self.children("memberdef", kind="typedef")
+class TypedefSectiondefNode(SectiondefNode):
+    MEMBERDEF_KIND = "typedef"
+
+    def to_details_asciidoc(self, ctx=None, *, jobs=0, **options):
+        ctx = RenderContext.of(ctx, options)
+        memberdefs = self.memberdefs()
         if not memberdefs:
             return ""
-        output = [title("Typedef Documentation", depth)]
-        typedefs = []
-        for memberdef in memberdefs:
-            typedefs.append(memberdef.to_asciidoc(**kwargs, depth=depth + 1))
+        output = [title("Typedef Documentation", ctx.depth)]
+        typedefs = self.memberdefs_to_asciidoc(memberdefs, ctx.deeper(), jobs=jobs)
         output.append("\n".join(typedefs))
         return "\n\n".join(output)
 
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title("Typedefs", depth)]
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title("Typedefs", ctx.depth)]
         typedefs = []
-        for memberdef in self.children("memberdef", kind="typedef"):
-            type_ = memberdef.child("type").to_asciidoc(**kwargs, depth=depth)
+        for memberdef in self.memberdefs():
+            type_ = memberdef.fragment("type", ctx)
             typedef = [
                 f"`typedef {type_} <<{memberdef.id},{escape_text(memberdef.text('name'))}>>"
                 f"{escape_text(memberdef.text('argsstring'))}`::"
             ]
-            briefdescription = memberdef.child("briefdescription").to_asciidoc(
-                **kwargs, depth=depth
-            )
+            briefdescription = memberdef.fragment("briefdescription", ctx)
             if briefdescription:
                 typedef.append(briefdescription)
             else:
@@ -1088,23 +1740,25 @@ class TypedefSectiondefNode(Node):
         return "\n\n".join(output)
 
 
-class EnumSectiondefNode(Node):
-    def to_details_asciidoc(self, depth=0, **kwargs):
-        memberdefs = self.children("memberdef", kind="enum")
+class EnumSectiondefNode(SectiondefNode):
+    MEMBERDEF_KIND = "enum"
+
+    def to_details_asciidoc(self, ctx=None, *, jobs=0, **options):
+        ctx = RenderContext.of(ctx, options)
+        memberdefs = self.memberdefs()
         if not memberdefs:
             return ""
 
-        output = [title("Enumeration Type Documentation", depth)]
-        enums = []
-        for memberdef in memberdefs:
-            enums.append(memberdef.to_asciidoc(**kwargs, depth=depth + 1))
+        output = [title("Enumeration Type Documentation", ctx.depth)]
+        enums = self.memberdefs_to_asciidoc(memberdefs, ctx.deeper(), jobs=jobs)
         output.append("\n".join(enums))
         return "\n\n".join(output)
 
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title("Enumerations", depth)]
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title("Enumerations", ctx.depth)]
         enums = []
-        for memberdef in self.children("memberdef", kind="enum"):
+        for memberdef in self.memberdefs():
             enum = []
             name = memberdef.text("name")
             if name:
@@ -1115,22 +1769,17 @@ class EnumSectiondefNode(Node):
             else:
                 enum.append("`enum { ")
             enumvalues = []
-            for enumvalue in memberdef.children("enumvalue"):
-                if enumvalue.text("briefdescription"):
-                    value = [
-                        f"<<{enumvalue.id},{escape_text(enumvalue.text('name'))}>>"
-                    ]
+            for enumerator in memberdef.enumerators(ctx):
+                if enumerator.hasbrief:
+                    value = [f"<<{enumerator.id},{escape_text(enumerator.name)}>>"]
                 else:
-                    value = [escape_text(enumvalue.text("name"))]
-                initializer = enumvalue.text("initializer")
-                if initializer:
-                    value.append(escape_text(initializer))
+                    value = [escape_text(enumerator.name)]
+                if enumerator.initializer:
+                    value.append(escape_text(enumerator.initializer))
                 enumvalues.append(" ".join(value))
             enum.append(", ".join(enumvalues))
             enum.append(" }`:: ")
-            briefdescription = memberdef.child("briefdescription").to_asciidoc(
-                **kwargs, depth=depth
-            )
+            briefdescription = memberdef.fragment("briefdescription", ctx)
             if briefdescription:
                 enum.append(briefdescription)
             else:
@@ -1140,23 +1789,25 @@ class EnumSectiondefNode(Node):
         return "\n\n".join(output)
 
 
-class DefineSectiondefNode(Node):
-    def to_details_asciidoc(self, depth=0, **kwargs):
-        memberdefs = self.children("memberdef", kind="define")
+class DefineSectiondefNode(SectiondefNode):
+    MEMBERDEF_KIND = "define"
+
+    def to_details_asciidoc(self, ctx=None, *, jobs=0, **options):
+        ctx = RenderContext.of(ctx, options)
+        memberdefs = self.memberdefs()
         if not memberdefs:
             return ""
 
-        output = [title("Macro Definition Documentation", depth)]
-        macros = []
-        for memberdef in memberdefs:
-            macros.append(memberdef.to_asciidoc(**kwargs, depth=depth + 1))
+        output = [title("Macro Definition Documentation", ctx.depth)]
+        macros = self.memberdefs_to_asciidoc(memberdefs, ctx.deeper(), jobs=jobs)
         output.append("\n".join(macros))
         return "\n\n".join(output)
 
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title("Macros", depth)]
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title("Macros", ctx.depth)]
         macros = []
-        for memberdef in self.children("memberdef", kind="define"):
+        for memberdef in self.memberdefs():
             params = [param.text() for param in memberdef.children("param")]
             if params:
                 argsstring = f"({', '.join(params)})"
@@ -1167,9 +1818,7 @@ class DefineSectiondefNode(Node):
                 f"{escape_text(argsstring)}"
             ]
             if memberdef.text("initializer"):
-                initializer = memberdef.child("initializer").to_asciidoc(
-                    programlisting=True
-                )
+                initializer = memberdef.fragment("initializer")
                 if "\n" not in initializer:
                     macro.append(f" {escape_text(initializer)}`")
                 else:
@@ -1181,25 +1830,27 @@ class DefineSectiondefNode(Node):
         return "\n\n".join(output)
 
 
-class VariableSectiondefNode(Node):
-    def to_details_asciidoc(self, depth=0, **kwargs):
-        memberdefs = self.children("memberdef", kind="variable")
+class VariableSectiondefNode(SectiondefNode):
+    MEMBERDEF_KIND = "variable"
+
+    def to_details_asciidoc(self, ctx=None, *, jobs=0, **options):
+        ctx = RenderContext.of(ctx, options)
+        memberdefs = self.memberdefs()
         if not memberdefs:
             return ""
 
-        output = [title("Variable Documentation", depth)]
-        variables = []
-        for memberdef in memberdefs:
-            variables.append(memberdef.to_asciidoc(**kwargs, depth=depth + 1))
+        output = [title("Variable Documentation", ctx.depth)]
+        variables = self.memberdefs_to_asciidoc(memberdefs, ctx.deeper(), jobs=jobs)
         output.append("\n".join(variables))
         return "\n\n".join(output)
 
-    def to_asciidoc(self, depth=0, **kwargs):
-        output = [title("Variables", depth)]
+    def to_asciidoc(self, ctx=None, **options):
+        ctx = RenderContext.of(ctx, options)
+        output = [title("Variables", ctx.depth)]
         variables = []
-        for memberdef in self.children("memberdef", kind="variable"):
+        for memberdef in self.memberdefs():
             variable = ["`"]
-            variable.append(memberdef.child("type").to_asciidoc(**kwargs, depth=depth))
+            variable.append(memberdef.fragment("type", ctx))
             variable.append(
                 f" <<{memberdef.id},{escape_text(memberdef.text('name'))}>>"
             )
@@ -1207,9 +1858,7 @@ class VariableSectiondefNode(Node):
             if argsstring:
                 variable.append(argsstring)
             variable.append("`:: ")
-            briefdescription = memberdef.child("briefdescription").to_asciidoc(
-                **kwargs, depth=depth
-            )
+            briefdescription = memberdef.fragment("briefdescription", ctx)
             if briefdescription:
                 variable.append(briefdescription)
             else:
@@ -1219,17 +1868,18 @@ class VariableSectiondefNode(Node):
         return "\n\n".join(output)
 
 
-class UserDefinedSectiondefNode(Node):
-    def to_asciidoc(self, depth=0, **kwargs):
+class UserDefinedSectiondefNode(SectiondefNode):
+    def to_asciidoc(self, ctx=None, *, jobs=0, **options):
+        ctx = RenderContext.of(ctx, options)
         output = []
         header = self.text("header")
         if header:
-            output.append(title(header, depth))
+            output.append(title(header, ctx.depth))
         description = self.child("description")
         if description:
-            output.append(description.to_asciidoc(**kwargs, depth=depth))
-        members = []
-        for memberdef in self.children("memberdef"):
-            members.append(memberdef.to_asciidoc(**kwargs, depth=depth + 1))
+            output.append(description.to_asciidoc(ctx))
+        members = self.memberdefs_to_asciidoc(
+            self.memberdefs(), ctx.deeper(), jobs=jobs
+        )
         output.append("\n".join(members))
         return "\n\n".join(output)
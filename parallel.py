@@ -0,0 +1,314 @@
+import gc
+import math
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import fragmentcache, memory, parsers, schedule, sources, tracing
+from .context import SERIAL
+
+# The number of members a section must have before it is rendered in parallel.
+THRESHOLD = 500
+
+# The number of chunks each worker is sent per section, so that a worker
+# given a chunk of slow members doesn't leave the others idle.
+CHUNKS_PER_JOB = 4
+
+# Workers are forked so they share the parsed XML (and anything already
+# rendered from it) with this process rather than having it sent to them.
+FORK = "fork" in multiprocessing.get_all_start_methods()
+
+# Whether this is a free-threaded build of Python, without a global
+# interpreter lock, so threads render in parallel.
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+# The start methods of the workers rendering root modules, see map_modules:
+# worker processes (forked or spawned) or worker threads.
+START_METHODS = tuple(
+    method
+    for method in ("fork", "spawn")
+    if method in multiprocessing.get_all_start_methods()
+) + ("thread",)
+
+# How workers rendering root modules are started, see map_modules.
+START_METHOD = "thread" if FREE_THREADED else START_METHODS[0]
+
+# The function, items and arguments being mapped by the workers, see map_chunks,
+# or the index, root modules, context and conversion being rendered, see
+# map_modules.
+WORK = None
+
+
+def configure(threshold=None, start_method=None):
+    """Set the member count threshold and how workers rendering root modules
+    are started.
+
+    The number of workers is part of the conversion being run, see
+    context.Conversion."""
+    global THRESHOLD, START_METHOD  # pylint: disable=global-statement
+    if threshold is not None:
+        if threshold < 1:
+            raise ValueError(f"Invalid member count threshold {threshold!r}")
+        THRESHOLD = threshold
+    if start_method is not None:
+        if start_method not in START_METHODS:
+            raise ValueError(
+                f"Unsupported start method {start_method!r}, "
+                f"expected one of {START_METHODS}"
+            )
+        START_METHOD = start_method
+
+
+def check_jobs(jobs):
+    """Return the given number of workers, raising ValueError if invalid."""
+    if jobs < 0:
+        raise ValueError(f"Invalid number of jobs {jobs!r}")
+    return jobs
+
+
+def enabled(count, jobs):
+    """Return whether a section of the given number of members is rendered
+    by the given number of worker processes."""
+    return FORK and jobs > 0 and count >= THRESHOLD
+
+
+def initialize():
+    """Prepare a worker process to render members.
+
+    A forked worker inherits any trace being recorded: it discards the
+    events of its parent and records its own, which are sent back with its
+    results (see call_chunk and render_task) and merged into its parent's.
+    It also inherits any memory report but tracemalloc only sees the
+    memory of its own process, so the worker stops it rather than slowing
+    down and the report only covers the parent. The worker also leaves the
+    fragment cache to its parent."""
+    if tracing.EVENTS is not None:
+        tracing.start()
+    memory.stop()
+    fragmentcache.detach()
+
+
+def chunks(count, jobs):
+    """Return the bounds of consecutive chunks of count items, a few per job."""
+    size = max(1, math.ceil(count / (jobs * CHUNKS_PER_JOB)))
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def call_chunk(start, stop):
+    """Call the function being mapped with a chunk of its items and return
+    its results along with any trace events recorded meanwhile."""
+    function, items, args = WORK
+    return function(items[start:stop], *args), tracing.drain()
+
+
+def map_chunks(function, items, *args, jobs):
+    """Call function with each chunk of items (and args) in one of the given
+    number of worker processes.
+
+    The function must return a list of results for its chunk and the results
+    of every chunk are returned in a single list, in the original order.
+    Neither the function nor the items are sent to the workers: they are
+    forked afterwards so already have them, and only the results are sent
+    back (along with any trace events they recorded)."""
+    global WORK  # pylint: disable=global-statement
+    WORK = (function, items, args)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=initialize,
+        ) as executor:
+            futures = [
+                executor.submit(call_chunk, start, stop)
+                for start, stop in chunks(len(items), jobs)
+            ]
+            results = []
+            for future in futures:
+                chunk, events = future.result()
+                tracing.merge(events)
+                results.extend(chunk)
+            return results
+    finally:
+        WORK = None
+
+
+def modules_enabled(count, jobs):
+    """Return whether root modules of the given number of pieces (see
+    map_modules) are rendered by the given number of workers.
+
+    Only the parent process writes to the fragment cache so, if it is in use,
+    modules are rendered by the parent (along with any large sections)."""
+    return jobs > 0 and count > 1 and fragmentcache.CACHE is None
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def spawn_module_worker(cls, source, xml, parser, ctx, conversion, trace):
+    """Prepare a spawned worker process to render root modules.
+
+    A spawned worker shares nothing with its parent so it is sent the source
+    of the compound XML (e.g. an archive's index of its members), parses the
+    index and builds the module hierarchy again for itself. It is also told
+    whether to record trace events, see initialize."""
+    global WORK  # pylint: disable=global-statement
+    initialize()
+    if trace:
+        tracing.start()
+    parsers.set_parser(parser)
+    sources.register(source)
+    index = cls(parsers.parse(xml).doxygenindex, xmldir=source.name)
+    WORK = (
+        index,
+        {module.refid: module for module in index.rootmodules()},
+        ctx,
+        conversion,
+    )
+
+
+def module_pool(index, modules, ctx, conversion=SERIAL, jobs=None):
+    """Return a pool of workers (by default, as many as there are modules
+    up to the conversion's jobs) ready to render the given root modules with
+    the given context and conversion.
+
+    Forked workers share the parsed index and module hierarchy with this
+    process: everything alive is frozen first so that the garbage collector
+    doesn't copy those pages into every worker by touching them. Spawned
+    workers (where fork isn't available) are sent the index to parse and
+    build the hierarchy again instead. Worker threads need neither."""
+    global WORK  # pylint: disable=global-statement
+    if jobs is None:
+        jobs = min(conversion.jobs, len(modules))
+    if START_METHOD == "thread":
+        return ThreadPoolExecutor(max_workers=jobs)
+    if START_METHOD == "fork":
+        WORK = (index, {module.refid: module for module in modules}, ctx, conversion)
+        gc.freeze()
+        initializer, initargs = initialize, ()
+    else:
+        initializer = spawn_module_worker
+        initargs = (
+            type(index),
+            sources.get(index.xmldir),
+            str(index.node),
+            parsers.PARSER,
+            ctx,
+            conversion,
+            tracing.EVENTS is not None,
+        )
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context(START_METHOD),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def render_task(refid, start, stop):
+    """Render the pieces (from start up to stop) of the root module with the
+    given ID and return them along with the XML files they were rendered
+    from (see DoxygenindexNode.render_pieces), the summaries of any
+    compounds first listed meanwhile (see SummaryTable.recorded) and any
+    trace events recorded meanwhile."""
+    index, modules, ctx, conversion = WORK
+    parsers.INPUTS.clear()
+    summaries = index.summaries()
+    known = set(summaries)
+    pieces = index.module_pieces(modules[refid], ctx)[start:stop]
+    rendered = index.render_pieces(pieces, ctx, conversion)
+    return (
+        rendered,
+        sorted(parsers.INPUTS),
+        summaries.recorded(excluding=known),
+        tracing.drain(),
+    )
+
+
+def render_thread_task(index, pieces, ctx, conversion):
+    """Render the given pieces of a root module in a worker thread, which
+    records the XML files they were rendered from (and any summaries and
+    trace events) itself."""
+    return index.render_pieces(pieces, ctx, conversion), (), {}, ()
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def submit_task(executor, index, pieces, task, ctx, conversion):
+    """Submit a task rendering some of the given pieces of a root module to
+    the pool, see schedule.plan."""
+    if START_METHOD == "thread":
+        return executor.submit(
+            render_thread_task,
+            index,
+            pieces[task.start : task.stop],
+            ctx,
+            conversion,
+        )
+    module, _ = pieces[0]
+    return executor.submit(render_task, module.refid, task.start, task.stop)
+
+
+def map_modules(index, modules, ctx, conversion=SERIAL):
+    """Render the given root modules in worker processes (or threads).
+
+    Each module is split into pieces (itself and each of its descendants,
+    see DoxygenindexNode.module_pieces) whose cost is estimated from how
+    long they took to render before, see schedule.CostModel. A module that
+    would take longer than its share of the work is split into a task per
+    piece, any other is a single task, and the most expensive tasks are
+    sent to the workers first (longest job first) so that no worker is left
+    rendering a large module once the others are done.
+
+    Worker processes are only sent the ID of each module and the pieces to
+    render and send back their AsciiDoc (and the XML files they depend on,
+    see parsers.INPUTS, along with any summaries and trace events they
+    recorded). Every worker converts with no jobs of its own, so even the
+    members of the largest sections are rendered by the worker itself (and
+    never by processes forked from a worker thread). The AsciiDoc of every
+    module is returned in order."""
+    global WORK  # pylint: disable=global-statement
+    pieces = [index.module_pieces(module, ctx) for module in modules]
+    model = conversion.model or schedule.CostModel()
+    plan = schedule.plan(
+        [model.estimate_pieces(module) for module in pieces],
+        min(conversion.jobs, sum(len(module) for module in pieces)),
+    )
+    worker = conversion._replace(jobs=0)
+    frozen = gc.get_freeze_count()
+    started = time.perf_counter()
+    try:
+        with module_pool(index, modules, ctx, worker, plan.jobs) as executor:
+            futures = [
+                submit_task(executor, index, pieces[task.position], task, ctx, worker)
+                for task in plan.tasks
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        WORK = None
+        if not frozen:
+            gc.unfreeze()
+    plan.actual = time.perf_counter() - started
+    if schedule.SCHEDULES is not None:
+        schedule.SCHEDULES.append(plan)
+    return assemble(index, pieces, plan, results, conversion.model)
+
+
+def assemble(index, pieces, plan, results, model=None):
+    """Return the AsciiDoc of every root module, in order, given the result
+    of each task of the plan, recording how long each piece took in the
+    given cost model (if any).
+
+    The summaries recorded by the workers are recorded in the index's
+    summary table so that they are saved along with the others (e.g. with
+    --summaries)."""
+    summaries = index.summaries()
+    rendered = [[None] * len(module) for module in pieces]
+    for task, (result, inputs, recorded, events) in zip(plan.tasks, results):
+        parsers.INPUTS.update(inputs)
+        summaries.merge(recorded)
+        tracing.merge(events)
+        rendered[task.position][task.start : task.stop] = result
+    outputs = []
+    for module, module_rendered in zip(pieces, rendered):
+        if model is not None:
+            model.record_pieces(module, module_rendered)
+        outputs.append("\n\n".join(piece.asciidoc for piece in module_rendered))
+    return outputs
@@ -0,0 +1,318 @@
+import threading
+from contextlib import contextmanager
+from xml.etree import ElementTree
+
+from bs4 import BeautifulSoup, Comment
+from bs4.builder import TreeBuilder, builder_registry
+from bs4.element import NamespacedAttribute
+
+from . import sources
+from .tracing import span
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
+# The namespace of the xml prefix (e.g. of xml:lang), which is never declared
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# The namespace of namespace declarations (e.g. xmlns:xsi)
+XMLNS_NAMESPACE = "http://www.w3.org/2000/xmlns/"
+
+# Beautiful Soup only registers its lxml-based builders if lxml is installed
+LXMLTreeBuilderForXML = builder_registry.lookup("lxml-xml") or TreeBuilder
+
+
+class TagFilter:  # pylint: disable=too-few-public-methods
+    """A filter restricting which elements are built when parsing a document.
+
+    Every element down to the given depth (by default, a Doxygen root element
+    and its compound definitions) is always built but, below that, only
+    elements with one of the given names (and all of their descendants) are
+    built. Everything else is skipped without ever creating a Beautiful Soup
+    object for it.
+    """
+
+    def __init__(self, names, depth=2):
+        self.names = frozenset(names)
+        self.depth = depth
+
+
+class FilteringTreeBuilderMixin:
+    """Skip the parser events of any elements rejected by a TagFilter."""
+
+    def __init__(self, *args, parse_only=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parse_only = parse_only
+        self.reset_filter()
+
+    def reset_filter(self):
+        self.depth = 0
+        self.keepdepth = None
+        self.skipdepth = None
+
+    def feed(self, markup):
+        self.reset_filter()
+        super().feed(markup)
+
+    def start(self, name, attrs, *args):
+        self.depth += 1
+        if self.skipdepth is not None:
+            return
+        if (
+            self.parse_only is not None
+            and self.keepdepth is None
+            and self.depth > self.parse_only.depth
+        ):
+            if name not in self.parse_only.names:
+                self.skipdepth = self.depth
+                return
+            self.keepdepth = self.depth
+        super().start(name, attrs, *args)
+
+    def end(self, name):
+        depth = self.depth
+        self.depth -= 1
+        if self.skipdepth is not None:
+            if depth == self.skipdepth:
+                self.skipdepth = None
+            return
+        if depth == self.keepdepth:
+            self.keepdepth = None
+        super().end(name)
+
+    def data(self, content):
+        if self.skipdepth is None:
+            super().data(content)
+
+    def comment(self, content):
+        if self.skipdepth is None:
+            super().comment(content)
+
+
+class TargetTreeBuilder(TreeBuilder):
+    """A Beautiful Soup tree builder driven by a parser's target interface.
+
+    Both lxml.etree and the standard library's xml.etree (backed by expat)
+    can drive a "target" object with start, end, data and comment events
+    rather than building their own tree. This builder acts as that target,
+    translating those events directly into a Beautiful Soup tree without any
+    of the encoding detection performed by Beautiful Soup's own builders.
+    """
+
+    is_xml = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_namespaces()
+
+    def reset_namespaces(self):
+        """Forget every namespace declared, other than the xml prefix's."""
+        self.prefixes = {XML_NAMESPACE: "xml"}
+        self.scopes = []
+        self.declarations = []
+
+    def prepare_markup(
+        self,
+        markup,
+        user_specified_encoding=None,
+        document_declared_encoding=None,
+        exclude_encodings=None,
+    ):
+        yield (markup, None, None, False)
+
+    def feed(self, markup):
+        if hasattr(markup, "read"):
+            markup = markup.read()
+        self.reset_namespaces()
+        parser = self.xmlparser()
+        parser.feed(markup)
+        parser.close()
+
+    def xmlparser(self):
+        """Return a new parser that will send its events to this builder."""
+        raise NotImplementedError
+
+    def start_ns(self, prefix, uri):
+        declaration = (prefix, uri, self.prefixes.get(uri))
+        self.scopes.append(declaration)
+        self.declarations.append(declaration)
+        self.prefixes[uri] = prefix
+
+    def end_ns(self, _prefix):
+        declaration = self.scopes.pop()
+        # The declarations of a skipped element are never used
+        if self.declarations and self.declarations[-1] is declaration:
+            self.declarations.pop()
+        _, uri, outer = declaration
+        if outer is None:
+            del self.prefixes[uri]
+        else:
+            self.prefixes[uri] = outer
+
+    def start(self, tag, attrib, *_args):
+        self.soup.endData()
+        attrs = dict(attrib)
+        if self.declarations or any(name[0] == "{" for name in attrs):
+            attrs = self.namespaced_attributes(attrs)
+        name, namespace, prefix = self.namespaced_name(tag)
+        self.soup.handle_starttag(name, namespace, prefix, attrs)
+
+    def end(self, tag):
+        self.soup.endData()
+        name, _, prefix = self.namespaced_name(tag)
+        self.soup.handle_endtag(name, prefix)
+
+    def namespaced_name(self, tag):
+        """Return the name, namespace and prefix of an element given the name
+        the parser gives it (e.g. "{uri}name" if it is in a namespace)."""
+        if tag[0] != "{":
+            return tag, None, None
+        uri, name = tag[1:].split("}", 1)
+        return name, uri, self.prefixes.get(uri) or None
+
+    def namespaced_attributes(self, attrs):
+        """Return the given attributes with any in a namespace (e.g.
+        "{uri}lang") named by their prefix (e.g. "xml:lang") and any
+        namespaces declared by the element added, as Beautiful Soup's own
+        builder does."""
+        namespaced = {
+            NamespacedAttribute("xmlns", prefix or None, XMLNS_NAMESPACE): uri
+            for prefix, uri, _ in self.declarations
+        }
+        self.declarations = []
+        for name, value in attrs.items():
+            if name[0] == "{":
+                uri, local = name[1:].split("}", 1)
+                name = NamespacedAttribute(self.prefixes.get(uri), local, uri)
+            namespaced[name] = value
+        return namespaced
+
+    def data(self, content):
+        self.soup.handle_data(content)
+
+    def comment(self, content):
+        self.soup.endData()
+        self.soup.handle_data(content)
+        self.soup.endData(Comment)
+
+    def close(self):
+        pass
+
+
+class LxmlTreeBuilder(FilteringTreeBuilderMixin, TargetTreeBuilder):
+    """Build a Beautiful Soup tree using lxml.etree's parser directly."""
+
+    NAME = "lxml.etree"
+
+    def xmlparser(self):
+        return etree.XMLParser(target=self, strip_cdata=False, resolve_entities=False)
+
+
+class ExpatTreeBuilder(FilteringTreeBuilderMixin, TargetTreeBuilder):
+    """Build a Beautiful Soup tree using the standard library's expat parser."""
+
+    NAME = "expat"
+
+    def xmlparser(self):
+        return ElementTree.XMLParser(target=self)
+
+
+class SoupTreeBuilder(FilteringTreeBuilderMixin, LXMLTreeBuilderForXML):
+    """Beautiful Soup's own lxml XML tree builder, able to take a TagFilter."""
+
+
+PARSERS = ("lxml-xml", "lxml.etree", "expat")
+
+DEFAULT_PARSER = "lxml-xml" if etree else "expat"
+
+# The parser used whenever one isn't explicitly given, see set_parser.
+PARSER = DEFAULT_PARSER
+
+# The path of every compound XML file the output depends on, see compound_path.
+INPUTS = set()
+
+# The IDs of the compounds read by each thread while it records them, see
+# recording.
+READS = threading.local()
+
+
+def set_parser(name):
+    """Set the XML parser engine used to read all Doxygen XML files."""
+    global PARSER  # pylint: disable=global-statement
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser {name!r}, expected one of {PARSERS}")
+    PARSER = name
+
+
+def parse(markup, parser=None, parse_only=None):
+    """Parse the given XML string or file into a Beautiful Soup object.
+
+    Uses the engine named by parser, falling back to the one configured with
+    set_parser. If a TagFilter is given as parse_only, only the elements it
+    allows will be built."""
+    name = parser or PARSER
+    if name == "lxml-xml":
+        if parse_only is None:
+            return BeautifulSoup(markup, "xml")
+        return BeautifulSoup(markup, builder=SoupTreeBuilder(parse_only=parse_only))
+    if name == "lxml.etree":
+        return BeautifulSoup(markup, builder=LxmlTreeBuilder(parse_only=parse_only))
+    if name == "expat":
+        return BeautifulSoup(markup, builder=ExpatTreeBuilder(parse_only=parse_only))
+    raise ValueError(f"Unknown parser {name!r}, expected one of {PARSERS}")
+
+
+def compound_path(xmldir, refid):
+    """Return the path of the XML file for the given compound.
+
+    If xmldir names a registered source (e.g. an archive or a combined XML
+    file, see sources.register), that is the source's path. The path is also
+    recorded in INPUTS as the output depends on it."""
+    path = sources.get(xmldir).path(refid)
+    record(path, refid)
+    return path
+
+
+def reset_inputs():
+    """Forget every compound XML file recorded in INPUTS so far, e.g. before
+    converting another variant."""
+    INPUTS.clear()
+
+
+def record(path, refid):
+    """Record that the output depends on the given compound's XML file."""
+    INPUTS.add(path)
+    refids = getattr(READS, "refids", None)
+    if refids is not None:
+        refids.add(refid)
+
+
+@contextmanager
+def recording():
+    """Record the ID of every compound read by this thread until exit (e.g.
+    every compound some AsciiDoc was rendered from)."""
+    outer = getattr(READS, "refids", None)
+    READS.refids = refids = set()
+    try:
+        yield refids
+    finally:
+        READS.refids = outer
+        if outer is not None:
+            outer.update(refids)
+
+
+def compound_stamp(xmldir, refid):
+    """Return a stamp (its checksum and size) of a compound's XML."""
+    return sources.get(xmldir).stamp(refid)
+
+
+def parse_compound(xmldir, refid, parser=None, parse_only=None):
+    """Parse the Doxygen XML file for the compound with the given refid.
+
+    The XML is read from the source of xmldir, see sources.get."""
+    with span(refid, "parse", filtered=parse_only is not None):
+        source = sources.get(xmldir)
+        record(source.path(refid), refid)
+        return parse(source.markup(refid), parser=parser, parse_only=parse_only)
@@ -0,0 +1,207 @@
+import json
+import os
+from collections import namedtuple
+
+# The seconds taken to render each byte of a group's XML, used to estimate
+# the cost of groups until a previous run has recorded how long they took.
+DEFAULT_RATE = 1e-6
+
+# The cost of rendering a group recorded by a previous run: the stamp of its
+# XML, its number of members, the length of the text of its descriptions and
+# the seconds it took to render.
+Cost = namedtuple("Cost", ("stamp", "members", "text", "seconds"))
+
+# A group rendered as part of a root module, see DoxygenindexNode.render_pieces
+# (its members and text are None unless there is a cost model to record them)
+Rendered = namedtuple("Rendered", ("asciidoc", "seconds", "members", "text"))
+
+# The pieces of one root module (from start up to stop) rendered together by
+# a single worker, see plan.
+Task = namedtuple("Task", ("position", "start", "stop", "cost"))
+
+
+class CostModel:
+    """Estimates how long each group takes to render from previous runs.
+
+    Every group rendered records the seconds it took along with the size of
+    its XML, its number of members and the length of the text of its
+    descriptions. A group whose XML hasn't changed since (going by its
+    checksum, so however many times Doxygen has written it again) is
+    estimated to take just as long again, one whose XML has changed is estimated by fitting the
+    seconds of every group recorded to those three measures (by least
+    squares) and a group never rendered before is estimated from the size of
+    its XML alone.
+    """
+
+    def __init__(self):
+        self.costs = {}
+        self.coefficients = None
+
+    def record(self, refid, stamp, rendered):
+        """Record how long the given group took to render."""
+        self.costs[refid] = Cost(
+            stamp, rendered.members, rendered.text, rendered.seconds
+        )
+        self.coefficients = None
+
+    def rate(self):
+        """Return the seconds taken to render each byte of XML so far."""
+        size = sum(cost.stamp[1] for cost in self.costs.values())
+        if not size:
+            return DEFAULT_RATE
+        return sum(cost.seconds for cost in self.costs.values()) / size
+
+    def fit(self):
+        """Return the seconds taken per byte, member and character of text,
+        fitted to every group recorded, or None if they can't be fitted."""
+        if self.coefficients is None:
+            rows = [
+                ((cost.stamp[1], cost.members, cost.text), cost.seconds)
+                for cost in self.costs.values()
+            ]
+            self.coefficients = least_squares(rows) or ()
+        return self.coefficients or None
+
+    def estimate(self, refid, stamp):
+        """Return the estimated seconds the given group takes to render."""
+        cost = self.costs.get(refid)
+        if cost is not None and cost.stamp == stamp:
+            return cost.seconds
+        coefficients = self.fit()
+        if cost is None or coefficients is None:
+            return stamp[1] * self.rate()
+        return sum(
+            coefficient * measure
+            for coefficient, measure in zip(
+                coefficients, (stamp[1], cost.members, cost.text)
+            )
+        )
+
+    def estimate_pieces(self, pieces):
+        """Return the estimated seconds each of the given pieces of a root
+        module takes to render, see DoxygenindexNode.module_pieces."""
+        return [self.estimate(group.refid, group.stamp()) for group, _ in pieces]
+
+    def record_pieces(self, pieces, rendered):
+        """Record how long each of the given pieces of a root module took to
+        render."""
+        for (group, _), piece in zip(pieces, rendered):
+            self.record(group.refid, group.stamp(), piece)
+
+    def load(self, path):
+        """Load the costs recorded by a previous run, if any."""
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as file:
+            saved = json.load(file)
+        self.costs = {refid: Cost(*fields) for refid, fields in saved.items()}
+        self.coefficients = None
+
+    def save(self, path):
+        """Save every cost recorded for a later run."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.costs, file, separators=(",", ":"))
+
+
+def least_squares(rows):
+    """Return the non-negative coefficients best fitting each row's measures
+    to its value, or None if there are too few rows or no such fit."""
+    if not rows:
+        return None
+    count = len(rows[0][0])
+    if len(rows) < count:
+        return None
+    # Solve the normal equations by Gaussian elimination
+    matrix = [
+        [sum(measures[i] * measures[j] for measures, _ in rows) for j in range(count)]
+        + [sum(measures[i] * value for measures, value in rows)]
+        for i in range(count)
+    ]
+    for column in range(count):
+        pivot = max(
+            range(column, count),
+            key=lambda row, column=column: abs(matrix[row][column]),
+        )
+        if abs(matrix[pivot][column]) < 1e-12:
+            return None
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for row in range(count):
+            if row != column:
+                factor = matrix[row][column] / matrix[column][column]
+                matrix[row] = [
+                    value - factor * pivotvalue
+                    for value, pivotvalue in zip(matrix[row], matrix[column])
+                ]
+    coefficients = tuple(matrix[row][count] / matrix[row][row] for row in range(count))
+    if any(coefficient < 0 for coefficient in coefficients):
+        return None
+    return coefficients
+
+
+class Schedule:  # pylint: disable=too-few-public-methods
+    """The tasks rendering root modules, most expensive first.
+
+    Tasks are dispatched in order to whichever worker is free first so the
+    makespan (the time until every task is done) is predicted by assigning
+    each task, in order, to the worker with the least work so far."""
+
+    def __init__(self, tasks, jobs, split):
+        self.tasks = tasks
+        self.jobs = jobs
+        self.split = split
+        self.actual = None
+        loads = [0] * jobs
+        for task in tasks:
+            loads[loads.index(min(loads))] += task.cost
+        self.predicted = max(loads, default=0)
+
+    def to_text(self):
+        """Return the schedule and its predicted and actual makespan as text."""
+        actual = "" if self.actual is None else f", actual {self.actual:.2f} s"
+        return (
+            f"Schedule: {len(self.tasks)} tasks ({self.split} modules split) "
+            f"on {self.jobs} workers, predicted makespan {self.predicted:.2f} s"
+            f"{actual}"
+        )
+
+
+def plan(costs, jobs):
+    """Plan the tasks rendering root modules given the estimated cost of
+    each of their pieces, see DoxygenindexNode.module_pieces.
+
+    Each module is a single task unless it would take longer than the ideal
+    makespan (its share of the total cost spread evenly over every worker),
+    in which case each of its pieces is a task of its own. The most
+    expensive tasks come first, ties broken by position."""
+    total = sum(sum(pieces) for pieces in costs)
+    tasks = []
+    split = 0
+    for position, pieces in enumerate(costs):
+        if len(pieces) > 1 and sum(pieces) > total / jobs:
+            split += 1
+            tasks.extend(
+                Task(position, piece, piece + 1, cost)
+                for piece, cost in enumerate(pieces)
+            )
+        else:
+            tasks.append(Task(position, 0, len(pieces), sum(pieces)))
+    tasks.sort(key=lambda task: (-task.cost, task.position, task.start))
+    return Schedule(tasks, jobs, split)
+
+
+# The schedules of every root module rendered in parallel, or None if they
+# aren't being reported.
+SCHEDULES = None
+
+
+def start():
+    """Start reporting the schedules of root modules rendered in parallel."""
+    global SCHEDULES  # pylint: disable=global-statement
+    SCHEDULES = []
+
+
+def stop():
+    """Stop reporting schedules and return those reported."""
+    global SCHEDULES  # pylint: disable=global-statement
+    schedules, SCHEDULES = SCHEDULES, None
+    return schedules or []
@@ -0,0 +1,91 @@
+import json
+
+
+class Partial:
+    """The root modules rendered by one shard of a sharded build.
+
+    A sharded build splits the root modules of an index between several
+    shards (e.g. on different machines), each rendering only its own modules
+    into a partial output. Each rendered module is recorded along with its
+    position in the full document so that merging the partial outputs of
+    every shard produces exactly the document of an unsharded build.
+    """
+
+    def __init__(self, shard, count, total, outputs):
+        self.shard = shard
+        self.count = count
+        self.total = total
+        self.outputs = outputs
+
+    def to_json(self):
+        """Return the partial output as JSON."""
+        return json.dumps(
+            {
+                "shard": [self.shard, self.count],
+                "modules": self.total,
+                "outputs": {
+                    str(position): output
+                    for position, output in sorted(self.outputs.items())
+                },
+            },
+            indent=2,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a partial output saved by a shard."""
+        with open(path, encoding="utf-8") as file:
+            saved = json.load(file)
+        shard, count = saved["shard"]
+        return cls(
+            shard,
+            count,
+            saved["modules"],
+            {int(position): output for position, output in saved["outputs"].items()},
+        )
+
+
+def parse_shard(value):
+    """Parse a shard given as I/N (the Ith of N shards, counting from 1)."""
+    try:
+        shard, count = (int(number) for number in value.split("/"))
+    except ValueError as error:
+        raise ValueError(f"Invalid shard {value!r}, expected I/N") from error
+    if not 1 <= shard <= count:
+        raise ValueError(f"Invalid shard {value!r}, expected 1 <= I <= N")
+    return shard, count
+
+
+def assign(costs, count):
+    """Assign each item with the given estimated cost to one of count shards.
+
+    The most expensive items are assigned first, each to the shard with the
+    least total cost so far, so shards are balanced by cost rather than by
+    the number of items. Ties are broken by position so every shard computes
+    the same assignment. Return the shard (counting from 1) of each item."""
+    loads = [0] * count
+    shards = [None] * len(costs)
+    for position in sorted(range(len(costs)), key=lambda item: (-costs[item], item)):
+        shard = min(range(count), key=lambda shard: (loads[shard], shard))
+        loads[shard] += costs[position]
+        shards[position] = shard + 1
+    return shards
+
+
+def merge(partials):
+    """Return the full document assembled from the partials of every shard."""
+    if not partials:
+        raise ValueError("No partial outputs to merge")
+    count, total = partials[0].count, partials[0].total
+    if any((partial.count, partial.total) != (count, total) for partial in partials):
+        raise ValueError("Partial outputs are from different builds")
+    shards = sorted(partial.shard for partial in partials)
+    if shards != list(range(1, count + 1)):
+        raise ValueError(f"Expected one partial output for each of {count} shards")
+
+    outputs = {}
+    for partial in partials:
+        outputs.update(partial.outputs)
+    if sorted(outputs) != list(range(total)):
+        raise ValueError(f"Partial outputs don't contain all {total} modules")
+    return "\n\n".join(outputs[position] for position in range(total))
@@ -0,0 +1,240 @@
+import os
+import posixpath
+import tarfile
+import zipfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# The sources of compound XML other than plain directories, by name, see
+# register. Any other name is taken to be the path of a directory.
+SOURCES = {}
+
+# The suffixes of the archives that can be read, see load.
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+ZSTD_SUFFIXES = (".tar.zst", ".tzst")
+SUFFIXES = ZIP_SUFFIXES + TAR_SUFFIXES + ZSTD_SUFFIXES
+
+
+class Source:
+    """Where the XML of Doxygen's compounds (and its index) is read from.
+
+    A source's name stands in for the directory of compound XML files
+    wherever one is expected (e.g. the xmldir of every Node) so the same
+    name always reads compounds from the same source, see get.
+    """
+
+    def __init__(self, name):
+        self.name = str(name)
+
+    def path(self, _refid):
+        """Return the path the given compound's XML is read from, as recorded
+        in parsers.INPUTS."""
+        return self.name
+
+    def markup(self, refid):
+        """Return the XML of the given compound's file.
+
+        Raises FileNotFoundError if there is no such compound."""
+        raise NotImplementedError
+
+    def stamp(self, refid):
+        """Return a stamp of the given compound's XML that changes whenever
+        the XML does: its CRC-32 and size, see checksum.
+
+        Doxygen writes every file again each time it runs so the stamp only
+        depends on the XML itself, never on when it was written."""
+        raise NotImplementedError
+
+    def index(self):
+        """Return the XML of the index of every compound."""
+        return self.markup("index")
+
+
+class DirectorySource(Source):
+    """Compounds read from the XML files in a directory, as Doxygen writes
+    them."""
+
+    def path(self, refid):
+        return os.path.join(self.name, f"{refid}.xml")
+
+    def markup(self, refid):
+        with open(self.path(refid), encoding="utf-8") as compoundxml:
+            return compoundxml.read()
+
+    def stamp(self, refid):
+        with open(self.path(refid), "rb") as compoundxml:
+            return checksum(compoundxml.read())
+
+
+class MemorySource(Source):
+    """Compounds whose XML is given as strings, by ID (e.g. "index")."""
+
+    def __init__(self, name, files):
+        super().__init__(name)
+        self.files = dict(files)
+
+    def markup(self, refid):
+        try:
+            return self.files[refid]
+        except KeyError:
+            raise FileNotFoundError(f"No compound {refid!r} in {self.name}") from None
+
+    def stamp(self, refid):
+        return checksum(self.markup(refid).encode("utf-8"))
+
+
+class ZipSource(Source):
+    """Compounds read straight out of a zip archive of an XML directory.
+
+    A zip archive has an index of its members so each compound's XML is
+    only decompressed when it is parsed. Members are found by file name
+    wherever they are in the archive (e.g. at the top level or in xml/).
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.archive = None
+        self.pid = None
+        self.members = {}
+
+    def load(self):
+        """Open the archive and index its XML files by compound ID."""
+        self.members = {
+            refid: info
+            for info in self.open().infolist()
+            if (refid := member_refid(info.filename)) is not None
+        }
+        return self
+
+    def open(self):
+        """Open the archive (again, e.g. in a worker process)."""
+        # pylint: disable-next=consider-using-with
+        self.archive = zipfile.ZipFile(self.name)
+        self.pid = os.getpid()
+        return self.archive
+
+    def info(self, refid):
+        try:
+            return self.members[refid]
+        except KeyError:
+            raise FileNotFoundError(f"No compound {refid!r} in {self.name}") from None
+
+    def markup(self, refid):
+        info = self.info(refid)
+        # A forked worker process mustn't share its parent's file position
+        archive = self.archive if self.pid == os.getpid() else self.open()
+        return archive.read(info).decode("utf-8")
+
+    def stamp(self, refid):
+        info = self.info(refid)
+        return [info.CRC, info.file_size]
+
+    def __getstate__(self):
+        # An open archive can't be sent to a worker process, which opens it
+        # again instead
+        return {**self.__dict__, "archive": None, "pid": None}
+
+
+class TarSource(Source):
+    """Compounds read straight out of a (compressed) tar archive of an XML
+    directory.
+
+    A compressed tar archive can only be read from start to end so it is
+    streamed once, keeping the XML of every compound in memory, rather than
+    extracting each one to its own file.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.members = {}
+
+    def load(self):
+        """Read the XML files of the archive, indexed by compound ID."""
+        with open(self.name, "rb") as file:
+            with tar_stream(self.name, file) as archive:
+                for info in archive:
+                    refid = member_refid(info.name) if info.isfile() else None
+                    if refid is not None:
+                        xml = archive.extractfile(info).read()
+                        self.members[refid] = (xml, checksum(xml))
+        return self
+
+    def member(self, refid):
+        try:
+            return self.members[refid]
+        except KeyError:
+            raise FileNotFoundError(f"No compound {refid!r} in {self.name}") from None
+
+    def markup(self, refid):
+        return self.member(refid)[0].decode("utf-8")
+
+    def stamp(self, refid):
+        return self.member(refid)[1]
+
+
+def checksum(xml):
+    """Return the stamp of the given XML (as bytes): its CRC-32 and size, as
+    recorded for each member of a zip archive."""
+    return [zlib.crc32(xml), len(xml)]
+
+
+def member_refid(name):
+    """Return the ID of the compound an archive member is the XML of, if any."""
+    filename = posixpath.basename(name)
+    if not filename.endswith(".xml"):
+        return None
+    return filename[: -len(".xml")]
+
+
+def tar_stream(path, file):
+    """Open the given (compressed) tar archive to be read from start to end."""
+    if path.endswith(ZSTD_SUFFIXES):
+        if zstandard is None:
+            raise ValueError(f"Reading {path} requires the zstandard package")
+        return tarfile.open(
+            fileobj=zstandard.ZstdDecompressor().stream_reader(file), mode="r|"
+        )
+    return tarfile.open(fileobj=file, mode="r|*")
+
+
+def is_archive(path):
+    """Return whether the given path is that of an archive that can be read."""
+    return str(path).endswith(SUFFIXES)
+
+
+def register(source):
+    """Read compounds from the given source wherever its name is given as
+    the directory of compound XML files."""
+    SOURCES[source.name] = source
+    return source
+
+
+def reset():
+    """Forget every source registered so far, e.g. between tests."""
+    SOURCES.clear()
+
+
+def get(xmldir):
+    """Return the source of the compounds in the given XML directory (or
+    the source registered with that name)."""
+    source = SOURCES.get(str(xmldir))
+    if source is None:
+        return DirectorySource(xmldir)
+    return source
+
+
+def load(path):
+    """Index the archive at the given path and register it as a source.
+
+    Raises ValueError if the archive is of a kind that can't be read."""
+    path = str(path)
+    if path.endswith(ZIP_SUFFIXES):
+        return register(ZipSource(path).load())
+    if path.endswith(TAR_SUFFIXES + ZSTD_SUFFIXES):
+        return register(TarSource(path).load())
+    raise ValueError(f"Unknown archive {path!r}, expected one of {SUFFIXES}")
@@ -0,0 +1,70 @@
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import parsers, sources
+from doxygentoasciidoc.nodes import DoxygenindexNode, SummaryTable
+
+
+@pytest.fixture(name="reset", autouse=True)
+def fixture_reset():
+    # Summaries, inputs and sources are recorded globally for the whole
+    # conversion so each test starts without any left by the last
+    yield
+    SummaryTable.reset()
+    parsers.reset_inputs()
+    sources.reset()
+
+
+def write_group(
+    xmldir, refid, title=None, innergroups=(), sectiondefs="", detaileddescription=None
+):
+    """Write the XML of a group (with the given submodules and sectiondefs)
+    to the given directory."""
+    if title is None:
+        title = f"Module {refid}"
+    if detaileddescription is None:
+        detaileddescription = f"<para>More about module <bold>{refid}</bold>.</para>"
+    innergroups = "".join(
+        f'<innergroup refid="{child}">{child}</innergroup>' for child in innergroups
+    )
+    with open(f"{xmldir}/{refid}.xml", "w", encoding="utf-8") as group:
+        group.write(f"""\
+<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygen version="1.9.7" xml:lang="en-US">
+  <compounddef id="{refid}" kind="group">
+    <compoundname>{refid}</compoundname>
+    <title>{title}</title>
+    {innergroups}
+    {sectiondefs}
+    <briefdescription>
+<para>The module {refid}. </para>
+    </briefdescription>
+    <detaileddescription>
+{detaileddescription}
+    </detaileddescription>
+  </compounddef>
+</doxygen>
+""")
+
+
+def write_index(xmldir, refids):
+    """Return the index of the given groups in the given directory."""
+    compounds = "".join(
+        f'<compound refid="{refid}" kind="group"><name>{refid}</name></compound>'
+        for refid in refids
+    )
+    return DoxygenindexNode(
+        BeautifulSoup(f"<doxygenindex>{compounds}</doxygenindex>", "xml").doxygenindex,
+        xmldir=str(xmldir),
+    )
+
+
+@pytest.fixture(name="write_group")
+def fixture_write_group():
+    """Return a function writing the XML of a group, see write_group."""
+    return write_group
+
+
+@pytest.fixture(name="write_index")
+def fixture_write_index():
+    """Return a function returning the index of groups, see write_index."""
+    return write_index
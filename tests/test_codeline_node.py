@@ -10,3 +10,22 @@ def test_codeline_node_ends_with_a_newline(tmp_path):
     ).to_asciidoc()
 
     assert asciidoc == "  assert(fbdiv >= 16)"
+
+
+def test_codeline_node_flattens_nested_highlights_and_refs(tmp_path):
+    xml = """<codeline lineno="1"><highlight class="normal">gpio_init(<ref refid="group__foo" kindref="member"><highlight class="keyword">PIN</highlight></ref>,<sp/>*x);</highlight></codeline>"""
+
+    asciidoc = CodelineNode(
+        BeautifulSoup(xml, "xml").codeline, xmldir=tmp_path
+    ).to_asciidoc()
+
+    assert asciidoc == "gpio_init(PIN, *x);"
+
+
+def test_codeline_node_renders_other_elements_as_in_a_program_listing(tmp_path):
+    xml = """<codeline lineno="1"><highlight class="normal">a<linebreak/>b<nonbreakablespace/>c</highlight></codeline>"""
+    codeline = BeautifulSoup(xml, "xml").codeline
+
+    asciidoc = CodelineNode(codeline, xmldir=tmp_path).to_asciidoc()
+
+    assert asciidoc == "a +\nb{nbsp}c"
@@ -0,0 +1,64 @@
+import gc
+
+from doxygentoasciidoc import collector
+
+
+def test_freeze_and_collect_do_nothing_unless_managing():
+    collector.freeze()
+    collector.collect()
+
+    assert gc.get_freeze_count() == 0
+    assert collector.stop() is None
+
+
+def test_thresholds_are_tuned_while_managing():
+    thresholds = gc.get_threshold()
+    collector.start(threshold=12345)
+    try:
+        assert gc.get_threshold() == (12345, *thresholds[1:])
+    finally:
+        collector.stop()
+
+    assert gc.get_threshold() == thresholds
+
+
+def test_freeze_freezes_surviving_objects_until_stopped():
+    collector.start()
+    try:
+        collector.freeze()
+        frozen = gc.get_freeze_count()
+    finally:
+        statistics = collector.stop()
+
+    assert frozen > 0
+    assert statistics.frozen == frozen
+    assert gc.get_freeze_count() == 0
+
+
+def test_collections_are_timed():
+    collector.start()
+    try:
+        cycle = []
+        cycle.append(cycle)
+        del cycle
+        collector.collect()
+    finally:
+        statistics = collector.stop()
+
+    assert statistics.collections[2] == 1
+    assert statistics.collected >= 1
+    assert "1 collections (0/0/1 by generation)" in statistics.to_text()
+
+
+def test_without_tuning_the_collector_is_only_timed():
+    thresholds = gc.get_threshold()
+    collector.start(tune=False)
+    try:
+        assert gc.get_threshold() == thresholds
+        collector.freeze()
+        gc.collect()
+    finally:
+        statistics = collector.stop()
+
+    assert statistics.frozen == 0
+    assert statistics.collections[2] == 1
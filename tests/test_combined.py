@@ -0,0 +1,106 @@
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import combined, parsers, sources
+from doxygentoasciidoc.nodes import DoxygenindexNode
+
+COMPOUNDS = {
+    "group__outer": """\
+  <compounddef id="group__outer" kind="group">
+    <compoundname>outer</compoundname>
+    <title>Outer</title>
+    <innergroup refid="group__inner">inner</innergroup>
+    <briefdescription>
+<para>The outer module. </para>
+    </briefdescription>
+    <detaileddescription>
+<para>See <ref refid="group__inner" kindref="compound">the inner module</ref>.</para>
+    </detaileddescription>
+  </compounddef>""",
+    "group__inner": """\
+  <compounddef id="group__inner" kind="group">
+    <compoundname>inner</compoundname>
+    <title>Inner</title>
+    <innerclass refid="structpoint" prot="public">point</innerclass>
+    <briefdescription>
+<para>The inner module. </para>
+    </briefdescription>
+    <detaileddescription>
+    </detaileddescription>
+  </compounddef>""",
+    "structpoint": """\
+  <compounddef id="structpoint" kind="struct" language="C++" prot="public">
+    <compoundname>point</compoundname>
+    <briefdescription>
+<para>A point. </para>
+    </briefdescription>
+    <detaileddescription>
+    </detaileddescription>
+  </compounddef>""",
+    "point_8h": """\
+  <compounddef id="point_8h" kind="file" language="C++">
+    <compoundname>point.h</compoundname>
+    <briefdescription>
+    </briefdescription>
+    <detaileddescription>
+    </detaileddescription>
+  </compounddef>""",
+}
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path):
+    path = f"{tmp_path}/combined.xml"
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(
+            "<?xml version='1.0' encoding='UTF-8' standalone='no'?>\n"
+            '<doxygen version="1.9.7" xml:lang="en-US">\n'
+            + "\n".join(COMPOUNDS.values())
+            + "\n</doxygen>\n"
+        )
+    return path
+
+
+def test_load_keeps_only_the_compounds_needed(path):
+    xml = combined.load(path)
+
+    assert "group__outer" in xml
+    assert "structpoint" in xml
+    assert "point_8h" not in xml
+    assert xml.discarded == 1
+    assert sources.SOURCES[path] is xml
+
+
+def test_index_lists_the_compounds_kept_in_order(path):
+    index = BeautifulSoup(combined.load(path).index(), "xml")
+
+    assert [
+        (compound["refid"], compound["kind"]) for compound in index("compound")
+    ] == [
+        ("group__outer", "group"),
+        ("group__inner", "group"),
+        ("structpoint", "struct"),
+    ]
+
+
+def test_missing_compounds_are_not_found(path):
+    combined.load(path)
+
+    with pytest.raises(FileNotFoundError):
+        parsers.parse_compound(path, "point_8h")
+
+
+def test_combined_output_matches_separate_files(tmp_path, path, write_index):
+    for refid, xml in COMPOUNDS.items():
+        with open(f"{tmp_path}/{refid}.xml", "w", encoding="utf-8") as file:
+            file.write(
+                f'<doxygen version="1.9.7" xml:lang="en-US">\n{xml}\n</doxygen>\n'
+            )
+    index = write_index(tmp_path, ["group__outer", "group__inner"])
+    separate = index.to_asciidoc(depth=2)
+
+    soup = BeautifulSoup(combined.load(path).index(), "xml")
+    asciidoc = DoxygenindexNode(soup.doxygenindex, xmldir=path).to_asciidoc(depth=2)
+
+    assert asciidoc == separate
+    assert "==== Inner" in asciidoc
+    assert path in parsers.INPUTS
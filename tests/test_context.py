@@ -0,0 +1,52 @@
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc.context import DEFAULT, RenderContext
+from doxygentoasciidoc.nodes import ItemizedlistNode
+
+
+def test_contexts_are_immutable():
+    ctx = RenderContext(depth=1)
+
+    with pytest.raises(AttributeError):
+        ctx.depth = 2
+
+
+def test_derived_contexts_leave_the_original_unchanged():
+    ctx = RenderContext(depth=1)
+
+    assert ctx.deeper() == RenderContext(depth=2)
+    assert ctx.at_depth(4) == RenderContext(depth=4)
+    assert ctx.in_documentation() == RenderContext(depth=1, documentation=True)
+    assert ctx.in_listing() == RenderContext(depth=1, programlisting=True)
+    assert ctx == RenderContext(depth=1)
+
+
+def test_deeper_keeps_every_other_option():
+    ctx = RenderContext(depth=1, programlisting=True).in_list(ordered=True)
+
+    assert ctx.deeper(2) == RenderContext(
+        depth=3, programlisting=True, ordered=True, ordereddepth=1
+    )
+
+
+def test_in_list_counts_ordered_and_unordered_lists():
+    ctx = DEFAULT.in_list(ordered=True).in_list(ordered=False)
+
+    assert (ctx.ordered, ctx.ordereddepth, ctx.unordereddepth) == (False, 1, 1)
+    assert ctx.listdepth() == 2
+
+
+def test_of_applies_options_to_a_context():
+    assert RenderContext.of() is DEFAULT
+    assert RenderContext.of(None, {"depth": 2}) == RenderContext(depth=2)
+    assert RenderContext.of(RenderContext(depth=2), {"documentation": True}) == (
+        RenderContext(depth=2, documentation=True)
+    )
+
+
+def test_nodes_accept_a_context_or_options(tmp_path):
+    xml = """<itemizedlist><listitem><para>Hello</para></listitem></itemizedlist>"""
+    node = ItemizedlistNode(BeautifulSoup(xml, "xml").itemizedlist, xmldir=tmp_path)
+
+    assert node.to_asciidoc(RenderContext(depth=2)) == node.to_asciidoc(depth=2)
+
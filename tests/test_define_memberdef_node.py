@@ -111,3 +111,26 @@ def test_to_asciidoc_with_multiline_initializer(tmp_path):
 
         Atomically unlock the lock's spin lock, and wait for a notification or a timeout."""
     )
+
+
+def test_fragment(tmp_path):
+    xml = """\
+      <memberdef kind="define" id="group__foo_1ga" prot="public" static="no">
+        <name>FOO</name>
+        <initializer>(1u &lt;&lt; 2)</initializer>
+        <briefdescription>
+<para>The foo bit. </para>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    """
+    node = DefineMemberdefNode(BeautifulSoup(xml, "xml").memberdef, xmldir=tmp_path)
+
+    initializer = node.fragment("initializer")
+    briefdescription = node.fragment("briefdescription", depth=1)
+
+    assert initializer == "(1u << 2)"
+    assert briefdescription == "The foo bit."
+    assert node.fragment("initializer") is initializer
+    assert node.fragment("briefdescription", depth=3) is briefdescription
@@ -282,3 +282,41 @@ def test_to_asciidoc_with_anonymous_enum(tmp_path):
         |Access point (AP) interface mode.
         |==="""
     )
+
+
+def test_enumerators(tmp_path):
+    xml = """\
+      <memberdef kind="enum" id="group__foo_1ga" prot="public" static="no" strong="no">
+        <type></type>
+        <name>foo</name>
+        <enumvalue id="group__foo_1gga1" prot="public">
+          <name>FOO_ONE</name>
+          <initializer>= 1</initializer>
+          <briefdescription>
+<para>The <bold>first</bold> value. </para>
+          </briefdescription>
+          <detaileddescription>
+          </detaileddescription>
+        </enumvalue>
+        <enumvalue id="group__foo_1gga2" prot="public">
+          <name>FOO_TWO</name>
+          <briefdescription>
+          </briefdescription>
+          <detaileddescription>
+          </detaileddescription>
+        </enumvalue>
+        <briefdescription>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    """
+    memberdef = EnumMemberdefNode(BeautifulSoup(xml, "xml").memberdef, xmldir=tmp_path)
+
+    enumerators = memberdef.enumerators()
+
+    assert enumerators == [
+        ("group_foo_1gga1", "FOO_ONE", "= 1", True, "The *first* value."),
+        ("group_foo_1gga2", "FOO_TWO", None, False, ""),
+    ]
+    assert memberdef.enumerators() is enumerators
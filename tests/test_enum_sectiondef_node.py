@@ -1,6 +1,6 @@
 from textwrap import dedent
 from bs4 import BeautifulSoup
-from doxygentoasciidoc.nodes import EnumSectiondefNode
+from doxygentoasciidoc.nodes import EnumMemberdefNode, EnumSectiondefNode
 
 
 def test_to_asciidoc(tmp_path):
@@ -182,3 +182,45 @@ def test_to_asciidoc_with_anonymous_enum(tmp_path):
 
         `enum { <<group_cyw43_ll_1ggadf764cbdea00d65edcd07bb9953ad2b7a01beff8333d8764c54b44bf2297a1f52,CYW43_ITF_STA>>, <<group_cyw43_ll_1ggadf764cbdea00d65edcd07bb9953ad2b7add57ac73ff47f04da4f09a7aaeb7eb90,CYW43_ITF_AP>> }`:: Network interface types [[group_cyw43_ll_1CYW43_ITF_]]."""
     )
+
+
+def test_summary_and_details_share_enumerators(tmp_path, monkeypatch):
+    xml = """\
+    <sectiondef kind="enum">
+      <memberdef kind="enum" id="group__foo_1ga" prot="public" static="no" strong="no">
+        <type></type>
+        <name>foo</name>
+        <enumvalue id="group__foo_1gga1" prot="public">
+          <name>FOO_ONE</name>
+          <briefdescription>
+<para>The first value. </para>
+          </briefdescription>
+          <detaileddescription>
+          </detaileddescription>
+        </enumvalue>
+        <briefdescription>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    </sectiondef>
+    """
+    sectiondef = EnumSectiondefNode(
+        BeautifulSoup(xml, "xml").sectiondef, xmldir=tmp_path
+    )
+    compiled = []
+    enumerator = EnumMemberdefNode.Enumerator
+
+    def counting(*fields):
+        compiled.append(fields[1])
+        return enumerator(*fields)
+
+    monkeypatch.setattr(EnumMemberdefNode, "Enumerator", staticmethod(counting))
+
+    # The summary lists the enum at depth 3, the details document it at depth 4
+    summary = sectiondef.to_asciidoc(depth=3)
+    details = sectiondef.to_details_asciidoc(depth=3)
+
+    assert "<<group_foo_1gga1,FOO_ONE>>" in summary
+    assert "|[[group_foo_1gga1]]FOO_ONE\n|The first value." in details
+    assert compiled == ["FOO_ONE"]
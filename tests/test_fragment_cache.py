@@ -0,0 +1,165 @@
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import fragmentcache
+from doxygentoasciidoc.fragmentcache import FragmentCache
+from doxygentoasciidoc.helpers import digest
+from doxygentoasciidoc.nodes import EnumSectiondefNode, FunctionSectiondefNode
+
+
+@pytest.fixture(name="cache")
+def fixture_cache(tmp_path):
+    cache = FragmentCache(f"{tmp_path}/fragments.db")
+    yield cache
+    cache.connection.close()
+
+
+def sectiondef(brief="Do something."):
+    xml = f"""\
+    <sectiondef kind="func">
+      <memberdef kind="function" id="group__foo_1ga" prot="public" static="no" const="no" explicit="no" inline="no" virt="non-virtual">
+        <type>void</type>
+        <definition>void foo</definition>
+        <argsstring>(void)</argsstring>
+        <name>foo</name>
+        <briefdescription>
+<para>{brief} </para>
+        </briefdescription>
+        <detaileddescription>
+<para>More about foo.</para>
+        </detaileddescription>
+      </memberdef>
+      <memberdef kind="function" id="group__foo_1gb" prot="public" static="no" const="no" explicit="no" inline="no" virt="non-virtual">
+        <type>int</type>
+        <definition>int bar</definition>
+        <argsstring>(void)</argsstring>
+        <name>bar</name>
+        <briefdescription>
+<para>Return something. </para>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    </sectiondef>
+    """
+    return FunctionSectiondefNode(BeautifulSoup(xml, "xml").sectiondef)
+
+
+def test_key_depends_on_the_xml_name_and_options(cache):
+    key = cache.key("abc", "memberdef", {"depth": 1})
+
+    assert cache.key("abc", "memberdef", {"depth": 1}) == key
+    assert cache.key("abd", "memberdef", {"depth": 1}) != key
+    assert cache.key("abc", "type", {"depth": 1}) != key
+    assert cache.key("abc", "memberdef", {"depth": 2}) != key
+
+
+def test_get_counts_hits_and_misses(cache):
+    cache.put("key", "AsciiDoc")
+
+    assert cache.get("key") == "AsciiDoc"
+    assert cache.get("other") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert "1 hits, 1 misses (50.0% hit rate), 1 fragments" in cache.to_text()
+
+
+def test_prune_deletes_the_least_recently_used_fragments(cache):
+    cache.max_size = 10
+    cache.put("old", "12345")
+    cache.put("new", "12345")
+    cache.flush()
+    cache.get("old")
+    cache.put("newest", "12345")
+
+    cache.flush()
+
+    assert cache.get("old") == "12345"
+    assert cache.get("newest") == "12345"
+    assert cache.get("new") is None
+    assert cache.size() == 10
+
+
+def test_fragments_persist_across_runs(tmp_path):
+    path = f"{tmp_path}/fragments.db"
+    fragmentcache.start(path)
+    try:
+        node = sectiondef()
+        summary = node.to_asciidoc(depth=2)
+        details = node.to_details_asciidoc(depth=2)
+    finally:
+        statistics = fragmentcache.stop()
+
+    assert "0 hits" in statistics
+
+    fragmentcache.start(path)
+    try:
+        node = sectiondef()
+        assert node.to_asciidoc(depth=2) == summary
+        assert node.to_details_asciidoc(depth=2) == details
+    finally:
+        statistics = fragmentcache.stop()
+
+    assert "0 misses" in statistics
+
+
+def test_changed_members_are_rendered_again(tmp_path):
+    path = f"{tmp_path}/fragments.db"
+    fragmentcache.start(path)
+    try:
+        node = sectiondef()
+        node.to_asciidoc(depth=2)
+        node.to_details_asciidoc(depth=2)
+    finally:
+        fragmentcache.stop()
+
+    fragmentcache.start(path)
+    try:
+        node = sectiondef(brief="Do something else.")
+        node.to_asciidoc(depth=2)
+        details = node.to_details_asciidoc(depth=2)
+        misses = fragmentcache.CACHE.misses
+    finally:
+        fragmentcache.stop()
+
+    assert "Do something else." in details
+    assert misses == 3
+
+
+def test_enum_digest_is_taken_before_rendering_the_enumerators(tmp_path):
+    # Rendering the brief of an enumvalue wraps its inline children in a para
+    xml = """\
+    <sectiondef kind="enum">
+      <memberdef kind="enum" id="group__foo_1ga" prot="public" static="no" strong="no">
+        <type></type>
+        <name>foo</name>
+        <enumvalue id="group__foo_1gga0" prot="public">
+          <name>FOO_A</name>
+          <briefdescription>The <bold>first</bold> value.<para>More.</para></briefdescription>
+          <detaileddescription>
+          </detaileddescription>
+        </enumvalue>
+        <briefdescription>
+<para>The foo. </para>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    </sectiondef>
+    """
+    pristine = digest(BeautifulSoup(xml, "xml").memberdef)
+    fragmentcache.start(f"{tmp_path}/fragments.db")
+    try:
+        node = EnumSectiondefNode(BeautifulSoup(xml, "xml").sectiondef)
+        node.to_asciidoc(depth=2)
+        details = node.to_details_asciidoc(depth=2)
+        (memberdef,) = node.memberdefs()
+        rendered = memberdef.digest()
+
+        # Only the documentation this time, so the enumerators render last
+        node = EnumSectiondefNode(BeautifulSoup(xml, "xml").sectiondef)
+        misses = fragmentcache.CACHE.misses
+        assert node.to_details_asciidoc(depth=2) == details
+        assert fragmentcache.CACHE.misses == misses
+    finally:
+        fragmentcache.stop()
+
+    assert rendered == pristine
@@ -198,3 +198,32 @@ def test_to_details_asciidoc(tmp_path):
 
         Initialise the ADC HW."""
     )
+
+
+def test_summary_and_details_share_fragments(tmp_path):
+    xml = """\
+    <sectiondef kind="func">
+      <memberdef kind="function" id="group__foo_1ga" prot="public" static="no" const="no" explicit="no" inline="no" virt="non-virtual">
+        <type>void</type>
+        <definition>void foo</definition>
+        <argsstring>(void)</argsstring>
+        <name>foo</name>
+        <briefdescription>
+<para>Do <bold>something</bold>. </para>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    </sectiondef>
+    """
+    sectiondef = FunctionSectiondefNode(
+        BeautifulSoup(xml, "xml").sectiondef, xmldir=tmp_path
+    )
+    sectiondef.to_asciidoc(depth=1)
+    [memberdef] = sectiondef.memberdefs()
+    memberdef.node.find("bold").string = "nothing"
+
+    asciidoc = sectiondef.to_details_asciidoc(depth=1)
+
+    assert sectiondef.memberdefs()[0] is memberdef
+    assert "Do *something*." in asciidoc
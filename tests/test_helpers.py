@@ -1,4 +1,21 @@
-from doxygentoasciidoc.helpers import escape_text, sanitize, title
+import random
+import re
+import pytest
+from bs4 import BeautifulSoup, Comment, NavigableString
+from doxygentoasciidoc.helpers import (
+    digest,
+    escape_text,
+    escape_texts,
+    invalidate_text,
+    normalize_strings,
+    normalize_text,
+    normalize_texts,
+    normalized_text,
+    sanitize,
+    smooth,
+    stripped_text,
+    title,
+)
 
 
 def test_escape_text_escapes_words_starting_with_double_underscore():
@@ -29,6 +46,100 @@ def test_escape_text_escapes_arrows():
     assert escape_text("->") == "\\->"
 
 
+def test_normalize_text_escapes_text():
+    assert normalize_text("foo __bar * baz") == "foo ++__bar++ ++*++ baz"
+
+
+def test_normalize_text_converts_line_breaks_to_spaces():
+    assert normalize_text("foo\nbar") == "foo bar"
+
+
+def test_normalize_text_collapses_runs_of_whitespace():
+    assert normalize_text("foo  \n\t bar\t\tbaz") == "foo bar baz"
+
+
+def test_normalize_text_preserves_single_whitespace_characters():
+    assert normalize_text("foo\tbar\xa0baz") == "foo\tbar\xa0baz"
+
+
+def test_normalize_text_strips_line_continuations_before_collapsing_whitespace():
+    assert normalize_text("foo \\\nbar") == "foo bar"
+
+
+def test_normalize_text_does_not_escape_double_parentheses_across_lines():
+    assert normalize_text("((foo\nbar))") == "((foo bar))"
+
+
+def unoptimized_normalize_text(text):
+    return re.sub(
+        r"\s{2,}",
+        " ",
+        re.sub(r"\s+\n\s+", "\n", escape_text(text)).replace("\n", " "),
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_normalize_text_is_equivalent_to_unoptimized_normalization(seed):
+    rng = random.Random(seed)
+    alphabet = [" ", "  ", "\n", "\t", "\r", "\xa0", "\\", "*", "_", "__"]
+    alphabet += ["(", "((", ")", "))", "-", ">", "->", "a", "word", "é"]
+
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+
+        assert normalize_text(text) == unoptimized_normalize_text(text)
+
+
+def test_escape_texts_does_not_escape_across_texts():
+    texts = ["((foo", "bar))", "a -", "> b", "foo \\", "\nbar", "__", "init"]
+
+    assert escape_texts(texts) == [escape_text(text) for text in texts]
+
+
+def test_escape_texts_escapes_texts_containing_nul_characters():
+    texts = ["*\0\n\0*", "__foo"]
+
+    assert escape_texts(texts) == [escape_text(text) for text in texts]
+
+
+def test_escape_texts_of_no_texts():
+    assert not escape_texts([])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_normalize_texts_is_equivalent_to_normalizing_each_text(seed):
+    rng = random.Random(seed)
+    alphabet = [" ", "  ", "\n", "\t", "\r", "\xa0", "\\", "*", "_", "__"]
+    alphabet += ["(", "((", ")", "))", "-", ">", "->", "a", "word", "é"]
+
+    texts = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+        for _ in range(200)
+    ]
+
+    assert normalize_texts(texts) == [normalize_text(text) for text in texts]
+    assert escape_texts(texts) == [escape_text(text) for text in texts]
+
+
+def test_normalize_strings_caches_the_text_of_descriptions():
+    soup = BeautifulSoup(
+        "<memberdef><name>__foo</name><type>int *</type>"
+        "<detaileddescription><para>A  *pointer*<programlisting>a  * b"
+        "</programlisting></para></detaileddescription></memberdef>",
+        "xml",
+    )
+
+    normalize_strings(soup.memberdef)
+    soup.find("type").string.replace_with("int")
+
+    assert soup.para.contents[0].__dict__["_doxygentoasciidoc_normalized"] == (
+        "A ++*++pointer++*++"
+    )
+    assert "_doxygentoasciidoc_normalized" not in soup.find("name").string.__dict__
+    assert "_doxygentoasciidoc_normalized" not in soup.programlisting.string.__dict__
+    assert normalized_text(soup.find("type").string) == "int"
+
+
 def test_sanitize_replaces_multiple_leading_underscores():
     assert sanitize("___foo__bar") == "_foo_bar"
 
@@ -157,3 +268,61 @@ def test_title_with_attribute_with_space():
         )
         == '[foo="bar baz"]\n== Title'
     )
+
+
+def test_stripped_text_is_fresh_once_invalidated_after_a_mutation():
+    soup = BeautifulSoup("<memberdef><name> foo </name></memberdef>", "xml")
+
+    assert stripped_text(soup.memberdef, "name") == "foo"
+    assert stripped_text(soup.memberdef) == "foo"
+
+    soup.find("name").string = "bar"
+    invalidate_text(soup.find("name"))
+
+    assert stripped_text(soup.memberdef, "name") == "bar"
+    assert stripped_text(soup.memberdef) == "bar"
+
+
+def test_smooth_merges_adjacent_strings_of_only_the_element_itself():
+    soup = BeautifulSoup("<para>a<bold>b</bold></para>", "xml")
+    soup.para.append(NavigableString("c"))
+    soup.para.append(NavigableString("d"))
+    soup.para.insert(0, NavigableString("0"))
+    soup.bold.append(NavigableString("e"))
+    soup.para.append(Comment("f"))
+
+    smooth(soup.para)
+
+    assert [str(child) for child in soup.para.contents] == [
+        "0a",
+        "<bold>be</bold>",
+        "cd",
+        "f",
+    ]
+    assert [str(child) for child in soup.bold.contents] == ["b", "e"]
+
+
+def test_stripped_text_of_a_missing_child_is_none():
+    soup = BeautifulSoup("<memberdef><name>foo</name></memberdef>", "xml")
+
+    assert stripped_text(soup.memberdef, "type") is None
+
+
+def test_digest_depends_on_the_entire_subtree():
+    def digest_of(xml):
+        return digest(BeautifulSoup(xml, "xml").memberdef)
+
+    original = digest_of('<memberdef id="a"><name>foo</name><para>x</para></memberdef>')
+
+    assert original == digest_of(
+        '<memberdef id="a"><name>foo</name><para>x</para></memberdef>'
+    )
+    assert original != digest_of(
+        '<memberdef id="b"><name>foo</name><para>x</para></memberdef>'
+    )
+    assert original != digest_of(
+        '<memberdef id="a"><name>bar</name><para>x</para></memberdef>'
+    )
+    assert original != digest_of(
+        '<memberdef id="a"><name>foo<para>x</para></name></memberdef>'
+    )
@@ -1,3 +1,4 @@
+import sys
 from textwrap import dedent
 from bs4 import BeautifulSoup
 from doxygentoasciidoc.nodes import ItemizedlistNode
@@ -183,3 +184,18 @@ def test_to_asciidoc_with_para_after_nested_list(tmp_path):
         After
         --"""
     )
+
+
+def test_to_asciidoc_with_lists_nested_deeper_than_the_recursion_limit(tmp_path):
+    levels = sys.getrecursionlimit() + 100
+    xml = (
+        "<itemizedlist><listitem>Item <bold>nested</bold>" * levels
+        + "</listitem></itemizedlist>" * levels
+    )
+
+    asciidoc = ItemizedlistNode(
+        BeautifulSoup(xml, "xml").itemizedlist, xmldir=tmp_path
+    ).to_asciidoc()
+
+    assert asciidoc.count("Item *nested*") == levels
+    assert f"{'*' * levels} {{empty}}" in asciidoc
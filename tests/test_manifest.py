@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+from doxygentoasciidoc.manifest import Manifest
+
+
+def test_write_writes_new_outputs(tmp_path):
+    written = Manifest().write(f"{tmp_path}/api.adoc", "= API\n")
+
+    assert written
+    with open(f"{tmp_path}/api.adoc", encoding="utf-8") as output:
+        assert output.read() == "= API\n"
+
+
+def test_write_leaves_unchanged_outputs_untouched(tmp_path):
+    Manifest().write(f"{tmp_path}/api.adoc", "= API\n")
+    os.utime(f"{tmp_path}/api.adoc", ns=(0, 0))
+
+    written = Manifest().write(f"{tmp_path}/api.adoc", "= API\n")
+
+    assert not written
+    assert os.stat(f"{tmp_path}/api.adoc").st_mtime_ns == 0
+
+
+def test_write_rewrites_changed_outputs(tmp_path):
+    Manifest().write(f"{tmp_path}/api.adoc", "= API\n")
+
+    written = Manifest().write(f"{tmp_path}/api.adoc", "= New API\n")
+
+    assert written
+    with open(f"{tmp_path}/api.adoc", encoding="utf-8") as output:
+        assert output.read() == "= New API\n"
+
+
+def test_save_records_hashes_and_inputs(tmp_path):
+    manifest = Manifest(f"{tmp_path}/manifest.json")
+    manifest.write(
+        f"{tmp_path}/api.adoc",
+        "= API\n",
+        inputs={"xml/index.xml", "xml/group__api.xml"},
+    )
+    manifest.save()
+
+    with open(f"{tmp_path}/manifest.json", encoding="utf-8") as file:
+        assert json.load(file) == {
+            "outputs": {
+                f"{tmp_path}/api.adoc": {
+                    "sha256": hashlib.sha256(b"= API\n").hexdigest(),
+                    "inputs": ["xml/group__api.xml", "xml/index.xml"],
+                }
+            }
+        }
+
+
+def test_it_keeps_outputs_recorded_by_previous_runs(tmp_path):
+    manifest = Manifest(f"{tmp_path}/manifest.json")
+    manifest.write(f"{tmp_path}/api.adoc", "= API\n")
+    manifest.save()
+
+    manifest = Manifest(f"{tmp_path}/manifest.json")
+    manifest.write(f"{tmp_path}/other.adoc", "= Other\n")
+    manifest.save()
+
+    assert sorted(Manifest(f"{tmp_path}/manifest.json").outputs) == [
+        f"{tmp_path}/api.adoc",
+        f"{tmp_path}/other.adoc",
+    ]
@@ -0,0 +1,49 @@
+from doxygentoasciidoc import memory
+from doxygentoasciidoc.helpers import escape_text
+
+
+def test_phase_does_nothing_unless_reporting_has_started():
+    with memory.phase("parse"):
+        pass
+
+    assert memory.stop() is None
+
+
+def test_phase_records_peak_and_retained_memory():
+    memory.start(nframes=3)
+    try:
+        retained = []
+        with memory.phase("render"):
+            transient = [escape_text(f"__foo {i}") for i in range(10000)]
+            retained.append(escape_text("__bar" * 100000))
+            del transient
+    finally:
+        report = memory.stop()
+
+    [(name, peak, retained_size, sites)] = report.phases
+    assert name == "render"
+    assert retained_size >= 500000
+    assert peak > retained_size
+    assert sites[0][0].startswith("helpers.py:")
+
+
+def test_to_text_reports_each_phase():
+    report = memory.MemoryReport()
+    report.phases.append(("parse", 2048, 1024, [("nodes.py:1", 1024)]))
+
+    assert report.to_text() == "\n".join(
+        (
+            "Phase          Peak      Retained",
+            "parse       2.0 KiB       1.0 KiB",
+            "",
+            "Top allocation sites in parse:",
+            "  nodes.py:1                 1.0 KiB",
+        )
+    )
+
+
+def test_format_bytes():
+    assert memory.format_bytes(10) == "10 B"
+    assert memory.format_bytes(1536) == "1.5 KiB"
+    assert memory.format_bytes(3 * 1024 * 1024) == "3.0 MiB"
+    assert memory.format_bytes(5 * 1024 * 1024 * 1024) == "5.0 GiB"
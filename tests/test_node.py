@@ -1,4 +1,6 @@
+import random
 from textwrap import dedent
+import pytest
 from bs4 import BeautifulSoup, NavigableString
 from doxygentoasciidoc.nodes import Node, BoldNode, EmphasisNode
 
@@ -308,3 +310,91 @@ def test_nodes_are_subscriptable():
 
     assert node["kind"] == "group"
     assert node["id"] == "not__sanitized"
+
+
+def test_text_reflects_changes_made_while_rendering(tmp_path):
+    xml = """<detaileddescription>Some text.<para>A paragraph.</para></detaileddescription>"""
+    node = Node(BeautifulSoup(xml, "xml").detaileddescription, xmldir=tmp_path)
+
+    assert node.text("para") == "A paragraph."
+
+    node.to_asciidoc()
+
+    assert node.text("para") == "Some text."
+
+
+def test_it_renders_deeply_nested_elements_without_recursing(tmp_path):
+    xml = f"""<para>{"<emphasis>" * 2000}Deep{"</emphasis>" * 2000}</para>"""
+    node = Node(BeautifulSoup(xml, "xml").para, xmldir=tmp_path)
+
+    assert node.to_asciidoc() == f"{'_' * 2000}Deep{'_' * 2000}"
+
+
+def random_inline_xml(rng, depth=0):
+    texts = [" ", "  ", "\n", "Hello", " * there ", "__init", "((x))", "a->b", "é"]
+    wrappers = ["bold", "emphasis", "computeroutput"]
+    empty = ["sp", "ndash", "mdash", "nonbreakablespace"]
+    parts = []
+    for _ in range(rng.randint(0, 6)):
+        kind = rng.randrange(5)
+        if kind == 0 and depth < 3:
+            name = rng.choice(wrappers)
+            parts.append(f"<{name}>{random_inline_xml(rng, depth + 1)}</{name}>")
+        elif kind == 1 and depth < 3:
+            parts.append(
+                f'<ulink url="https://example.com">{random_inline_xml(rng, depth + 1)}</ulink>'
+            )
+        elif kind == 2:
+            parts.append(
+                f'<ref refid="group__foo_1ga{depth}" kindref="member">{rng.choice(texts)}</ref>'
+            )
+        elif kind == 3:
+            parts.append(f"<{rng.choice(empty)}/>")
+        else:
+            parts.append(rng.choice(texts))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_inline_paragraphs_render_as_their_nodes_would(seed):
+    rng = random.Random(seed)
+
+    for _ in range(50):
+        xml = f"<para>{random_inline_xml(rng)}</para>"
+        node = Node(BeautifulSoup(xml, "xml").para)
+
+        assert node.to_inline_asciidoc() == node.to_asciidoc(), xml
+
+
+def test_paragraphs_with_block_markup_are_not_rendered_inline():
+    xml = """<para>Some <bold>text</bold><itemizedlist><listitem><para>An item</para></listitem></itemizedlist></para>"""
+    node = Node(BeautifulSoup(xml, "xml").para)
+
+    assert node.to_inline_asciidoc() is None
+
+
+def test_program_listings_are_not_rendered_inline():
+    xml = """<para>Some * text</para>"""
+    node = Node(BeautifulSoup(xml, "xml").para)
+
+    assert node.to_inline_asciidoc(programlisting=True) is None
+    assert BoldNode(BeautifulSoup(xml, "xml").para).to_inline_asciidoc() is None
+
+
+def test_text_is_fresh_after_rendering_wraps_inline_children():
+    soup = BeautifulSoup(
+        "<compounddef><detaileddescription>Intro <bold>in bold</bold>"
+        "<para>Second</para></detaileddescription></compounddef>",
+        "xml",
+    )
+    compounddef = Node(soup.compounddef)
+    detaileddescription = compounddef.child("detaileddescription")
+
+    assert detaileddescription.text("para") == "Second"
+    assert compounddef.text("detaileddescription") == "Introin boldSecond"
+
+    detaileddescription.to_asciidoc()
+
+    # The inline children are now wrapped in a para of their own
+    assert detaileddescription.text("para") == "Introin bold"
+    assert compounddef.text("detaileddescription") == "Introin boldSecond"
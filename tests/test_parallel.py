@@ -0,0 +1,293 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import parallel, parsers, tracing
+from doxygentoasciidoc.context import Conversion, RenderContext
+from doxygentoasciidoc.nodes import (
+    DefineSectiondefNode,
+    DetaileddescriptionNode,
+    DoxygenindexNode,
+    FunctionSectiondefNode,
+    SummaryTable,
+)
+
+
+@pytest.fixture(name="jobs")
+def fixture_jobs(monkeypatch):
+    if not parallel.FORK:
+        pytest.skip("Parallel rendering needs to fork worker processes")
+    monkeypatch.setattr(parallel, "THRESHOLD", 3)
+    return 2
+
+
+def sectiondef_xml(kind, count):
+    memberdefs = []
+    for i in range(count):
+        memberdefs.append(f"""\
+      <memberdef kind="{kind}" id="group__foo_1ga{i}" prot="public" static="no" const="no" explicit="no" inline="no" virt="non-virtual">
+        <type>int</type>
+        <definition>int foo_{i}</definition>
+        <argsstring>(void)</argsstring>
+        <name>foo_{count - i:03d}</name>
+        <initializer>({i}u)</initializer>
+        <briefdescription>
+<para>Foo number <bold>{i}</bold>. </para>
+        </briefdescription>
+        <detaileddescription>
+<para>More about foo {i}.</para>
+        </detaileddescription>
+      </memberdef>
+""")
+    return f"<sectiondef kind=\"{kind}\">{''.join(memberdefs)}</sectiondef>"
+
+
+def test_chunks_cover_every_item_in_order():
+    bounds = parallel.chunks(10, 2)
+
+    assert bounds[0][0] == 0
+    assert bounds[-1][1] == 10
+    assert all(stop == start for (_, stop), (start, _) in zip(bounds, bounds[1:]))
+    assert len(bounds) <= 2 * parallel.CHUNKS_PER_JOB
+
+
+def test_configure_rejects_invalid_values(monkeypatch):
+    monkeypatch.setattr(parallel, "THRESHOLD", 500)
+
+    with pytest.raises(ValueError):
+        parallel.check_jobs(-1)
+    with pytest.raises(ValueError):
+        parallel.configure(threshold=0)
+
+    parallel.configure(threshold=100)
+
+    assert parallel.check_jobs(4) == 4
+    assert parallel.THRESHOLD == 100
+
+
+def test_enabled_only_above_the_threshold(jobs):
+    assert not parallel.enabled(2, jobs)
+    assert parallel.enabled(3, jobs)
+
+
+def test_disabled_without_jobs():
+    assert not parallel.enabled(100000, 0)
+
+
+def test_map_chunks_preserves_order(jobs):
+    items = list(range(25))
+
+    assert parallel.map_chunks(
+        lambda chunk, offset: [item + offset for item in chunk],
+        items,
+        jobs,
+        jobs=jobs,
+    ) == [item + jobs for item in items]
+
+
+def test_map_chunks_merges_the_trace_events_of_workers(jobs):
+    def render(chunk):
+        with tracing.span("chunk", "render"):
+            return [os.getpid() for _ in chunk]
+
+    tracing.start()
+    try:
+        pids = parallel.map_chunks(render, list(range(25)), jobs=jobs)
+    finally:
+        events = tracing.stop()
+
+    assert len(events) == len(parallel.chunks(25, jobs))
+    assert {event["pid"] for event in events} == set(pids)
+    assert os.getpid() not in pids
+
+
+@pytest.mark.parametrize(
+    "kind,cls", [("function", FunctionSectiondefNode), ("define", DefineSectiondefNode)]
+)
+def test_parallel_details_match_serial_details(monkeypatch, jobs, kind, cls):
+    calls = []
+    map_chunks = parallel.map_chunks
+
+    def spy(function, items, *args, **kwargs):
+        calls.append(len(items))
+        return map_chunks(function, items, *args, **kwargs)
+
+    monkeypatch.setattr(parallel, "map_chunks", spy)
+    xml = sectiondef_xml(kind, 8)
+    parallel_sectiondef = cls(BeautifulSoup(xml, "xml").sectiondef)
+    parallel_sectiondef.to_asciidoc(depth=2)
+    asciidoc = parallel_sectiondef.to_details_asciidoc(depth=2, jobs=jobs)
+
+    serial_sectiondef = cls(BeautifulSoup(xml, "xml").sectiondef)
+    serial_sectiondef.to_asciidoc(depth=2)
+
+    assert calls == [8]
+    assert asciidoc == serial_sectiondef.to_details_asciidoc(depth=2)
+
+
+@pytest.fixture(name="index")
+def fixture_index(tmp_path, write_group, write_index):
+    refids = [f"group__module{i}" for i in range(5)]
+    for refid in refids:
+        write_group(tmp_path, refid)
+    return write_index(tmp_path, refids)
+
+
+def test_configure_rejects_unsupported_start_methods():
+    with pytest.raises(ValueError):
+        parallel.configure(start_method="forkserver")
+
+
+def test_modules_enabled_only_with_jobs_and_several_pieces():
+    assert not parallel.modules_enabled(10, 0)
+    assert not parallel.modules_enabled(1, 2)
+    assert parallel.modules_enabled(2, 2)
+
+
+@pytest.mark.parametrize("start_method", parallel.START_METHODS)
+def test_parallel_modules_match_serial_modules(monkeypatch, index, start_method):
+    serial = index.to_asciidoc(depth=2)
+    parsers.reset_inputs()
+
+    monkeypatch.setattr(parallel, "START_METHOD", start_method)
+    asciidoc = index.to_asciidoc(depth=2, conversion=Conversion(jobs=2))
+
+    assert asciidoc == serial
+    assert len(parsers.INPUTS) == 5
+
+
+# Spawned workers import everything again so never see the patch below
+@pytest.mark.parametrize(
+    "start_method", [method for method in parallel.START_METHODS if method != "spawn"]
+)
+def test_parallel_modules_merge_the_summaries_recorded_by_workers(
+    monkeypatch, tmp_path, index, start_method
+):
+    # Every module links to a struct of its own, only ever listed by a worker
+    structs = [f"structmodule{i}" for i in range(5)]
+    for refid in structs:
+        (tmp_path / f"{refid}.xml").write_text(
+            f"""\
+<doxygen version="1.9.7">
+  <compounddef id="{refid}" kind="struct">
+    <compoundname>{refid}</compoundname>
+    <briefdescription><para>A struct. </para></briefdescription>
+  </compounddef>
+</doxygen>""",
+            encoding="utf-8",
+        )
+    module_head_to_asciidoc = DoxygenindexNode.module_head_to_asciidoc
+
+    def listing_a_struct(self, module, node, ctx):
+        SummaryTable.for_xmldir(self.xmldir)[module.refid.replace("group__", "struct")]
+        return module_head_to_asciidoc(self, module, node, ctx)
+
+    monkeypatch.setattr(DoxygenindexNode, "module_head_to_asciidoc", listing_a_struct)
+    monkeypatch.setattr(parallel, "START_METHOD", start_method)
+    index.to_asciidoc(depth=2, conversion=Conversion(jobs=2))
+
+    summaries = SummaryTable.for_xmldir(index.xmldir)
+    assert all(refid in summaries for refid in structs)
+    assert summaries["structmodule0"].briefdescription == "A struct."
+
+
+@pytest.mark.parametrize("start_method", parallel.START_METHODS)
+def test_parallel_modules_merge_the_trace_events_of_workers(
+    monkeypatch, index, start_method
+):
+    tracing.start()
+    try:
+        index.to_asciidoc(depth=2)
+        serial = tracing.drain()
+        monkeypatch.setattr(parallel, "START_METHOD", start_method)
+        index.to_asciidoc(depth=2, conversion=Conversion(jobs=2))
+    finally:
+        events = tracing.stop()
+
+    main = (os.getpid(), threading.get_ident())
+    workers = {(event["pid"], event["tid"]) for event in events} - {main}
+    parses = {
+        event["name"]
+        for event in events
+        if event["cat"] == "parse" and (event["pid"], event["tid"]) != main
+    }
+
+    assert {(event["pid"], event["tid"]) for event in serial} == {main}
+    assert 1 <= len(workers) <= 2
+    assert parses == {f"group__module{i}" for i in range(5)}
+
+
+@pytest.fixture(name="switching")
+def fixture_switching():
+    # Switch threads as often as possible to interleave them as much as possible
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.usefixtures("switching")
+def test_many_threads_render_modules_as_serial(monkeypatch, index):
+    modules = list(index.rootmodules())
+    serial = index.modules_to_asciidoc(modules, depth=2)
+
+    contexts = set()
+    jobs = set()
+    render_pieces = index.render_pieces
+
+    def spy(pieces, ctx, conversion):
+        contexts.add(ctx)
+        jobs.add(conversion.jobs)
+        return render_pieces(pieces, ctx, conversion)
+
+    monkeypatch.setattr(index, "render_pieces", spy)
+    monkeypatch.setattr(parallel, "START_METHOD", "thread")
+    asciidoc = index.modules_to_asciidoc(
+        modules * 20, depth=2, conversion=Conversion(jobs=8)
+    )
+
+    assert asciidoc == serial * 20
+    # Workers render with the very same context, whatever their jobs, and
+    # members are never rendered by processes forked from a worker thread
+    assert contexts == {RenderContext(depth=2)}
+    assert jobs == {0}
+
+
+@pytest.mark.usefixtures("switching")
+def test_many_threads_render_a_shared_tree_as_serial():
+    xml = """\
+<detaileddescription>
+<para>Some text <bold>in bold</bold>.<itemizedlist>
+<listitem><para>An item.</para></listitem>
+<listitem><para>Another <emphasis>item</emphasis>.<orderedlist>
+<listitem><para>A nested item.</para></listitem>
+</orderedlist></para></listitem>
+</itemizedlist>More text.<simplesect kind="note"><para>A note.</para></simplesect>Even more text.</para>
+</detaileddescription>"""
+    serial = DetaileddescriptionNode(
+        BeautifulSoup(xml, "xml").detaileddescription
+    ).to_asciidoc(depth=2)
+    shared = BeautifulSoup(xml, "xml").detaileddescription
+
+    def render(_):
+        return DetaileddescriptionNode(shared).to_asciidoc(depth=2)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        outputs = list(executor.map(render, range(200)))
+
+    assert outputs == [serial] * 200
+
+
+def test_only_threads_rendering_the_same_tree_share_a_lock():
+    xml = """<detaileddescription><para>Text.<simplesect kind="note"><para>A note.</para></simplesect></para></detaileddescription>"""
+    tree = BeautifulSoup(xml, "xml")
+    other = BeautifulSoup(xml, "xml")
+
+    lock = DetaileddescriptionNode(tree.detaileddescription).tree_lock()
+
+    assert DetaileddescriptionNode(tree.para).tree_lock() is lock
+    assert DetaileddescriptionNode(other.detaileddescription).tree_lock() is not lock
+    with lock:
+        assert DetaileddescriptionNode(other.detaileddescription).to_asciidoc()
@@ -0,0 +1,148 @@
+import pytest
+from doxygentoasciidoc import parsers
+from doxygentoasciidoc.nodes import InnergroupNode
+from doxygentoasciidoc.parsers import TagFilter, parse, set_parser
+
+XML = """\
+<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygen xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="compound.xsd" version="1.9.7" xml:lang="en-US">
+  <compounddef id="group__hardware__base" kind="group">
+    <title>hardware_base</title>
+    <briefdescription>
+<para>Low-level <bold>types</bold> &amp; accessors – <ref refid="group__foo" kindref="compound">foo</ref></para>
+    </briefdescription>
+    <!-- A comment -->
+    <detaileddescription>
+<programlisting><codeline><highlight class="normal">int<sp/>x;</highlight></codeline></programlisting>
+    </detaileddescription>
+  </compounddef>
+</doxygen>
+"""
+
+
+@pytest.mark.parametrize("parser", ["lxml.etree", "expat"])
+def test_parse_builds_the_same_tree_as_lxml_xml(parser):
+    expected = parse(XML, "lxml-xml").doxygen
+
+    assert str(parse(XML, parser).doxygen) == str(expected)
+    assert parse(XML, parser).doxygen.attrs == expected.attrs
+
+
+@pytest.mark.parametrize("parser", ["lxml.etree", "expat"])
+def test_parse_names_namespaced_elements_and_attributes_by_prefix(parser):
+    xml = """\
+<doxygen xmlns:a="urn:a" xmlns="urn:default">
+  <a:compounddef a:id="foo" xml:space="preserve"><title xmlns:a="urn:b" a:x="y"/></a:compounddef>
+  <compounddef xmlns:b="urn:b" b:id="bar"/>
+</doxygen>
+"""
+    expected = parse(xml, "lxml-xml").doxygen
+
+    assert str(parse(xml, parser).doxygen) == str(expected)
+
+
+@pytest.mark.parametrize("parser", ["lxml.etree", "expat"])
+def test_parse_drops_the_namespaces_of_skipped_elements(parser):
+    xml = """\
+<doxygen><compounddef id="foo">
+  <detaileddescription xmlns:a="urn:a" a:x="y"/><briefdescription/>
+</compounddef></doxygen>
+"""
+    soup = parse(xml, parser, parse_only=TagFilter(("briefdescription",)))
+
+    assert soup.briefdescription.attrs == {}
+
+
+@pytest.mark.parametrize("parser", ["lxml.etree", "expat"])
+def test_parse_rejects_malformed_xml(parser):
+    with pytest.raises(SyntaxError):
+        parse("<doxygen><compounddef></doxygen>", parser)
+
+
+@pytest.mark.parametrize("parser", parsers.PARSERS)
+def test_parse_accepts_files(parser, tmp_path):
+    with open(f"{tmp_path}/group__hardware__base.xml", "w", encoding="utf-8") as xml:
+        xml.write(XML)
+
+    with open(f"{tmp_path}/group__hardware__base.xml", encoding="utf-8") as compoundxml:
+        soup = parse(compoundxml, parser)
+
+    assert soup.compounddef.title.get_text() == "hardware_base"
+
+
+def test_parse_rejects_unknown_parsers():
+    with pytest.raises(ValueError):
+        parse(XML, "html.parser")
+
+
+@pytest.mark.parametrize("parser", parsers.PARSERS)
+def test_set_parser_is_used_when_reading_compounds(parser, tmp_path, monkeypatch):
+    monkeypatch.setattr(parsers, "PARSER", parsers.PARSER)
+    with open(f"{tmp_path}/group__hardware__base.xml", "w", encoding="utf-8") as xml:
+        xml.write(XML)
+    set_parser(parser)
+
+    asciidoc = InnergroupNode(
+        parse(
+            '<innergroup refid="group__hardware__base">hardware_base</innergroup>'
+        ).innergroup,
+        xmldir=tmp_path,
+    ).to_asciidoc()
+
+    assert parsers.PARSER == parser
+    assert asciidoc == (
+        "<<group_hardware_base,hardware_base>>:: Low-level *types* & accessors – "
+        "<<group_foo,foo>>"
+    )
+
+
+def test_set_parser_rejects_unknown_parsers():
+    with pytest.raises(ValueError):
+        set_parser("html.parser")
+
+
+@pytest.mark.parametrize("parser", parsers.PARSERS)
+def test_parse_only_builds_the_given_children_of_compounddefs(parser):
+    soup = parse(XML, parser, parse_only=TagFilter(("title", "briefdescription")))
+
+    assert soup.compounddef["id"] == "group__hardware__base"
+    assert [child.name for child in soup.compounddef.find_all(recursive=False)] == [
+        "title",
+        "briefdescription",
+    ]
+    assert soup.compounddef.briefdescription.para.bold.get_text() == "types"
+    assert soup.find("programlisting") is None
+
+
+@pytest.mark.parametrize("parser", parsers.PARSERS)
+def test_parse_only_skips_matching_elements_nested_in_skipped_ones(parser):
+    xml = """\
+<doxygen>
+  <compounddef id="group__foo" kind="group">
+    <sectiondef kind="func"><memberdef kind="function" id="group__foo_1ga">
+      <briefdescription><para>Function</para></briefdescription>
+    </memberdef></sectiondef>
+    <briefdescription><para>Group</para></briefdescription>
+  </compounddef>
+</doxygen>
+"""
+
+    soup = parse(xml, parser, parse_only=TagFilter(("briefdescription",)))
+
+    assert [tag.get_text(strip=True) for tag in soup("briefdescription")] == ["Group"]
+
+
+def test_recording_records_every_compound_read(tmp_path):
+    for refid in ("group__foo", "group__bar"):
+        with open(f"{tmp_path}/{refid}.xml", "w", encoding="utf-8") as xml:
+            xml.write(XML)
+
+    with parsers.recording() as outer:
+        parsers.parse_compound(tmp_path, "group__foo")
+        with parsers.recording() as inner:
+            parsers.compound_path(tmp_path, "group__bar")
+    parsers.parse_compound(tmp_path, "group__foo")
+
+    assert inner == {"group__bar"}
+    assert outer == {"group__foo", "group__bar"}
+    assert f"{tmp_path}/group__bar.xml" in parsers.INPUTS
@@ -0,0 +1,255 @@
+import os
+import pytest
+from doxygentoasciidoc import nodes, parallel, parsers, schedule
+from doxygentoasciidoc.context import Conversion, RenderContext
+from doxygentoasciidoc.nodes import SummaryTable
+
+
+@pytest.fixture(name="model")
+def fixture_model():
+    return schedule.CostModel()
+
+
+@pytest.fixture(name="index")
+def fixture_index(tmp_path, write_group, write_index):
+    # A large module with three submodules (one of them with a submodule of
+    # its own) and two small modules
+    children = {
+        "group__big": ["group__a", "group__b", "group__c"],
+        "group__b": ["group__d"],
+    }
+    refids = [
+        "group__big",
+        "group__a",
+        "group__b",
+        "group__c",
+        "group__d",
+        "group__e",
+        "group__f",
+    ]
+    for refid in refids:
+        write_group(
+            tmp_path,
+            refid,
+            innergroups=children.get(refid, ()),
+            sectiondefs=f"""\
+    <sectiondef kind="define">
+      <memberdef kind="define" id="{refid}_1ga0" prot="public" static="no">
+        <name>{refid.upper()}_FOO</name>
+        <initializer>1</initializer>
+        <briefdescription>
+<para>The foo of {refid}. </para>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    </sectiondef>""",
+        )
+    return write_index(tmp_path, refids)
+
+
+def test_plan_puts_the_most_expensive_tasks_first():
+    plan = schedule.plan([[1.0], [3.0], [2.0], [3.0]], 4)
+
+    assert [task.position for task in plan.tasks] == [1, 3, 2, 0]
+    assert plan.split == 0
+    assert plan.predicted == 3.0
+
+
+def test_plan_splits_modules_longer_than_their_share():
+    plan = schedule.plan([[1.0, 4.0, 2.0], [1.0], [1.0]], 2)
+
+    assert plan.split == 1
+    assert plan.tasks[0] == schedule.Task(0, 1, 2, 4.0)
+    assert sorted((task.position, task.start, task.stop) for task in plan.tasks) == [
+        (0, 0, 1),
+        (0, 1, 2),
+        (0, 2, 3),
+        (1, 0, 1),
+        (2, 0, 1),
+    ]
+    assert plan.predicted == 5.0
+
+
+def test_plan_never_splits_a_single_piece():
+    plan = schedule.plan([[10.0], [1.0]], 2)
+
+    assert plan.split == 0
+    assert len(plan.tasks) == 2
+
+
+def test_schedule_reports_predicted_and_actual_makespan():
+    plan = schedule.plan([[1.0, 4.0, 2.0], [1.0]], 2)
+    plan.actual = 4.5
+
+    assert plan.to_text() == (
+        "Schedule: 4 tasks (1 modules split) on 2 workers, "
+        "predicted makespan 4.00 s, actual 4.50 s"
+    )
+
+
+def test_least_squares_recovers_exact_coefficients():
+    rows = [
+        ((size, members, text), 2 * size + 3 * members + 0.5 * text)
+        for size, members, text in ((10, 1, 4), (20, 5, 1), (5, 2, 8), (7, 7, 7))
+    ]
+
+    assert schedule.least_squares(rows) == pytest.approx((2, 3, 0.5))
+
+
+def test_least_squares_needs_enough_independent_rows():
+    assert schedule.least_squares([]) is None
+    assert schedule.least_squares([((1, 2, 3), 1.0)]) is None
+    assert schedule.least_squares([((1, 1, 1), 1.0)] * 3) is None
+
+
+def test_estimate_reuses_the_seconds_of_unchanged_groups(model):
+    model.record("group__a", [1, 100], schedule.Rendered("", 0.5, 2, 10))
+
+    assert model.estimate("group__a", [1, 100]) == 0.5
+
+
+def test_estimate_scales_new_groups_by_size(model):
+    assert model.estimate("group__a", [1, 100]) == 100 * schedule.DEFAULT_RATE
+
+    model.record("group__a", [1, 100], schedule.Rendered("", 0.5, 2, 10))
+
+    assert model.estimate("group__b", [1, 200]) == pytest.approx(1.0)
+
+
+def test_estimate_fits_changed_groups(model):
+    for refid, size, members, text in (
+        ("group__a", 10, 1, 4),
+        ("group__b", 20, 5, 1),
+        ("group__c", 5, 2, 8),
+        ("group__d", 7, 7, 7),
+    ):
+        seconds = 2 * size + 3 * members + 0.5 * text
+        model.record(refid, [1, size], schedule.Rendered("", seconds, members, text))
+
+    assert model.estimate("group__a", [2, 30]) == pytest.approx(2 * 30 + 3 + 2)
+
+
+def test_costs_survive_a_round_trip(model, tmp_path):
+    model.record("group__a", [1, 100], schedule.Rendered("", 0.5, 2, 10))
+    model.save(tmp_path / "costs.json")
+
+    loaded = schedule.CostModel()
+    loaded.load(tmp_path / "costs.json")
+
+    assert loaded.costs == model.costs
+    assert loaded.estimate("group__a", [1, 100]) == 0.5
+
+
+def test_load_ignores_a_missing_file(tmp_path):
+    model = schedule.CostModel()
+    model.load(tmp_path / "costs.json")
+
+    assert not model.costs
+
+
+def test_module_pieces_are_each_descendant_in_order(index):
+    module = next(index.rootmodules())
+    pieces = index.module_pieces(module, RenderContext(depth=2))
+
+    assert [(group.refid, depth) for group, depth in pieces] == [
+        ("group__big", None),
+        ("group__a", 3),
+        ("group__b", 3),
+        ("group__d", 4),
+        ("group__c", 3),
+    ]
+
+
+def test_rendering_a_module_records_each_piece(model, index):
+    module = next(index.rootmodules())
+    index.module_to_asciidoc(module, depth=2, conversion=Conversion(model=model))
+
+    assert set(model.costs) == {
+        "group__big",
+        "group__a",
+        "group__b",
+        "group__c",
+        "group__d",
+    }
+    assert model.costs["group__a"].members == 1
+    assert model.costs["group__a"].text > 0
+    assert all(cost.seconds > 0 for cost in model.costs.values())
+
+
+def test_recorded_costs_survive_groups_written_again(model, index, tmp_path):
+    module = next(index.rootmodules())
+    index.module_to_asciidoc(module, depth=2, conversion=Conversion(model=model))
+    model.save(tmp_path / "costs.json")
+    # As when Doxygen runs again without any change to the sources
+    path = tmp_path / "group__a.xml"
+    path.write_bytes(path.read_bytes())
+    os.utime(path, ns=(0, 0))
+    SummaryTable.reset()
+
+    loaded = schedule.CostModel()
+    loaded.load(tmp_path / "costs.json")
+    pieces = index.module_pieces(module, RenderContext(depth=2))
+
+    assert loaded.estimate_pieces(pieces) == [
+        model.costs[group.refid].seconds for group, _ in pieces
+    ]
+
+
+def test_rendering_without_a_model_measures_nothing(monkeypatch, index):
+    def text_strings(element):
+        raise AssertionError("The text of a piece is measured without a model")
+
+    monkeypatch.setattr(nodes, "text_strings", text_strings)
+    module = next(index.rootmodules())
+    ctx = RenderContext(depth=2)
+    rendered = index.render_pieces(index.module_pieces(module, ctx), ctx)
+
+    assert all(piece.members is None for piece in rendered)
+    assert all(piece.text is None for piece in rendered)
+    assert all(piece.seconds > 0 for piece in rendered)
+
+
+@pytest.mark.parametrize("start_method", parallel.START_METHODS)
+def test_split_modules_match_serial_modules(monkeypatch, model, index, start_method):
+    serial = index.to_asciidoc(depth=2)
+    parsers.reset_inputs()
+    # Make the pieces of the large module expensive enough to be split
+    for refid in ("group__big", "group__a", "group__b", "group__c", "group__d"):
+        model.record(
+            refid,
+            SummaryTable.for_xmldir(index.xmldir)[refid].stamp,
+            schedule.Rendered("", 10.0, 1, 1),
+        )
+    costs = dict(model.costs)
+
+    monkeypatch.setattr(parallel, "START_METHOD", start_method)
+    monkeypatch.setattr(schedule, "SCHEDULES", [])
+    asciidoc = index.to_asciidoc(depth=2, conversion=Conversion(jobs=2, model=model))
+
+    assert asciidoc == serial
+    assert len(parsers.INPUTS) == 7
+    (plan,) = schedule.SCHEDULES
+    assert plan.split == 1
+    assert len(plan.tasks) == 7
+    assert plan.actual > 0
+    # Every piece rendered by the workers is recorded with its new cost
+    assert len(model.costs) == 7
+    assert all(model.costs[refid] != cost for refid, cost in costs.items())
+
+
+@pytest.mark.parametrize("start_method", parallel.START_METHODS)
+def test_a_single_root_module_is_split(monkeypatch, index, start_method):
+    big = next(index.rootmodules())
+    (serial,) = index.modules_to_asciidoc([big], depth=2)
+
+    monkeypatch.setattr(parallel, "START_METHOD", start_method)
+    monkeypatch.setattr(schedule, "SCHEDULES", [])
+    (asciidoc,) = index.modules_to_asciidoc(
+        [big], depth=2, conversion=Conversion(jobs=2)
+    )
+
+    assert asciidoc == serial
+    (plan,) = schedule.SCHEDULES
+    assert plan.split == 1
+    assert len(plan.tasks) == 5
@@ -0,0 +1,74 @@
+import pytest
+from doxygentoasciidoc.shards import Partial, assign, merge, parse_shard
+
+
+@pytest.fixture(name="index")
+def fixture_index(tmp_path, write_group, write_index):
+    refids = []
+    for i, paragraphs in enumerate((1, 40, 2, 20, 3)):
+        refid = f"group__module{i}"
+        write_group(
+            tmp_path,
+            refid,
+            detaileddescription="".join(
+                f"<para>Paragraph {j} about module {i}.</para>"
+                for j in range(paragraphs)
+            ),
+        )
+        refids.append(refid)
+    return write_index(tmp_path, refids)
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (1, 4)
+    assert parse_shard("4/4") == (4, 4)
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1", "a/b", "1/2/3"])
+def test_parse_shard_rejects_invalid_shards(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_assign_balances_by_cost():
+    assert assign([100, 1, 1, 1, 50, 50], 2) == [1, 1, 2, 1, 2, 2]
+
+
+def test_assign_breaks_ties_by_position():
+    assert assign([1, 1, 1, 1], 2) == [1, 2, 1, 2]
+
+
+def test_partial_round_trip(tmp_path):
+    partial = Partial(2, 3, 5, {4: "Four", 1: "One"})
+    with open(f"{tmp_path}/partial.json", "w", encoding="utf-8") as file:
+        file.write(partial.to_json())
+
+    loaded = Partial.load(f"{tmp_path}/partial.json")
+
+    assert (loaded.shard, loaded.count, loaded.total) == (2, 3, 5)
+    assert loaded.outputs == {1: "One", 4: "Four"}
+
+
+def test_merge_rejects_missing_shards():
+    with pytest.raises(ValueError):
+        merge([Partial(1, 2, 2, {0: "Zero"})])
+
+
+def test_merge_rejects_partials_from_different_builds():
+    with pytest.raises(ValueError):
+        merge([Partial(1, 2, 2, {0: "Zero"}), Partial(2, 3, 3, {1: "One"})])
+
+
+def test_merge_rejects_missing_modules():
+    with pytest.raises(ValueError):
+        merge([Partial(1, 2, 3, {0: "Zero"}), Partial(2, 2, 3, {2: "Two"})])
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 7])
+def test_merged_shards_match_an_unsharded_build(index, count):
+    partials = [
+        index.to_partial(shard, count, depth=2) for shard in range(1, count + 1)
+    ]
+
+    assert merge(partials[::-1]) == index.to_asciidoc(depth=2)
+    assert sum(len(partial.outputs) for partial in partials) == 5
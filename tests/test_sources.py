@@ -0,0 +1,158 @@
+import io
+import pickle
+import tarfile
+import zipfile
+import zlib
+
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import parsers, sources
+from doxygentoasciidoc.nodes import DoxygenindexNode
+from doxygentoasciidoc.sources import MemorySource, TarSource, ZipSource
+
+FILES = {
+    "index": """\
+<doxygenindex version="1.9.7" xml:lang="en-US">
+  <compound refid="group__outer" kind="group"><name>outer</name></compound>
+  <compound refid="group__inner" kind="group"><name>inner</name></compound>
+</doxygenindex>""",
+    "group__outer": """\
+<doxygen version="1.9.7" xml:lang="en-US">
+  <compounddef id="group__outer" kind="group">
+    <compoundname>outer</compoundname>
+    <title>Outer</title>
+    <innergroup refid="group__inner">inner</innergroup>
+    <briefdescription>
+<para>The outer module. </para>
+    </briefdescription>
+    <detaileddescription>
+<para>See <ref refid="group__inner" kindref="compound">the inner module</ref>.</para>
+    </detaileddescription>
+  </compounddef>
+</doxygen>""",
+    "group__inner": """\
+<doxygen version="1.9.7" xml:lang="en-US">
+  <compounddef id="group__inner" kind="group">
+    <compoundname>inner</compoundname>
+    <title>Inner</title>
+    <briefdescription>
+<para>The inner module. </para>
+    </briefdescription>
+    <detaileddescription>
+    </detaileddescription>
+  </compounddef>
+</doxygen>""",
+}
+
+
+@pytest.fixture(name="xmldir")
+def fixture_xmldir(tmp_path):
+    for refid, xml in FILES.items():
+        (tmp_path / f"{refid}.xml").write_text(xml, encoding="utf-8")
+    return str(tmp_path)
+
+
+def write_zip(path):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for refid, xml in FILES.items():
+            archive.writestr(f"xml/{refid}.xml", xml)
+        archive.writestr("xml/doxygen.css", "")
+
+
+def write_tar(path, mode="w:gz"):
+    with tarfile.open(path, mode) as archive:
+        for refid, xml in FILES.items():
+            data = xml.encode("utf-8")
+            info = tarfile.TarInfo(f"xml/{refid}.xml")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def convert(xmldir):
+    index = parsers.parse(sources.get(xmldir).index())
+    return DoxygenindexNode(index.doxygenindex, xmldir=xmldir).to_asciidoc(depth=2)
+
+
+def test_unregistered_names_are_directories(xmldir):
+    source = sources.get(xmldir)
+
+    assert source.markup("group__inner") == FILES["group__inner"]
+    assert source.path("group__inner") == f"{xmldir}/group__inner.xml"
+    with pytest.raises(FileNotFoundError):
+        source.markup("group__missing")
+
+
+def test_zip_archives_are_indexed_by_compound(tmp_path):
+    write_zip(f"{tmp_path}/xml.zip")
+
+    source = sources.load(f"{tmp_path}/xml.zip")
+
+    assert isinstance(source, ZipSource)
+    assert sorted(source.members) == ["group__inner", "group__outer", "index"]
+    assert source.markup("group__outer") == FILES["group__outer"]
+    assert sources.get(f"{tmp_path}/xml.zip") is source
+    with pytest.raises(FileNotFoundError):
+        source.markup("group__missing")
+
+
+def test_zip_archives_are_opened_again_after_pickling(tmp_path):
+    write_zip(f"{tmp_path}/xml.zip")
+
+    source = pickle.loads(pickle.dumps(sources.load(f"{tmp_path}/xml.zip")))
+
+    assert source.markup("group__inner") == FILES["group__inner"]
+
+
+def test_tar_archives_are_read_once(tmp_path):
+    write_tar(f"{tmp_path}/xml.tar.gz")
+
+    source = sources.load(f"{tmp_path}/xml.tar.gz")
+
+    assert isinstance(source, TarSource)
+    assert source.markup("group__outer") == FILES["group__outer"]
+    xml = FILES["group__outer"].encode("utf-8")
+    assert source.stamp("group__outer") == [zlib.crc32(xml), len(xml)]
+
+
+def test_zstandard_tar_archives(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    write_tar(f"{tmp_path}/xml.tar", mode="w")
+    with open(f"{tmp_path}/xml.tar", "rb") as tar, open(
+        f"{tmp_path}/xml.tar.zst", "wb"
+    ) as zst:
+        zst.write(zstandard.ZstdCompressor().compress(tar.read()))
+
+    source = sources.load(f"{tmp_path}/xml.tar.zst")
+
+    assert source.markup("group__inner") == FILES["group__inner"]
+
+
+def test_unknown_archives_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        sources.load(f"{tmp_path}/xml.rar")
+
+
+@pytest.mark.parametrize("archive", ["xml.zip", "xml.tar.gz", "xml.tar"])
+def test_archive_output_matches_directory(tmp_path, xmldir, archive):
+    path = f"{tmp_path}/{archive}"
+    if archive.endswith(".zip"):
+        write_zip(path)
+    else:
+        write_tar(path, mode="w:gz" if archive.endswith(".gz") else "w")
+    expected = convert(xmldir)
+
+    sources.load(path)
+    parsers.reset_inputs()
+    asciidoc = convert(path)
+
+    assert asciidoc == expected
+    assert "=== Inner" in asciidoc
+    assert parsers.INPUTS == {path}
+
+
+def test_memory_output_matches_directory(xmldir):
+    expected = convert(xmldir)
+
+    sources.register(MemorySource("memory", FILES))
+
+    assert convert("memory") == expected
@@ -0,0 +1,127 @@
+import os
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import nodes
+from doxygentoasciidoc.nodes import InnergroupNode, SummaryTable
+
+XML = """\
+<?xml version='1.0' encoding='UTF-8' standalone='no'?>
+<doxygen xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" version="1.9.7">
+  <compounddef id="group__channel__config" kind="group">
+    <compoundname>channel_config</compoundname>
+    <title>channel_config</title>
+    <sectiondef kind="func">
+      <memberdef kind="function" id="group__channel__config_1ga">
+        <briefdescription><para>Not this one</para></briefdescription>
+      </memberdef>
+    </sectiondef>
+    <briefdescription>
+<para>DMA <bold>channel</bold> configuration. </para>
+    </briefdescription>
+  </compounddef>
+</doxygen>
+"""
+
+
+def write_compound(tmp_path, xml=XML):
+    with open(
+        f"{tmp_path}/group__channel__config.xml", "w", encoding="utf-8"
+    ) as compound:
+        compound.write(xml)
+
+
+def test_it_summarizes_compounds_on_first_use(tmp_path):
+    write_compound(tmp_path)
+
+    summary = SummaryTable(tmp_path)["group__channel__config"]
+
+    assert summary.id == "group_channel_config"
+    assert summary.title == "channel_config"
+    assert summary.compoundname == "channel_config"
+    assert summary.briefdescription == "DMA *channel* configuration."
+
+
+def test_it_only_summarizes_each_compound_once(tmp_path, monkeypatch):
+    write_compound(tmp_path)
+    summaries = SummaryTable(tmp_path)
+    summary = summaries["group__channel__config"]
+    monkeypatch.setattr(nodes, "parse_compound", None)
+
+    assert summaries["group__channel__config"] is summary
+
+
+def test_for_xmldir_shares_a_table_per_directory(tmp_path):
+    assert SummaryTable.for_xmldir(tmp_path) is SummaryTable.for_xmldir(str(tmp_path))
+
+
+def test_reset_discards_the_table_of_every_directory(tmp_path):
+    summaries = SummaryTable.for_xmldir(tmp_path)
+    SummaryTable.reset()
+
+    assert SummaryTable.for_xmldir(tmp_path) is not summaries
+
+
+def test_it_can_be_saved_and_loaded(tmp_path, monkeypatch):
+    write_compound(tmp_path)
+    summaries = SummaryTable(tmp_path)
+    summary = summaries["group__channel__config"]
+    summaries.save(f"{tmp_path}/summaries.json")
+    monkeypatch.setattr(nodes, "parse_compound", None)
+
+    loaded = SummaryTable(tmp_path)
+    loaded.load(f"{tmp_path}/summaries.json")
+
+    assert "group__channel__config" in loaded
+    assert tuple(loaded["group__channel__config"]) == tuple(summary)
+
+
+def test_it_keeps_saved_summaries_of_compounds_written_again(tmp_path, monkeypatch):
+    write_compound(tmp_path)
+    summaries = SummaryTable(tmp_path)
+    summary = summaries["group__channel__config"]
+    summaries.save(f"{tmp_path}/summaries.json")
+    # As when Doxygen runs again without any change to the sources
+    write_compound(tmp_path)
+    os.utime(f"{tmp_path}/group__channel__config.xml", ns=(0, 0))
+    monkeypatch.setattr(nodes, "parse_compound", None)
+
+    loaded = SummaryTable(tmp_path)
+    loaded.load(f"{tmp_path}/summaries.json")
+
+    assert tuple(loaded["group__channel__config"]) == tuple(summary)
+
+
+def test_it_discards_saved_summaries_of_changed_compounds(tmp_path):
+    write_compound(tmp_path)
+    summaries = SummaryTable(tmp_path)
+    summaries["group__channel__config"]
+    summaries.save(f"{tmp_path}/summaries.json")
+    write_compound(tmp_path, XML.replace("DMA", "The DMA"))
+
+    loaded = SummaryTable(tmp_path)
+    loaded.load(f"{tmp_path}/summaries.json")
+
+    assert len(loaded) == 0
+    assert (
+        loaded["group__channel__config"].briefdescription
+        == "The DMA *channel* configuration."
+    )
+
+
+def test_innergroup_nodes_render_from_a_loaded_table(tmp_path, monkeypatch):
+    write_compound(tmp_path)
+    summaries = SummaryTable(tmp_path)
+    summaries["group__channel__config"]
+    summaries.save(f"{tmp_path}/summaries.json")
+    monkeypatch.setattr(SummaryTable, "tables", {})
+    SummaryTable.for_xmldir(tmp_path).load(f"{tmp_path}/summaries.json")
+    monkeypatch.setattr(nodes, "parse_compound", None)
+    xml = """<innergroup refid="group__channel__config">channel_config</innergroup>"""
+
+    asciidoc = InnergroupNode(
+        BeautifulSoup(xml, "xml").innergroup, xmldir=tmp_path
+    ).to_asciidoc()
+
+    assert (
+        asciidoc
+        == "<<group_channel_config,channel_config>>:: DMA *channel* configuration."
+    )
@@ -0,0 +1,60 @@
+import json
+import pytest
+from bs4 import BeautifulSoup
+from doxygentoasciidoc import tracing
+from doxygentoasciidoc.nodes import FunctionMemberdefNode
+
+
+@pytest.fixture(name="events")
+def fixture_events():
+    tracing.start()
+    yield tracing.EVENTS
+    tracing.stop()
+
+
+def test_span_does_nothing_unless_tracing_has_started():
+    with tracing.span("index.xml", "parse"):
+        pass
+
+    assert tracing.stop() == []
+
+
+def test_span_records_complete_events(events):
+    with tracing.span("index.xml", "parse", filtered=True):
+        pass
+
+    assert len(events) == 1
+    assert events[0]["name"] == "index.xml"
+    assert events[0]["cat"] == "parse"
+    assert events[0]["ph"] == "X"
+    assert events[0]["dur"] >= 0
+    assert events[0]["args"] == {"filtered": True}
+
+
+def test_traced_records_a_span_per_render(events, tmp_path):
+    xml = """\
+    <memberdef kind="function" id="group__foo_1ga" static="no" inline="no">
+      <type>void</type>
+      <name>foo</name>
+      <briefdescription></briefdescription>
+      <detaileddescription></detaileddescription>
+    </memberdef>
+    """
+
+    FunctionMemberdefNode(
+        BeautifulSoup(xml, "xml").memberdef, xmldir=tmp_path
+    ).to_asciidoc()
+
+    assert [(event["name"], event["cat"]) for event in events] == [
+        ("FunctionMemberdefNode group__foo_1ga", "render")
+    ]
+
+
+def test_save_writes_chrome_trace_event_json(events, tmp_path):
+    with tracing.span("index.xml", "parse"):
+        pass
+
+    tracing.save(f"{tmp_path}/trace.json")
+
+    with open(f"{tmp_path}/trace.json", encoding="utf-8") as trace:
+        assert json.load(trace)["traceEvents"] == events
@@ -0,0 +1,103 @@
+import pytest
+from doxygentoasciidoc import parsers, variants
+from doxygentoasciidoc.context import Conversion
+
+# A module with two submodules and a module on its own
+MODULES = {
+    "group__hardware": ["group__gpio", "group__uart"],
+    "group__gpio": [],
+    "group__uart": [],
+    "group__misc": [],
+}
+
+
+@pytest.fixture(name="store")
+def fixture_store():
+    return variants.CompoundStore()
+
+
+@pytest.fixture(name="conversion")
+def fixture_conversion(store):
+    return Conversion(store=store)
+
+
+@pytest.fixture(name="variant")
+def fixture_variant(write_group, write_index):
+    def variant(path, titles=None):
+        """Write the XML of a variant to the given directory and return its
+        index."""
+        path.mkdir()
+        titles = titles or {}
+        for refid, children in MODULES.items():
+            write_group(
+                path,
+                refid,
+                title=titles.get(refid, refid),
+                innergroups=children,
+                sectiondefs=f"""\
+    <sectiondef kind="func">
+      <memberdef kind="function" id="{refid}_1ga0" prot="public" static="no" const="no" explicit="no" inline="no" virt="non-virtual">
+        <type>int</type>
+        <definition>int {refid}_foo</definition>
+        <argsstring>(void)</argsstring>
+        <name>{refid}_foo</name>
+        <briefdescription>
+<para>The foo of {refid}. </para>
+        </briefdescription>
+        <detaileddescription>
+        </detaileddescription>
+      </memberdef>
+    </sectiondef>""",
+            )
+        return write_index(path, MODULES)
+
+    return variant
+
+
+def test_identical_variants_are_rendered_once(store, conversion, tmp_path, variant):
+    first = variant(tmp_path / "a").to_asciidoc(depth=2, conversion=conversion)
+    second = variant(tmp_path / "b").to_asciidoc(depth=2, conversion=conversion)
+
+    assert second == first
+    assert store.misses == 4
+    assert store.hits == 4
+
+
+def test_variants_match_separate_conversions(tmp_path, variant):
+    titles = {"group__gpio": "GPIO"}
+    expected = variant(tmp_path / "expected", titles).to_asciidoc(depth=2)
+
+    store = variants.CompoundStore()
+    conversion = Conversion(store=store)
+    variant(tmp_path / "a").to_asciidoc(depth=2, conversion=conversion)
+    asciidoc = variant(tmp_path / "b", titles).to_asciidoc(
+        depth=2, conversion=conversion
+    )
+
+    assert asciidoc == expected
+    # The changed submodule and the module listing its title are rendered
+    # again but the other submodule and module are not
+    assert store.misses == 4 + 2
+    assert store.hits == 2
+
+
+def test_reused_compounds_are_inputs_of_each_variant(
+    store, conversion, tmp_path, variant
+):
+    variant(tmp_path / "a").to_asciidoc(depth=2, conversion=conversion)
+    parsers.reset_inputs()
+
+    variant(tmp_path / "b").to_asciidoc(depth=2, conversion=conversion)
+
+    assert store.hits == 4
+    assert parsers.INPUTS >= {str(tmp_path / "b" / f"{refid}.xml") for refid in MODULES}
+
+
+def test_store_reports_the_work_deduplicated(store, conversion, tmp_path, variant):
+    variant(tmp_path / "a").to_asciidoc(depth=2, conversion=conversion)
+    variant(tmp_path / "b").to_asciidoc(depth=2, conversion=conversion)
+
+    assert store.to_text().startswith(
+        "Variants: 4 compounds rendered, 4 reused from another variant "
+        "(50.0% deduplicated), "
+    )
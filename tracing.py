@@ -0,0 +1,108 @@
+import functools
+import json
+import os
+import threading
+import time
+
+# The trace events recorded so far, or None if tracing is disabled.
+EVENTS = None
+
+
+def start():
+    """Start recording trace events, discarding any recorded so far."""
+    global EVENTS  # pylint: disable=global-statement
+    EVENTS = []
+
+
+def stop():
+    """Stop recording trace events and return those recorded."""
+    global EVENTS  # pylint: disable=global-statement
+    events, EVENTS = EVENTS, None
+    return events or []
+
+
+def drain():
+    """Return the events recorded so far, discarding them but recording on.
+
+    A worker process drains its events to send them back to its parent along
+    with its results, see merge."""
+    global EVENTS  # pylint: disable=global-statement
+    if EVENTS is None:
+        return []
+    events, EVENTS = EVENTS, []
+    return events
+
+
+def merge(events):
+    """Add the events recorded (and drained) by a worker process to those
+    recorded here, if still recording.
+
+    Each event is already tagged with the process and thread that recorded
+    it and timestamps come from the same monotonic clock in every process,
+    so the worker's spans line up with this process's in the timeline."""
+    if EVENTS is not None:
+        EVENTS.extend(events)
+
+
+class span:  # pylint: disable=invalid-name
+    """A context manager recording its duration as a complete trace event.
+
+    Does nothing at all unless tracing has been started."""
+
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, **args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        if EVENTS is not None:
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_exc):
+        if self.start is not None and EVENTS is not None:
+            EVENTS.append(
+                {
+                    "name": self.name,
+                    "cat": self.category,
+                    "ph": "X",
+                    "ts": self.start // 1000,
+                    "dur": (time.perf_counter_ns() - self.start) // 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": self.args,
+                }
+            )
+
+
+def traced(category):
+    """Decorate a Node's to_asciidoc method so that each call is traced.
+
+    Each call is recorded as a span named after the class and the ID of the
+    node being rendered."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if EVENTS is None:
+                return method(self, *args, **kwargs)
+            name = f"{type(self).__name__} {self.node.get('id', '')}".rstrip()
+            with span(name, category):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def save(path, events=None):
+    """Save the given (or all recorded) events as a Chrome trace-event file.
+
+    The file can be opened in Perfetto or chrome://tracing."""
+    if events is None:
+        events = EVENTS or []
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
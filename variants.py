@@ -0,0 +1,76 @@
+import hashlib
+import json
+
+from . import sources
+from .parsers import compound_path, recording
+
+
+class CompoundStore:
+    """The AsciiDoc of every compound rendered so far, shared by the variants
+    of the same documentation (e.g. of an SDK for several chips).
+
+    Variants usually have most of their compounds byte for byte the same so
+    each compound is keyed by a hash of its XML (and its render options) and
+    only rendered by the first variant to need it. A compound's AsciiDoc can
+    also depend on other compounds (e.g. the titles of its submodules), so
+    the hash of every compound read while rendering it is recorded too and
+    it is only reused by a variant where all of them are the same.
+    """
+
+    def __init__(self):
+        self.compounds = {}
+        self.digests = {}
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0
+
+    def digest(self, xmldir, refid):
+        """Return a hash of the XML of a compound (or None if there is no such
+        compound), computed only once."""
+        key = (str(xmldir), refid)
+        if key not in self.digests:
+            try:
+                markup = sources.get(xmldir).markup(refid)
+            except FileNotFoundError:
+                self.digests[key] = None
+            else:
+                self.digests[key] = hashlib.sha256(markup.encode("utf-8")).hexdigest()
+        return self.digests[key]
+
+    def cached(self, xmldir, refid, options, render):
+        """Return the given compound as rendered by any variant, with the
+        given options, from the same XML (and the same XML of every compound
+        it depends on).
+
+        Otherwise, the compound is rendered by calling render and stored."""
+        key = (self.digest(xmldir, refid), json.dumps(options, sort_keys=True))
+        for dependencies, rendered in self.compounds.get(key, ()):
+            if all(
+                self.digest(xmldir, dependency) == digest
+                for dependency, digest in dependencies
+            ):
+                # The output still depends on the same compounds in this variant
+                for dependency, _ in dependencies:
+                    compound_path(xmldir, dependency)
+                self.hits += 1
+                self.saved += rendered.seconds
+                return rendered
+        with recording() as refids:
+            rendered = render()
+        self.misses += 1
+        dependencies = tuple(
+            (dependency, self.digest(xmldir, dependency))
+            for dependency in sorted(refids)
+        )
+        self.compounds.setdefault(key, []).append((dependencies, rendered))
+        return rendered
+
+    def to_text(self):
+        """Return the deduplication statistics of this run as plain text."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return (
+            f"Variants: {self.misses} compounds rendered, {self.hits} reused "
+            f"from another variant ({rate:.1%} deduplicated), "
+            f"{self.saved:.2f} s of rendering saved"
+        )